@@ -115,6 +115,128 @@ class AirtableManager:
         
         return False
 
+    @staticmethod
+    def batch_key(rider_data: Dict) -> Optional[str]:
+        """Field batch_upsert_riders merges a row on ("Email" or "Full Name"), None if it skips the row"""
+        email = rider_data.get('Email')
+        if email and not (isinstance(email, str) and email.startswith("no_email_")):
+            return "Email"
+        if rider_data.get('Full Name') or (rider_data.get('First Name') and rider_data.get('Last Name')):
+            return "Full Name"
+        return None
+
+    def batch_upsert_riders(self, riders_data: List[Dict]) -> int:
+        """
+        Upserts many riders using Airtable's batch upsert endpoint.
+
+        Riders with a real email are merged on "Email"; social-only riders
+        ("no_email_" / name slugs) are merged on "Full Name", mirroring the
+        identity rules of upsert_rider. pyairtable chunks the requests into
+        groups of 10, so 500 riders cost ~50 calls instead of ~1,500.
+        Returns the number of records sent.
+        """
+        by_email = []
+        by_name = []
+
+        for rider_data in riders_data:
+            email = rider_data.get('Email')
+            full_name = rider_data.get('Full Name')
+            if not full_name and rider_data.get('First Name') and rider_data.get('Last Name'):
+                full_name = f"{rider_data['First Name']} {rider_data['Last Name']}".strip()
+
+            clean_data = {}
+            for k, v in rider_data.items():
+                if v is None: continue
+                if k == 'Email' and isinstance(v, str) and v.startswith("no_email_"):
+                    continue
+                clean_data[k] = v
+            if full_name:
+                clean_data['Full Name'] = full_name
+
+            key = self.batch_key(rider_data)
+            if key == "Email":
+                by_email.append(clean_data)
+            elif key == "Full Name":
+                by_name.append(clean_data)
+            else:
+                print("Skipping batch upsert row: No Email or Full Name provided.")
+
+        sent = 0
+        for key_field, rows in (("Email", by_email), ("Full Name", by_name)):
+            if rows and self._batch_upsert(rows, key_field):
+                sent += len(rows)
+        return sent
+
+    def _batch_upsert(self, rows: List[Dict], key_field: str) -> bool:
+        """Runs one batch upsert, dropping fields Airtable rejects (same retry rules as upsert_rider)"""
+        max_retries = 5
+        attempt = 0
+
+        while attempt < max_retries:
+            try:
+                self.table.batch_upsert(
+                    [{"fields": row} for row in rows],
+                    key_fields=[key_field],
+                    typecast=True
+                )
+                return True
+            except Exception as e:
+                error_str = str(e)
+                if "Unknown field name" in error_str:
+                    import re
+                    match = re.search(r'Unknown field name: "(.*?)"', error_str)
+                    if match and match.group(1) != key_field:
+                        bad_field = match.group(1)
+                        print(f"Warning: Airtable rejected field '{bad_field}'. Removing and retrying.")
+                        for row in rows:
+                            row.pop(bad_field, None)
+                        attempt += 1
+                        continue
+
+                st.error(f"Error batch upserting riders to Airtable: {e}")
+                return False
+
+        return False
+
+    def delete_riders(self, identities: List[str]) -> int:
+        """
+        Deletes the records behind the given rider identities in one batch call.
+
+        An identity is the record's Email, or for social-only records the same
+        name slug DataLoader builds ("aaron_smith"). Records are resolved from
+        riders_cache (fetched if empty). Returns the number of records deleted.
+        """
+        targets = {i.lower().strip() for i in identities if i}
+        if not targets:
+            return 0
+
+        if not self.riders_cache:
+            self.fetch_all_riders()
+
+        record_ids = []
+        for fields in self.riders_cache:
+            email = str(fields.get('Email') or '').lower().strip()
+            if email:
+                identity = email
+            else:
+                name = fields.get('Full Name') or f"{fields.get('First Name', '')} {fields.get('Last Name', '')}"
+                slug = name.lower().strip().replace(' ', '_')
+                identity = "".join([c for c in slug if c.isalnum() or c == '_'])
+            if identity in targets:
+                record_ids.append(fields['id'])
+
+        if not record_ids:
+            return 0
+
+        try:
+            self.table.batch_delete(record_ids)
+            deleted = set(record_ids)
+            self.riders_cache = [f for f in self.riders_cache if f['id'] not in deleted]
+            return len(record_ids)
+        except Exception as e:
+            st.error(f"Error deleting riders from Airtable: {e}")
+            return 0
+
     def _find_match(self, email: Optional[str], full_name: Optional[str]) -> Optional[Dict]:
         """
         Finds an existing record in the cache (or refetches if critical? for now use cache or direct formula search).
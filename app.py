@@ -3,8 +3,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
-from datetime import datetime
-from funnel_manager import FunnelDashboard, FunnelStage, Rider
+from datetime import datetime, timedelta
+from funnel_manager import FunnelDashboard, FunnelStage, Rider, MetricsSnapshot, PIPELINE_STAGES, RaceResultIndex
+from dashboard_service import get_dashboard_service, edit_dashboard
+from timing_sheet_parser import TimingSheetParser
 
 # --- CONFIGURATION ---
 st.set_page_config(page_title="Rider Pipeline", page_icon="🏍️", layout="wide")
@@ -41,16 +43,15 @@ except ImportError:
 
 # --- CONSTANTS ---
 # --- CONSTANTS ---
-from ui_components import REPLY_TEMPLATES, render_unified_card_content
+from ui_components import REPLY_TEMPLATES, RACE_OUTREACH_TEMPLATES, OUTREACH_TEMPLATES, render_unified_card_content
 
 
 
 
-@st.cache_resource(ttl=3600) # Resource cache (1 hour) to prevent slow reloads
-def load_dashboard_data(overrides=None):
-    dashboard = FunnelDashboard(DATA_DIR, overrides=overrides)
-    # dashboard.reload_data() # Already called in __init__
-    return dashboard
+def load_dashboard_data(overrides=None, sheets_stamp=None):
+    # Shared process-wide instance (also used by pages/), reloaded only when the data token changes
+    return get_dashboard_service(DATA_DIR).get(overrides, sheets_stamp)
+
 
 @st.cache_resource
 def load_smart_reply(_rider_db=None):
@@ -139,8 +140,9 @@ def render_rider_card_content(r, dashboard, smart_reply, stage_config):
             new_status = st.selectbox("Stage", STATUS_OPTIONS, index=current_idx, key=f"dlg_st_{r.email}", format_func=lambda x: x.value)
             
             if st.button("Save Changes", key=f"dlg_sv_{r.email}"):
-                    dashboard.data_loader.save_rider_details(r.email, championship=champ_in, notes=notes_in, phone=phone_in)
-                    if new_status != r.current_stage: dashboard.update_rider_stage(r.email, new_status)
+                    with edit_dashboard(DATA_DIR) as live:
+                        live.data_loader.save_rider_details(r.email, championship=champ_in, notes=notes_in, phone=phone_in)
+                        if new_status != r.current_stage: live.update_rider_stage(r.email, new_status)
                     st.rerun()
 
     # 2. REPLY ASSISTANT
@@ -156,15 +158,13 @@ def render_rider_card_content(r, dashboard, smart_reply, stage_config):
             )
             
             if tmpl_key:
-                # Format Message
-                raw_msg = REPLY_TEMPLATES[tmpl_key]
-                
                 # Name Logic
                 first_name = r.first_name
                 if not first_name:
                     first_name = r.full_name.split(' ')[0] if r.full_name else "Mate"
                     
-                final_msg = raw_msg.replace("{name}", first_name)
+                # Format Message
+                final_msg = OUTREACH_TEMPLATES.render(tmpl_key, name=first_name)
                 
                 st.caption("Preview:")
                 st.code(final_msg, language=None)
@@ -244,8 +244,9 @@ def view_rider_dialog(r, dashboard, smart_reply, stage_config):
             new_status = st.selectbox("Stage", STATUS_OPTIONS, index=current_idx, key=f"dlg_st_{r.email}", format_func=lambda x: x.value)
             
             if st.button("Save Changes", key=f"dlg_sv_{r.email}"):
-                    dashboard.data_loader.save_rider_details(r.email, championship=champ_in, notes=notes_in, phone=phone_in)
-                    if new_status != r.current_stage: dashboard.update_rider_stage(r.email, new_status)
+                    with edit_dashboard(DATA_DIR) as live:
+                        live.data_loader.save_rider_details(r.email, championship=champ_in, notes=notes_in, phone=phone_in)
+                        if new_status != r.current_stage: live.update_rider_stage(r.email, new_status)
                     st.rerun()
 
     # 2. REPLY ASSISTANT
@@ -263,8 +264,7 @@ def view_rider_dialog(r, dashboard, smart_reply, stage_config):
             if tmpl_key:
                 # Format Message
                 first_name = r.first_name or display_name.split(' ')[0]
-                raw_msg = REPLY_TEMPLATES[tmpl_key]
-                final_msg = raw_msg.replace("{name}", first_name)
+                final_msg = OUTREACH_TEMPLATES.render(tmpl_key, name=first_name)
                 
                 st.caption("Preview:")
                 st.code(final_msg, language=None)
@@ -292,6 +292,14 @@ def view_rider_dialog(r, dashboard, smart_reply, stage_config):
                             st.text_area("Edit Recommendation:", value=reply_txt, height=150, key=f"dlg_sr_out_{r.email}")
                         else:
                             st.warning("No similar message found.")
+                        
+                        # Scripted replies (PDF knowledge base)
+                        scripted = smart_reply.find_scripted_replies(in_msg)
+                        if scripted:
+                            st.markdown("**📚 From the Scripts:**")
+                            for passage in scripted:
+                                st.caption(f"{passage['source']} (p.{passage['page']})")
+                                st.code(passage['text'], language=None)
 
     # 3. SOCIALS
     with c_act3:
@@ -316,16 +324,18 @@ def render_dashboard(dashboard, daily_metrics, riders):
         'fb': dashboard.daily_stats.get_mtd_total('fb_messages_sent'),
         'ig': dashboard.daily_stats.get_mtd_total('ig_messages_sent'),
         'links': dashboard.daily_stats.get_mtd_total('links_sent'),
-        'registered': 0, 'day1': 0, 'day2': 0, 'calls': 0, 'sales': 0
     }
     
-    # Scan riders for MTD automated stats
-    for r in riders.values():
-        if r.registered_date and r.registered_date.month == now.month and r.registered_date.year == now.year: mtd_metrics['registered'] += 1
-        if r.day1_complete_date and r.day1_complete_date.month == now.month and r.day1_complete_date.year == now.year: mtd_metrics['day1'] += 1
-        if r.day2_complete_date and r.day2_complete_date.month == now.month and r.day2_complete_date.year == now.year: mtd_metrics['day2'] += 1
-        if r.strategy_call_booked_date and r.strategy_call_booked_date.month == now.month and r.strategy_call_booked_date.year == now.year: mtd_metrics['calls'] += 1
-        if r.sale_closed_date and r.sale_closed_date.month == now.month and r.sale_closed_date.year == now.year: mtd_metrics['sales'] += 1
+    # MTD automated stats (memoised per data version)
+    snapshot = dashboard.get_metrics_snapshot()
+    month_counts = snapshot.mtd
+    mtd_metrics.update({
+        'registered': month_counts['registered'],
+        'day1': month_counts['day1_complete'],
+        'day2': month_counts['day2_complete'],
+        'calls': month_counts['strategy_call_booked'],
+        'sales': month_counts['sale_closed'],
+    })
 
     # Custom metric container
     c1, c2, c3, c4, c5, c6, c7, c8 = st.columns(8)
@@ -342,6 +352,20 @@ def render_dashboard(dashboard, daily_metrics, riders):
     c7.metric("Calls (MTD)", mtd_metrics['calls'])
     c8.metric("Sales (MTD)", mtd_metrics['sales'])
     
+    with st.expander("📆 Custom Date Range"):
+        today = now.date()
+        picked = st.date_input("Range", value=(today.replace(day=1), today), key="custom_metrics_range")
+        if isinstance(picked, (list, tuple)) and len(picked) == 2:
+            range_start = datetime.combine(picked[0], datetime.min.time())
+            range_end = datetime.combine(picked[1], datetime.min.time()) + timedelta(days=1)
+            range_counts = dashboard.get_activity_counts(range_start, range_end)
+            r1, r2, r3, r4, r5 = st.columns(5)
+            r1.metric("Blueprint", range_counts['registered'])
+            r2.metric("Day 1", range_counts['day1_complete'])
+            r3.metric("Day 2", range_counts['day2_complete'])
+            r4.metric("Calls", range_counts['strategy_call_booked'])
+            r5.metric("Sales", range_counts['sale_closed'])
+    
     st.divider()
 
     # PIPELINE BOARD
@@ -352,7 +376,7 @@ def render_dashboard(dashboard, daily_metrics, riders):
     # Filter Controls
     filter_mode = c_filt.selectbox(
         "Timeframe", 
-        ["Current Month", "Last Month", "All Time", "2025 (Full Year)"], 
+        MetricsSnapshot.TIMEFRAMES, 
         index=2 # Default to All Time to ensure they see their data
     )
     
@@ -389,63 +413,16 @@ def render_dashboard(dashboard, daily_metrics, riders):
     
     now = datetime.now()
     
-    # Logic
-
-    def is_in_timeframe(r, date_attr):
-        if filter_mode == "All Time":
-            return True
-            
-        # SPECIAL CASE: For "New Leads" (Contact Stage), show them even if date is missing
-        # This ensures CSV uploads appear immediately
-        if date_attr == 'outreach_date' and r.current_stage == FunnelStage.CONTACT:
-             d = getattr(r, date_attr)
-             if not d: return True # Show undated contacts in current view (or maybe restricted? Let's show them).
-        else:
-             d = getattr(r, date_attr)
-             
-        # If no date found:
-        # For 'All Time', we generally want to see them? 
-        # But if they haven't completed the action (e.g. Day 1 Complete Date missing but Stage is Day 1 Complete), it's weird.
-        # However, user says "Day 1 Day 2 are blank" -> implies they are stuck there but dates might be missing.
-        if not d: 
-            return (filter_mode == "All Time") # Allow missing dates in All Time view
-
-        elif filter_mode == "Current Month":
-            return d.month == now.month and d.year == now.year
-        elif filter_mode == "Last Month":
-            last_month = now.month - 1 if now.month > 1 else 12
-            target_year = now.year if now.month > 1 else now.year - 1
-            return d.month == last_month and d.year == target_year
-        elif filter_mode == "2025 (Full Year)":
-            return d.year == 2025
-        return False
-
     # 1. Pipeline Stages Definition
     # 1. Pipeline Stages Definition
-    STAGES = [
-        # REMOVED: "Leads/Contact" as per user request (it's in Database)
-        
-        {"label": "Messaged", "val": [FunnelStage.MESSAGED, FunnelStage.RACE_WEEKEND], "date_attr": 'outreach_date'},
-        {"label": "Replied", "val": [FunnelStage.REPLIED], "date_attr": 'outreach_date'}, # New Stage
-
-        {"label": "Link Sent", "val": [FunnelStage.LINK_SENT, FunnelStage.BLUEPRINT_LINK_SENT], "date_attr": 'outreach_date'}, # or create link_sent_date if exists, fallback to outreach
-        
-        {"label": "Sleep Test", "val": [FunnelStage.SLEEP_TEST_COMPLETED], "date_attr": 'sleep_test_date'},
-        {"label": "Mindset Quiz", "val": [FunnelStage.MINDSET_QUIZ_COMPLETED], "date_attr": 'mindset_quiz_date'},
-        {"label": "Flow Profile", "val": [FunnelStage.FLOW_PROFILE_COMPLETED], "date_attr": 'flow_profile_date'},
-        {"label": "Registered", "val": [FunnelStage.BLUEPRINT_STARTED, FunnelStage.REGISTERED], "date_attr": 'registered_date'},
-        {"label": "Day 1", "val": [FunnelStage.DAY1_COMPLETE], "date_attr": 'day1_complete_date'},
-        {"label": "Day 2", "val": [FunnelStage.DAY2_COMPLETE], "date_attr": 'day2_complete_date'},
-        {"label": "Call Booked", "val": [FunnelStage.STRATEGY_CALL_BOOKED], "date_attr": 'strategy_call_booked_date'},
-        {"label": "Clients / Won", "val": [FunnelStage.CLIENT, FunnelStage.SALE_CLOSED], "date_attr": 'sale_closed_date'}
-    ]
+    STAGES = PIPELINE_STAGES
 
     # HELPER: Format for Sortables (Text Representation)
     def _format_kanban_text(r: Rider):
         # Create a detailed string for the draggable card
         status_icon = "🟢"
         if r.is_disqualified: status_icon = "🚫"
-        elif r.days_in_current_stage > 3 and r.current_stage != FunnelStage.CLIENT: status_icon = "🔴"
+        elif r.days_in_stage(now) > 3 and r.current_stage != FunnelStage.CLIENT: status_icon = "🔴"
         
         name = r.full_name or r.email.split('@')[0]
         if name.startswith("no_email_"): name = name.replace("no_email_", "").replace("_", " ").title()
@@ -471,13 +448,8 @@ def render_dashboard(dashboard, daily_metrics, riders):
         item_to_rider_map = {} 
         
         for stage in STAGES:
-            stage_riders = [
-                r for r in riders.values() 
-                if r.current_stage in stage['val']
-                and is_in_timeframe(r, stage['date_attr'])
-            ]
-            # SORT: Latest Activity First
-            stage_riders.sort(key=lambda x: getattr(x, stage['date_attr']) or datetime.min, reverse=True)
+            # Pre-sorted (Latest Activity First) slice from the stage index
+            _, stage_riders = dashboard.stage_index.column(stage['val'], filter_mode)
             
             # Create list of formatted strings
             items = []
@@ -517,7 +489,8 @@ def render_dashboard(dashboard, daily_metrics, riders):
                         # Check if this rider is currently in one of the statuses for this column
                         if rider.current_stage not in stage_config['val']:
                              # LOGIC FOR MOVING
-                             dashboard.update_rider_stage(rider.email, target_status)
+                             with edit_dashboard(DATA_DIR) as live:
+                                 live.update_rider_stage(rider.email, target_status)
                              st.toast(f"Moved {rider.first_name} to {stage_label}!")
                              changes_detected = True
                              
@@ -539,34 +512,16 @@ def render_dashboard(dashboard, daily_metrics, riders):
                 # Header
                 st.markdown(f"**{stage['label']}**") # Original uses stage['label'], instruction uses stage.value. Sticking to original.
                 
-                # Filter Riders
-                target_vals = [s.value for s in stage['val']]
-                stage_riders = [
-                    r for r in riders.values() 
-                    if (r.current_stage in stage['val'] or r.current_stage.value in target_vals)
-                    and is_in_timeframe(r, stage['date_attr'])
-                ]
-                # SORT: Latest Activity First
-                stage_riders.sort(key=lambda x: getattr(x, stage['date_attr']) or datetime.min, reverse=True)
-                
-                # Get riders for this stage (from instruction, but conflicts with existing filter)
-                # stage_riders = [r for r in dashboard.riders.values() if r.current_stage == stage] # This line from instruction would overwrite existing logic. Keeping original.
+                # Pre-sorted (Latest Activity First) slice from the stage index
+                DISPLAY_LIMIT = 50
+                total, displayed_riders = dashboard.stage_index.column(stage['val'], filter_mode, limit=DISPLAY_LIMIT)
                 
-                # Filter by Timeframe (if applicable)
-                if filter_mode != 'All Time': # Using existing 'filter_mode' variable
-                     # ... filtering logic ...
-                     pass
-                     
                 # Count Badge
-                st.caption(f"{len(stage_riders)} Opportunities")
+                st.caption(f"{total} Opportunities")
                 
                 # Limit to prevent UI crash
-                DISPLAY_LIMIT = 50
-                if len(stage_riders) > DISPLAY_LIMIT:
-                    st.warning(f"Showing first {DISPLAY_LIMIT} of {len(stage_riders)}")
-                    displayed_riders = stage_riders[:DISPLAY_LIMIT]
-                else:
-                    displayed_riders = stage_riders
+                if total > DISPLAY_LIMIT:
+                    st.warning(f"Showing first {DISPLAY_LIMIT} of {total}")
                     
                 st.divider()
                 
@@ -575,7 +530,7 @@ def render_dashboard(dashboard, daily_metrics, riders):
                      
                      # 1. Status Indicator
                      is_stalled = False
-                     if r.days_in_current_stage > 3 and r.current_stage != FunnelStage.CLIENT: is_stalled = True
+                     if r.days_in_stage(now) > 3 and r.current_stage != FunnelStage.CLIENT: is_stalled = True
                         
                      status_icon = "🔴" if is_stalled else "🟢"
                      if r.is_disqualified: status_icon = "🚫"
@@ -631,6 +586,15 @@ def render_dashboard(dashboard, daily_metrics, riders):
         fm1.metric("Actual Revenue", f"£{rev_metrics['actual']:,.0f}")
         fm2.metric("Target", f"£{rev_metrics['target']:,.0f}")
         fm3.metric("Remaining Needed", f"£{max(0, rev_metrics['target'] - rev_metrics['actual']):,.0f}")
+        
+        # Monte Carlo forecast from the current pipeline
+        forecast = dashboard.get_revenue_forecast()
+        rev_band = forecast['revenue']
+        out_band = forecast['required_outreach']
+        fc1, fc2, fc3 = st.columns(3)
+        fc1.metric("Forecast Revenue (P50)", f"£{rev_band['p50']:,.0f}", help=f"P10 £{rev_band['p10']:,.0f} | P90 £{rev_band['p90']:,.0f}")
+        fc2.metric("Chance of Hitting Target", f"{forecast['prob_hit_target'] * 100:.0f}%")
+        fc3.metric("Outreach Needed (P50)", f"{out_band['p50']:,.0f}", help=f"P10 {out_band['p10']:,.0f} | P90 {out_band['p90']:,.0f}")
     
     with f_col2:
         st.subheader("Calculator")
@@ -646,6 +610,39 @@ def render_dashboard(dashboard, daily_metrics, riders):
         
         st.caption(f"Estimated Calls Needed: **{int(calls_needed)}**")
 
+    # COHORTS
+    with st.expander("📊 Cohort Conversion"):
+        cc1, cc2 = st.columns(2)
+        cohort_period = cc1.selectbox("Cohort by", ["month", "week"], format_func=str.title)
+        cohort_split = cc2.selectbox("Split by", [None, "channel", "championship"],
+                                     format_func=lambda v: "None" if v is None else v.title())
+        st.dataframe(dashboard.get_cohort_table(cohort_period, by=cohort_split),
+                     use_container_width=True, hide_index=True)
+        st.caption("Step % = riders converting to the next stage; days = median time to convert.")
+
+    # RESCUE QUEUE
+    rescue_queue = dashboard.get_rescue_queue()
+    rescue_total = sum(len(v) for v in rescue_queue.values())
+    with st.expander(f"🆘 Rescue Queue ({rescue_total})"):
+        if not rescue_total:
+            st.caption("No rescue messages due.")
+        now = datetime.now()
+        for rescue_type, rescue_riders in rescue_queue.items():
+            if not rescue_riders:
+                continue
+            st.markdown(f"**{rescue_type.replace('_', ' ').title()}** ({len(rescue_riders)})")
+            for rr in rescue_riders[:10]:  # Most overdue first
+                msg = dashboard.rescue_manager.get_rescue_message(rescue_type, rr, 'dm')
+                rc1, rc2 = st.columns([4, 1])
+                rc1.write(f"{rr.full_name} ({rr.email}) - stuck {rr.days_in_stage(now)} days")
+                rc1.code(msg.get('body', ''), language=None)
+                if rc2.button("✅ Mark Sent", key=f"rescue_sent_{rescue_type}_{rr.email}"):
+                    with edit_dashboard(DATA_DIR) as live:
+                        live.mark_rescue_sent(rr.email, rescue_type)
+                    st.rerun()
+            if len(rescue_riders) > 10:
+                st.caption(f"... and {len(rescue_riders) - 10} more")
+
 def render_race_outreach(dashboard):
     st.subheader("🏁 Race Result Outreach Tool")
     
@@ -684,7 +681,8 @@ def render_race_outreach(dashboard):
         if st.button("🔄 Update", help="Click to refresh messages and SAVE this circuit name."):
             # Save the new name if valid
             if event_name_input:
-                dashboard.race_manager.save_circuit(event_name_input)
+                with edit_dashboard(DATA_DIR) as live:
+                    live.race_manager.save_circuit(event_name_input)
             st.rerun()
 
     if event_name_input:
@@ -699,84 +697,83 @@ def render_race_outreach(dashboard):
     raw_results_list = []
     
     if input_method == "Upload CSV (Timing Sheet)":
-        uploaded_file = st.file_uploader("Upload Timing Sheet CSV", type=['csv'], key="race_file_uploader")
+        uploaded_file = st.file_uploader("Upload Timing Sheet (CSV / TSV / TXT)", type=['csv', 'tsv', 'txt'], key="race_file_uploader")
         if uploaded_file:
             try:
-                # Ensure we read from start of file
-                uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file)
-                
-                # Try to find relevant columns
-                name_col = None
-                candidates = ['competitor', 'name', 'rider', 'driver', 'first name', 'last name', 'racer']
-                
-                # Smart search
-                for col in df.columns:
-                    if str(col).lower().strip() in candidates:
-                        name_col = col
-                        break
-                    # Partial match
-                    if "name" in str(col).lower() or "rider" in str(col).lower():
-                        name_col = col 
-                
-                # UI Fallback
-                st.caption(f"Detected {len(df)} rows.")
-                col_options = list(df.columns)
+                # Streamed: header detected once, one entry per competitor (all sessions in the file)
+                parser = TimingSheetParser()
+                raw_results_list = list(parser.parse_file(uploaded_file))
                 
-                # Set default index if we found a candidate
-                idx = col_options.index(name_col) if name_col in col_options else 0
+                # UI Fallback: no header recognised -> let the user pick the name column
+                columns = parser.first_row
+                if not parser.headers_found and len(columns) > 1:
+                    name_col = st.selectbox(
+                        "Select Name Column", [None] + list(range(len(columns))),
+                        format_func=lambda i: "Auto-detect (first text column)" if i is None else (columns[i].strip() or f"Column {i + 1}"),
+                        help="Which column contains the names?", key="race_name_column"
+                    )
+                    if name_col is not None:
+                        first_row_header = st.checkbox("First row is a header", value=True, key="race_first_row_header")
+                        parser = TimingSheetParser(name_column=name_col, first_row_header=first_row_header)
+                        raw_results_list = list(parser.parse_file(uploaded_file))
                 
-                selected_col = st.selectbox("Select Name Column", col_options, index=idx, help="Which column contains the names?")
+                sessions = len({e.session for e in raw_results_list})
+                classes = sorted({e.race_class for e in raw_results_list if e.race_class})
+                st.caption(f"Detected {len(raw_results_list)} riders across {sessions} session(s)"
+                           + (f" | Classes: {', '.join(classes)}" if classes else ""))
                 
-                if selected_col:
-                    names = df[selected_col].dropna().astype(str).tolist()
-                    raw_results_list = names
-                    
-                    if len(names) > 0:
-                         st.success(f"Ready to analyze {len(names)} riders!")
+                if len(raw_results_list) > 0:
+                     st.success(f"Ready to analyze {len(raw_results_list)} riders!")
                 
             except Exception as e:
-                st.error(f"Error reading CSV: {e}")
+                st.error(f"Error reading timing sheet: {e}")
                 
     else: # Paste Text
-        text_input = st.text_area("Rider List (Name per line)", height=150)
+        text_input = st.text_area("Rider List (Name per line, or paste a timing sheet with its header)", height=150)
         if text_input:
-            raw_results_list = text_input.split('\n')
+            raw_results_list = list(TimingSheetParser().parse(text_input.splitlines()))
     
     if st.button("🔍 Analyze & Match Riders"):
         if not raw_results_list:
             st.error("Please provide rider data.")
         else:
             # Simple cleanup
-            clean_names = [n.strip().split(',')[0] for n in raw_results_list if len(n) > 3]
+            clean_entries = [e for e in raw_results_list if len(e.name) > 3]
             
-            with st.spinner(f"Analyzing {len(clean_names)} riders..."):
-                results = dashboard.process_race_results(clean_names, event_name=event_name)
+            with st.spinner(f"Analyzing {len(clean_entries)} riders..."):
+                results = dashboard.process_race_results(clean_entries, event_name=event_name)
                 st.session_state.matched_results = results
+                st.session_state.race_analysis_event = event_name
                 
-                # PERSISTENCE: Save to disk for refresh survival
-                import pickle
+                # PERSISTENCE: Save to disk for refresh survival (names/emails/status only)
                 try:
-                    with open(os.path.join(DATA_DIR, "last_race_analysis.pkl"), "wb") as f:
-                        pickle.dump(results, f)
+                    with edit_dashboard(DATA_DIR) as live:
+                        live.race_manager.save_analysis(event_name, results)
                 except Exception as e:
                     print(f"Failed to cache analysis: {e}")
 
     # 3. Processed Results
-    # AUTO-LOAD Persistence if session empty
-    if 'matched_results' not in st.session_state or not st.session_state.matched_results:
-        import pickle
-        cache_path = os.path.join(DATA_DIR, "last_race_analysis.pkl")
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, "rb") as f:
-                    st.session_state.matched_results = pickle.load(f)
-            except Exception:
-                pass # Corrupt or old file
+    analysis_store = dashboard.race_manager.analysis_store
+    saved_events = analysis_store.events()
+    
+    # AUTO-LOAD Persistence if session empty (most recent analysis)
+    if ('matched_results' not in st.session_state or not st.session_state.matched_results) and saved_events:
+        st.session_state.race_analysis_event = saved_events[0]
+        st.session_state.matched_results = dashboard.race_manager.load_analysis(saved_events[0])
+    
+    # Switch between stored analyses
+    if len(saved_events) > 1:
+        current_event = st.session_state.get('race_analysis_event')
+        picked_event = st.selectbox("📂 Saved Analyses", saved_events,
+                                    index=saved_events.index(current_event) if current_event in saved_events else 0)
+        if picked_event != current_event:
+            st.session_state.race_analysis_event = picked_event
+            st.session_state.matched_results = dashboard.race_manager.load_analysis(picked_event)
                 
     if 'matched_results' in st.session_state and st.session_state.matched_results:
         st.divider()
         results = st.session_state.matched_results
+        analysis_event = st.session_state.get('race_analysis_event', event_name)
         
         # BULK IMPORT ACTION
         new_prospects_count = sum(1 for r in results if r['match_status'] == 'new_prospect')
@@ -786,291 +783,320 @@ def render_race_outreach(dashboard):
                  st.metric("Total Riders", len(results))
              with c_bulk2:
                  if st.button(f"⚡ Bulk Import {new_prospects_count} New Riders", type="primary", help="Immediately add all new names to the Pipeline as Leads"):
-                      added = 0
-                      # Use a progress bar for satisfaction
-                      progress_bar = st.progress(0)
+                      pending_rows = {r['row'] for r in results if r['match_status'] == 'new_prospect'}
+                      with st.spinner(f"Importing {new_prospects_count} riders..."):
+                           # One batched CSV / Airtable / Sheets commit for the whole grid
+                           with edit_dashboard(DATA_DIR) as live:
+                               results = live.race_manager.bulk_import(results, analysis_event)
+                      imported = [r for r in results if r['row'] in pending_rows and r['match_status'] == 'match_found']
+                      added = new_prospects_count - sum(1 for r in results if r['match_status'] == 'new_prospect')
+                      st.session_state.matched_results = results
+                      analysis_store.update_rows(analysis_event, imported)
                       
-                      for idx, r in enumerate(results):
-                           if r['match_status'] == 'new_prospect':
-                               # Generate minimal details
-                               name = r['original_name']
-                               clean_name = "".join([c for c in name if c.isalnum() or c == ' ']).strip()
-                               slug = clean_name.lower().replace(" ", "_")
-                               email = f"no_email_{slug}"
-                               
-                               # Split name
-                               parts = clean_name.split(' ')
-                               f_name = parts[0].title()
-                               l_name = " ".join(parts[1:]).title() if len(parts) > 1 else ""
-                               
-                               # Add to Dashboard/Memory
-                               if dashboard.add_new_rider(email, f_name, l_name, "", "", ""):
-                                   dashboard.update_rider_stage(email, FunnelStage.CONTACT)
-                                   # Important: Ensure outreach_date is set so they appear in filtered views
-                                   if email in dashboard.riders:
-                                        dashboard.riders[email].outreach_date = datetime.now()
-                                        
-                                   # Update localized match status so UI reflects it immediately
-                                   r['match_status'] = 'match_found'
-                                   r['match'] = dashboard.riders[email]
-                                   added += 1
-                                   
-                           progress_bar.progress((idx + 1) / len(results))
-                           
                       st.success(f"Successfully imported {added} riders! They are now in the 'Leads / Contact' stage.")
                       st.rerun()
                       
         else:
              st.metric("Total Riders", len(results))
         
-        # Filter Logic
-        show_messaged = st.checkbox("Show Sent/Processed Riders", value=False)
+        # BULK SOCIAL LOOKUP (cached: names already resolved are never searched again)
+        unmatched_count = sum(1 for r in results if r['match_status'] in ('new_prospect', 'ambiguous'))
+        if unmatched_count > 0:
+             if st.button(f"🔎 Find Socials for {unmatched_count} Unmatched Riders", help="Searches each name once (results are cached) and pre-fills the Add Contact forms"):
+                  progress = st.progress(0.0)
+                  found = dashboard.race_manager.resolve_socials(
+                      results, analysis_event,
+                      progress_callback=lambda done, total: progress.progress(done / max(total, 1))
+                  )
+                  hits = sum(1 for profiles in found.values() if profiles)
+                  st.success(f"Found socials for {hits} of {len(found)} riders.")
         
-        filtered = []
-        for r in results:
-            if show_messaged:
-                filtered.append(r)
-            else:
-                # Exclude if stage is MESSAGED or further (value 2+)
-                # Need to check rider object state
-                # If match found, check its stage
-                if r['match_status'] == 'match_found' and r.get('match'):
-                    stage = r['match'].current_stage
-                    # If stage is Contact, we show it (it's pending outreach)
-                    # If stage is Messaged+, we hide it
-                    if stage != FunnelStage.CONTACT:
-                         continue
-                filtered.append(r)
-
-        st.write(f"Showing {len(filtered)} riders")
+        # Filter Logic (precomputed index by match status / stage, rebuilt only for a new analysis)
+        result_index = st.session_state.get('race_result_index')
+        if result_index is None or result_index.results is not results:
+            result_index = RaceResultIndex(results, dashboard.rider_table)
+            st.session_state.race_result_index = result_index
+        
+        status_labels = {'match_found': "✅ Matched", 'ambiguous': "⚠️ Possible Matches", 'new_prospect': "🆕 New Prospects"}
+        status_counts = result_index.counts()
+        fc1, fc2 = st.columns([3, 1])
+        with fc1:
+            status_filter = st.multiselect(
+                "Show", options=list(status_labels),
+                default=list(status_labels),
+                format_func=lambda s: f"{status_labels[s]} ({status_counts.get(s, 0)})",
+                key="race_status_filter"
+            )
+        with fc2:
+            st.write("")
+            show_messaged = st.checkbox("Show Sent/Processed Riders", value=False)
+        
+        filtered = result_index.select(status_filter, include_processed=show_messaged)
         
         # Initialize session state for tracking expanded cards
         if "just_added_names" not in st.session_state:
             st.session_state.just_added_names = set()
-
-        # Paginate to show top 20 by default to avoid lag
-        for i, r in enumerate(filtered[:20]): 
+        
+        # Paged summary list: one compact row per rider, the heavy card only for the open one
+        per_page = 25
+        total_pages = max(1, (len(filtered) + per_page - 1) // per_page)
+        pc1, pc2 = st.columns([1, 3])
+        with pc1:
+            current_page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, key="race_results_page")
+        with pc2:
+            st.write("")
+            st.write(f"Showing {len(filtered)} riders (page {current_page} of {total_pages})")
+        
+        open_row = st.session_state.get('race_open_row')
+        page_start = (current_page - 1) * per_page
+        for i in filtered[page_start:page_start + per_page]:
+            r = results[i]
             # Color Code / Icon logic
             if r['match_status'] == 'match_found':
                  icon = "✅"
                  label = "MATCHED (Ready)"
+            elif r['match_status'] == 'ambiguous':
+                 icon = "⚠️"
+                 label = "POSSIBLE MATCHES (Review)"
             else:
                  icon = "🆕" 
                  label = "NEW PROSPECT"
             
-            # Keep expanded if just added
-            is_expanded = r['original_name'] in st.session_state.just_added_names
-                 
-            with st.expander(f"{icon} {r['original_name']}  [{label}]", expanded=is_expanded):
+            # Keep open if selected or just added
+            is_open = r.get('row', i) == open_row or r['original_name'] in st.session_state.just_added_names
+            
+            sc1, sc2, sc3 = st.columns([4, 2, 1])
+            sc1.markdown(f"{icon} **{r['original_name']}**  [{label}]")
+            if r.get('match'):
+                sc2.caption(r['match'].current_stage.value)
+            elif r.get('race_class') or r.get('position'):
+                sc2.caption(" | ".join(str(x) for x in (r.get('race_class'), f"P{r['position']}" if r.get('position') else None) if x))
+            if is_open:
+                if sc3.button("Close", key=f"close_{i}_{r['original_name']}"):
+                    st.session_state.race_open_row = None
+                    st.session_state.just_added_names.discard(r['original_name'])
+                    st.rerun()
+                with st.container(border=True):
+                    render_race_result_card(dashboard, r, i, analysis_event, analysis_store, result_index)
+            elif sc3.button("Open", key=f"open_{i}_{r['original_name']}"):
+                st.session_state.race_open_row = r.get('row', i)
+                st.rerun()
+
+
+def render_race_result_card(dashboard, r, i, analysis_event, analysis_store, result_index):
+    """Full card for one race result (only built for the row that is open)"""
+    # BRANCH: MATCHED RIDER -> Unified Card
+    if r['match_status'] == 'match_found' and r.get('match'):
+        rider_match = r['match']
+        
+        # Special Case: No Socials
+        if rider_match.current_stage == FunnelStage.NO_SOCIALS:
+            st.warning(f"🚫 Matched: {rider_match.full_name} (No Socials Found)")
+            st.caption("This rider was previously flagged as not having reachable social media.")
+            
+            # Allow "Un-flagging" if found now?
+            if st.button("Re-open Search", key=f"reopen_{i}_{r['original_name']}"):
+                with edit_dashboard(DATA_DIR) as live:
+                    live.update_rider_stage(rider_match.email, FunnelStage.CONTACT) # Reset to Contact
+                st.rerun()
                 
-                # BRANCH: MATCHED RIDER -> Unified Card
-                if r['match_status'] == 'match_found' and r.get('match'):
-                    rider_match = r['match']
+        else:
+            st.success(f"✅ Matched: {rider_match.full_name}")
+            
+            # Clear from "just added" loop triggers (optional cleanup, but maybe keep until closed?)
+            # If we clear it now, it might close on next unrelated interaction. 
+            # Let's keep it in set for this session or until the Close button clears it.
+            
+            render_unified_card_content(rider_match, dashboard, key_suffix=f"race_{i}", default_event_name=analysis_event)
+        
+    else:
+        # AMBIGUOUS: several riders scored too close to call - let the user pick
+        if r['match_status'] == 'ambiguous':
+            st.warning("Several riders in the database match this name. Pick the right one, or add as new below.")
+            for c_idx, cand in enumerate(r.get('candidates', [])):
+                cand_rider = dashboard.riders.get(cand['email'].lower())
+                if not cand_rider:
+                    continue
+                cc1, cc2 = st.columns([3, 1])
+                cc1.write(f"**{cand['name']}** ({cand['email']}) - {cand['confidence'] * 100:.0f}% match, {cand_rider.current_stage.value}")
+                if cc2.button("Use This Rider", key=f"pick_{i}_{c_idx}_{r['original_name']}"):
+                    r['match_status'] = 'match_found'
+                    r['match'] = cand_rider
+                    r['matched_email'] = cand_rider.email
+                    analysis_store.update_rows(analysis_event, [r])
+                    result_index.update([r])
+                    st.rerun()
+
+        # BRANCH: NEW PROSPECT -> Deep Search & Add Form
+        rc1, rc2 = st.columns(2)
+        
+        # LEFT: Draft Message (Standard)
+        with rc1:
+            st.write("#### 📝 Outreach Draft")
+            
+            # --- TEMPLATES: race openers + standard reply deck (memoised per name/event) ---
+            templates = OUTREACH_TEMPLATES.render_all(
+                list(RACE_OUTREACH_TEMPLATES) + list(REPLY_TEMPLATES),
+                name=r['original_name'].split(' ')[0], event=analysis_event
+            )
+
+            template_options = list(templates.keys())
+            # Sort to keep Cold Outreach at top if possible, or just standard sort
+            # standard sort might put "1." at top which is good.
+            
+            selected_tpl_name = st.selectbox("Select Template", template_options, key=f"tpl_{i}_{r['original_name']}")
+            
+            msg_val = templates[selected_tpl_name]
+
+            # Key needs to include analysis_event to force refresh
+            evt_key = analysis_event.replace(" ", "_").lower()
+            st.text_area("Message", value=msg_val, height=250, key=f"msg_{i}_{r['original_name']}_{evt_key}")
+            
+            st.caption("Copy for DM:")
+            st.code(msg_val, language=None)
+            
+            # MESSAGE SENT ACTION (Disabled for New Prospect until added)
+            st.write("---")
+            if st.button("🚀 Confirm Message Sent", key=f"sent_{i}_{r['original_name']}", type="primary"):
+                 st.error("Please 'Add Contact' first before marking sent.")
+
+        with rc2:
+            st.write("#### 👤 Contact Actions")
+            
+            if r['match_status'] in ('new_prospect', 'ambiguous'):
+                # DEEP SEARCH FUNCTIONALITY
+                st.info("Rider not in database.")
+
+                # Always show Deep Search Toolkit (No buttons, no expander)
+                st.markdown("---")
+                st.markdown("#### 🕵️ Deep Search Toolkit")
+                st.caption("Copy Name for manual search:")
+                st.code(r['original_name'], language=None)
+                
+                deep_links = dashboard.race_manager.social_finder.generate_deep_search_links(r['original_name'], analysis_event)
+                # Profiles from an earlier lookup (None = never searched, {} = nothing found)
+                cached_socials = dashboard.race_manager.social_finder.cache.profiles(r['original_name'], analysis_event) or {}
+                
+                c_d1, c_d2 = st.columns(2)
+                with c_d1:
+                    st.markdown(f"**Facebook**")
+                    fb_link = deep_links.get('👥 Facebook Direct', deep_links.get('👥 Facebook Profile', '#'))
+                    st.markdown(f"[👥 Open Search (Auto)]({fb_link})")
                     
-                    # Special Case: No Socials
-                    if rider_match.current_stage == FunnelStage.NO_SOCIALS:
-                        st.warning(f"🚫 Matched: {rider_match.full_name} (No Socials Found)")
-                        st.caption("This rider was previously flagged as not having reachable social media.")
-                        
-                        # Allow "Un-flagging" if found now?
-                        if st.button("Re-open Search", key=f"reopen_{i}_{r['original_name']}"):
-                            dashboard.update_rider_stage(rider_match.email, FunnelStage.CONTACT) # Reset to Contact
-                            st.rerun()
-                            
-                    else:
-                        st.success(f"✅ Matched: {rider_match.full_name}")
-                        
-                        # Clear from "just added" loop triggers (optional cleanup, but maybe keep until closed?)
-                        # If we clear it now, it might close on next unrelated interaction. 
-                        # Let's keep it in set for this session or until manual close (Streamlit handles manual).
-                        
-                        render_unified_card_content(rider_match, dashboard, key_suffix=f"race_{i}", default_event_name=event_name)
+                with c_d2:
+                    st.markdown(f"**Instagram**")
+                    ig_link = deep_links.get('📸 Instagram Direct', deep_links.get('📸 Instagram Profile', '#'))
+                    st.markdown(f"[📷 Open Instagram]({ig_link})")
                     
-                else:
-                    # BRANCH: NEW PROSPECT -> Deep Search & Add Form
-                    rc1, rc2 = st.columns(2)
+                    backup_link = deep_links.get('(Backup) IG Google', '#')
+                    st.caption(f"[Alternative: Google Search]({backup_link})")
+
+                st.caption("Validation Tools")
+                c_v1, c_v2 = st.columns(2)
+                with c_v1:
+                    if '📋 Racing Org Check' in deep_links:
+                         st.markdown(f"[📋 Org Check]({deep_links['📋 Racing Org Check']})")
+                with c_v2:
+                    if '⏱️ Lap Times' in deep_links:
+                         st.markdown(f"[⏱️ Lap Times]({deep_links['⏱️ Lap Times']})")
+
+                # NOT FOUND BUTTON (Top of section)
+                st.markdown("---")
+                if st.button("🚫 Not Found / No Socials", key=f"nf_{i}_{r['original_name']}", use_container_width=True):
+                    # Auto-add as "Not A Fit" to prevent researching again
+                    # 1. Generate Slug
+                    nf_first = r['original_name'].split(' ')[0]
+                    nf_last = r['original_name'].split(' ')[1] if ' ' in r['original_name'] else ""
+                    slug = r['original_name'].lower().strip().replace(' ', '_')
+                    slug = "".join([c for c in slug if c.isalnum() or c == '_'])
+                    final_email = f"no_email_{slug}"
                     
-                    # LEFT: Draft Message (Standard)
-                    with rc1:
-                        st.write("#### 📝 Outreach Draft")
-                        
-                        # --- TEMPLATE DEFINITIONS (Restored & Merged) ---
-                        f_name = r['original_name'].split(' ')[0]
-                        
-                        # 1. Custom/Restored Contextual Templates
-                        custom_templates = {
-                            "1. Cold Outreach (Weekend)": f"Hey {f_name}, I see you were out at {event_name}. How was the weekend for you?",
-                            "1. Cold Outreach (Series)": f"Hi {f_name}, I see you were out at {event_name}. How's the series going for you so far?",
-                            "1. Cold Outreach (Season)": f"Hey {f_name}, I see you were out at {event_name}. How's the season treating you?",
-                            "Blank Hook": f"Hey {f_name}, "
-                        }
-                        
-                        # 2. Add Standard Deck from ui_components
-                        # (This is the "message deck" from earlier versions like 'Offer Free Training')
-                        from ui_components import REPLY_TEMPLATES
+                    # 2. Add as Not A Fit
+                    with edit_dashboard(DATA_DIR) as dashboard:
+                        dashboard.add_new_rider(
+                            final_email, nf_first, nf_last, "", "", "", 
+                            notes="Marked as No Social Media Found during Race Outreach."
+                        )
+                        dashboard.update_rider_stage(final_email, FunnelStage.NO_SOCIALS)
+                        dashboard.race_manager.social_finder.cache.record(r['original_name'], analysis_event, {})
+                    
+                    # 3. Update UI State
+                    if final_email in dashboard.riders:
+                        r['match_status'] = 'match_found'
+                        r['match'] = dashboard.riders[final_email]
+                        r['matched_email'] = final_email
                         
-                        # Merge dicts
-                        templates = custom_templates.copy()
-                        for k, v_raw in REPLY_TEMPLATES.items():
-                             # Format the standard templates with name
-                             # Some might not have {name}, but safe to try format or replace
-                             try:
-                                 v_formatted = v_raw.replace("{name}", f_name)
-                                 templates[k] = v_formatted
-                             except:
-                                 templates[k] = v_raw
-
-                        template_options = list(templates.keys())
-                        # Sort to keep Cold Outreach at top if possible, or just standard sort
-                        # standard sort might put "1." at top which is good.
+                        # Persistence (this row only)
+                        try:
+                            analysis_store.update_rows(analysis_event, [r])
+                            result_index.update([r])
+                        except Exception: pass
                         
-                        selected_tpl_name = st.selectbox("Select Template", template_options, key=f"tpl_{i}_{r['original_name']}")
+                        st.toast(f"Marked {r['original_name']} as Not Found.")
+                        st.rerun()
+
+                # Always Show Form
+                st.markdown("---")
+                with st.form(key=f"add_contact_{i}"):
+                    st.caption(f"Add **{r['original_name']}** to Database")
+                    # Split name guess
+                    parts = r['original_name'].split(' ')
+                    f_geo = parts[0].title()
+                    l_geo = parts[1].title() if len(parts) > 1 else ""
                         
-                        msg_val = templates[selected_tpl_name]
-
-                        # Key needs to include event_name to force refresh
-                        evt_key = event_name.replace(" ", "_").lower()
-                        st.text_area("Message", value=msg_val, height=250, key=f"msg_{i}_{r['original_name']}_{evt_key}")
+                    in_first = st.text_input("First Name", value=f_geo, key=f"first_{i}_{r['original_name']}")
+                    in_last = st.text_input("Last Name", value=l_geo, key=f"last_{i}_{r['original_name']}")
+                    
+                    # UX FIX: Email Optional (Hidden ID generation)
+                    in_email = st.text_input("Email (Optional)", key=f"email_{i}_{r['original_name']}", placeholder="e.g. rider@example.com")
+                    
+                    in_champ = st.text_input("Championship", key=f"champ_{i}_{r['original_name']}")
+                    
+                    # Pre-fill FB/IG from the social lookup cache (empty if not searched / not found)
+                    in_fb = st.text_input("Facebook URL", value=cached_socials.get('facebook_url', ''), key=f"fb_{i}_{r['original_name']}")
+                    in_ig = st.text_input("Instagram URL", value=cached_socials.get('instagram_url', ''), key=f"ig_{i}_{r['original_name']}")
+                    
+                    if st.form_submit_button("💾 Save to DB"):
+                        # 1. Handle ID Generation
+                        final_email = in_email.strip()
+                        if not final_email:
+                            # Generate ID from name
+                            slug = f"{in_first} {in_last}".lower().strip().replace(' ', '_')
+                            slug = "".join([c for c in slug if c.isalnum() or c == '_'])
+                            final_email = f"no_email_{slug}"
                         
-                        st.caption("Copy for DM:")
-                        st.code(msg_val, language=None)
+                        # 2. Add to DB
+                        with edit_dashboard(DATA_DIR) as dashboard:
+                            success = dashboard.add_new_rider(final_email, in_first, in_last, in_fb, ig_url=in_ig, championship=in_champ)
+                            if success:
+                                # 3. Update Stage to CONTACT
+                                dashboard.update_rider_stage(final_email, FunnelStage.CONTACT)
                         
-                        # MESSAGE SENT ACTION (Disabled for New Prospect until added)
-                        st.write("---")
-                        if st.button("🚀 Confirm Message Sent", key=f"sent_{i}_{r['original_name']}", type="primary"):
-                             st.error("Please 'Add Contact' first before marking sent.")
-
-                    with rc2:
-                        st.write("#### 👤 Contact Actions")
-                        
-                        if r['match_status'] == 'new_prospect':
-                            # DEEP SEARCH FUNCTIONALITY
-                            st.info("Rider not in database.")
-
-                            # Always show Deep Search Toolkit (No buttons, no expander)
-                            st.markdown("---")
-                            st.markdown("#### 🕵️ Deep Search Toolkit")
-                            st.caption("Copy Name for manual search:")
-                            st.code(r['original_name'], language=None)
-                            
-                            deep_links = dashboard.race_manager.social_finder.generate_deep_search_links(r['original_name'], event_name)
+                        if success:
                             
-                            c_d1, c_d2 = st.columns(2)
-                            with c_d1:
-                                st.markdown(f"**Facebook**")
-                                fb_link = deep_links.get('👥 Facebook Direct', deep_links.get('👥 Facebook Profile', '#'))
-                                st.markdown(f"[👥 Open Search (Auto)]({fb_link})")
-                                
-                            with c_d2:
-                                st.markdown(f"**Instagram**")
-                                ig_link = deep_links.get('📸 Instagram Direct', deep_links.get('📸 Instagram Profile', '#'))
-                                st.markdown(f"[📷 Open Instagram]({ig_link})")
-                                
-                                backup_link = deep_links.get('(Backup) IG Google', '#')
-                                st.caption(f"[Alternative: Google Search]({backup_link})")
-
-                            st.caption("Validation Tools")
-                            c_v1, c_v2 = st.columns(2)
-                            with c_v1:
-                                if '📋 Racing Org Check' in deep_links:
-                                     st.markdown(f"[📋 Org Check]({deep_links['📋 Racing Org Check']})")
-                            with c_v2:
-                                if '⏱️ Lap Times' in deep_links:
-                                     st.markdown(f"[⏱️ Lap Times]({deep_links['⏱️ Lap Times']})")
-    
-                            # NOT FOUND BUTTON (Top of section)
-                            st.markdown("---")
-                            if st.button("🚫 Not Found / No Socials", key=f"nf_{i}_{r['original_name']}", use_container_width=True):
-                                # Auto-add as "Not A Fit" to prevent researching again
-                                # 1. Generate Slug
-                                nf_first = r['original_name'].split(' ')[0]
-                                nf_last = r['original_name'].split(' ')[1] if ' ' in r['original_name'] else ""
-                                slug = r['original_name'].lower().strip().replace(' ', '_')
-                                slug = "".join([c for c in slug if c.isalnum() or c == '_'])
-                                final_email = f"no_email_{slug}"
-                                
-                                # 2. Add as Not A Fit
-                                dashboard.add_new_rider(
-                                    final_email, nf_first, nf_last, "", "", "", 
-                                    notes="Marked as No Social Media Found during Race Outreach."
-                                )
-                                dashboard.update_rider_stage(final_email, FunnelStage.NO_SOCIALS)
-                                
-                                # 3. Update UI State
-                                if final_email in dashboard.riders:
-                                    r['match_status'] = 'match_found'
-                                    r['match'] = dashboard.riders[final_email]
-                                    
-                                    # Persistence
-                                    import pickle
-                                    try:
-                                        with open(os.path.join(DATA_DIR, "last_race_analysis.pkl"), "wb") as f:
-                                            pickle.dump(st.session_state.matched_results, f)
-                                    except: pass
-                                    
-                                    st.toast(f"Marked {r['original_name']} as Not Found.")
-                                    st.rerun()
-
-                            # Always Show Form
-                            st.markdown("---")
-                            with st.form(key=f"add_contact_{i}"):
-                                st.caption(f"Add **{r['original_name']}** to Database")
-                                # Split name guess
-                                parts = r['original_name'].split(' ')
-                                f_geo = parts[0].title()
-                                l_geo = parts[1].title() if len(parts) > 1 else ""
-                                    
-                                in_first = st.text_input("First Name", value=f_geo, key=f"first_{i}_{r['original_name']}")
-                                in_last = st.text_input("Last Name", value=l_geo, key=f"last_{i}_{r['original_name']}")
-                                
-                                # UX FIX: Email Optional (Hidden ID generation)
-                                in_email = st.text_input("Email (Optional)", key=f"email_{i}_{r['original_name']}", placeholder="e.g. rider@example.com")
+                            # 3. Update Session State
+                            if final_email in dashboard.riders:
+                                new_rider = dashboard.riders[final_email]
+                                r['match_status'] = 'match_found'
+                                r['match'] = new_rider
+                                r['matched_email'] = new_rider.email
                                 
-                                in_champ = st.text_input("Championship", key=f"champ_{i}_{r['original_name']}")
+                                # PERSISTENCE: Record this row immediately
+                                # This ensures if user refreshes, they stay "Matched"
+                                try:
+                                    analysis_store.update_rows(analysis_event, [r])
+                                    result_index.update([r])
+                                except Exception:
+                                    pass
                                 
-                                # Pre-fill FB/IG (Manual now, so empty defaults)
-                                in_fb = st.text_input("Facebook URL", key=f"fb_{i}_{r['original_name']}")
-                                in_ig = st.text_input("Instagram URL", key=f"ig_{i}_{r['original_name']}")
+                            # Track this name to keep expander open
+                            st.session_state.just_added_names.add(r['original_name'])
                                 
-                                if st.form_submit_button("💾 Save to DB"):
-                                    # 1. Handle ID Generation
-                                    final_email = in_email.strip()
-                                    if not final_email:
-                                        # Generate ID from name
-                                        slug = f"{in_first} {in_last}".lower().strip().replace(' ', '_')
-                                        slug = "".join([c for c in slug if c.isalnum() or c == '_'])
-                                        final_email = f"no_email_{slug}"
-                                    
-                                    # 2. Add to DB
-                                    success = dashboard.add_new_rider(final_email, in_first, in_last, in_fb, ig_url=in_ig, championship=in_champ)
-                                    
-                                    if success:
-                                        # 3. Update Stage to CONTACT
-                                        dashboard.update_rider_stage(final_email, FunnelStage.CONTACT)
-                                        
-                                        # 3. Update Session State
-                                        if final_email in dashboard.riders:
-                                            new_rider = dashboard.riders[final_email]
-                                            r['match_status'] = 'match_found'
-                                            r['match'] = new_rider
-                                            
-                                            # PERSISTENCE: Save updated results to disk immediately
-                                            # This ensures if user refreshes, they stay "Matched"
-                                            import pickle
-                                            try:
-                                                with open(os.path.join(DATA_DIR, "last_race_analysis.pkl"), "wb") as f:
-                                                    pickle.dump(st.session_state.matched_results, f)
-                                            except Exception:
-                                                pass
-                                            
-                                        # Track this name to keep expander open
-                                        st.session_state.just_added_names.add(r['original_name'])
-                                            
-                                        st.toast(f"Added {in_first}! Now click 'Confirm Message Sent' when ready.")
-                                        st.rerun()
-                                    else:
-                                        st.error("Failed to save.")
-                            
+                            st.toast(f"Added {in_first}! Now click 'Confirm Message Sent' when ready.")
+                            st.rerun()
+                        else:
+                            st.error("Failed to save.")
+
 
 # ==============================================================================
 # DATABASE VIEW
@@ -1081,29 +1107,8 @@ def render_database_view(dashboard):
     riders = dashboard.riders
     st.caption(f"Total Riders: {len(riders)}")
     
-    # helper to clean data for display
-    data = []
-    # Convert riders dict to list
-    rider_list = list(riders.values())
-    
-    for r in rider_list:
-        # Robust enum handling
-        stage_val = r.current_stage.value if hasattr(r.current_stage, "value") else str(r.current_stage)
-        channel_val = r.outreach_channel.value if hasattr(r.outreach_channel, "value") else str(r.outreach_channel)
-        
-        data.append({
-            "First Name": r.first_name,
-            "Last Name": r.last_name,
-            "Email": r.email,
-            "Stage": stage_val,
-            "Channel": channel_val,
-            "Date Joined": r.outreach_date.strftime('%Y-%m-%d') if r.outreach_date else None,
-            "Phone": r.phone,
-            "Championship": r.championship,
-            "Notes": r.notes
-        })
-        
-    df = pd.DataFrame(data)
+    # Versioned projection: only rebuilt when rider data changes, not on row clicks
+    df = dashboard.rider_frame.frame()
     
     if not df.empty:
         # SEARCH
@@ -1112,9 +1117,8 @@ def render_database_view(dashboard):
             search_term = st.text_input("🔍 Search Database", placeholder="Search by name, email, or notes...")
         
         if search_term:
-            # Case insensitive search across all columns
-            mask = df.apply(lambda x: x.astype(str).str.contains(search_term, case=False).any(), axis=1)
-            df = df[mask]
+            # Case insensitive search across all columns (row text cached per data version)
+            df = dashboard.rider_frame.search(search_term)
             st.caption(f"Found {len(df)} matches")
             
         # DISPLAY
@@ -1148,20 +1152,29 @@ def render_database_view(dashboard):
             except Exception as e:
                 st.warning(f"Could not open rider: {e}")
         
-        # DOWNLOAD
-        @st.cache_data
-        def convert_df(df):
-            return df.to_csv(index=False).encode('utf-8')
-
-        csv_data = convert_df(df)
+        # DOWNLOAD (full export is rendered once per data version; search results on demand)
+        if search_term:
+            csv_data = df.to_csv(index=False).encode('utf-8')
+        else:
+            csv_data = dashboard.rider_frame.export('csv')
 
-        st.download_button(
+        d_col1, d_col2 = st.columns(2)
+        d_col1.download_button(
             "📥 Download CSV",
             csv_data,
             "rider_database_export.csv",
             "text/csv",
             key='download-csv'
         )
+        parquet_data = None if search_term else dashboard.rider_frame.export('parquet')
+        if parquet_data is not None:
+            d_col2.download_button(
+                "📥 Download Parquet",
+                parquet_data,
+                "rider_database_export.parquet",
+                "application/octet-stream",
+                key='download-parquet'
+            )
     else:
         st.info("No riders found in database.")
 
@@ -1194,20 +1207,22 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
                         slug = "".join([c for c in slug if c.isalnum() or c == '_'])
                         final_email = f"no_email_{slug}"
                     
-                    success = dashboard.add_new_rider(
-                        final_email, 
-                        new_first.strip(), 
-                        new_last.strip(), 
-                        fb_url=new_fb.strip(), 
-                        ig_url=new_ig.strip(),
-                        championship=new_champ.strip(),
-                        notes=new_notes.strip()
-                    )
+                    with edit_dashboard(DATA_DIR) as dashboard:
+                        success = dashboard.add_new_rider(
+                            final_email, 
+                            new_first.strip(), 
+                            new_last.strip(), 
+                            fb_url=new_fb.strip(), 
+                            ig_url=new_ig.strip(),
+                            championship=new_champ.strip(),
+                            notes=new_notes.strip()
+                        )
+                        if success:
+                            # Optionally set stage to Contact immediately
+                            dashboard.update_rider_stage(final_email, FunnelStage.CONTACT)
                     
                     if success:
                         st.toast(f"✅ Added {new_first} {new_last} to database!", icon="🎉")
-                        # Optionally set stage to Contact immediately
-                        dashboard.update_rider_stage(final_email, FunnelStage.CONTACT)
                         # st.cache_resource.clear() # CAUSES SLOWNESS
                         st.rerun() # Immediate UI update from memory
                     else:
@@ -1235,8 +1250,8 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
                     with open(save_path, "wb") as f:
                         f.write(uploaded_file.getbuffer())
                     
-                    # Update & Notify
-                    dashboard.reload_data()
+                    # Update & Notify (publishes a fresh dashboard for the next run)
+                    get_dashboard_service(DATA_DIR).reload()
                     st.session_state[file_key] = file_details
                     
                     # Mark as Forced Local (survive reruns)
@@ -1298,7 +1313,8 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
             links_in = st.number_input("Links Sent", value=existing_stats.links_sent, min_value=0)
             
             if st.form_submit_button("Save Daily Stats"):
-                dashboard.daily_stats.save_stats(date_input, fb_in, ig_in, links_in)
+                with edit_dashboard(DATA_DIR) as live:
+                    live.daily_stats.save_stats(date_input, fb_in, ig_in, links_in)
                 st.toast("✅ Stats Saved!")
                 st.cache_resource.clear()
                 st.rerun()
@@ -1320,7 +1336,8 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
             st.caption("Push all local data updates to Airtable Master Record.")
             if st.button("🔄 Sync Database to Airtable", use_container_width=True):
                  with st.spinner("Syncing Database to Airtable..."):
-                     count = dashboard.data_loader.sync_database_to_airtable()
+                     with edit_dashboard(DATA_DIR) as live:
+                         count = live.data_loader.sync_database_to_airtable()
                      if count > 0:
                          st.success(f"✅ Successfully synced {count} records to Airtable!")
                          st.cache_resource.clear()
@@ -1332,11 +1349,21 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
         st.info("Import contacts from other systems. Requires 'Email' column.")
         crm_file = st.file_uploader("Upload CSV", type=['csv'], key="crm_upload")
         if crm_file:
+            crm_dry_run = st.checkbox("Dry run (preview counts, don't save)", value=False, key="crm_dry_run")
             if st.button("Start Import"):
                 with st.spinner("Importing..."):
-                    stats = dashboard.import_crm_csv(crm_file)
+                    crm_file.seek(0)
+                    progress_text = st.empty()
+                    
+                    def on_progress(rows_done, running):
+                        progress_text.caption(f"Processed {rows_done} rows... (new: {running['added']}, skipped: {running['skipped']})")
+                    
+                    with edit_dashboard(DATA_DIR) as live:
+                        stats = live.import_crm_csv(crm_file, dry_run=crm_dry_run, progress_callback=on_progress)
                     if stats['errors'] > 0 and stats['added'] == 0:
                         st.error("Import failed. Check CSV headers.")
+                    elif crm_dry_run:
+                        st.info(f"Dry Run: would add {stats['added']} of {stats['rows']} rows, skip {stats['skipped']} (existing, duplicate or invalid email).")
                     else:
                         st.success(f"Import Complete! Added: {stats['added']}, Skipped: {stats['skipped']}, Errors: {stats['errors']}")
                         if stats['added'] > 0:
@@ -1356,7 +1383,8 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
         with c_sync2:
              if st.button("💾 Sync to Database", type="primary"):
                  with st.spinner("Syncing..."):
-                     added_count = dashboard.data_loader.sync_missing_riders_to_db()
+                     with edit_dashboard(DATA_DIR) as live:
+                         added_count = live.data_loader.sync_missing_riders_to_db()
                      if added_count > 0:
                          st.success(f"✅ Success! Appended {added_count} new riders to Rider Database.csv")
                          st.balloons()
@@ -1440,17 +1468,32 @@ def render_admin(dashboard, overrides, sheet_errors, riders):
                         except Exception as e:
                             st.error(f"Overwrite Error: {e}")
         st.write("### Deduplication")
-        st.write("Scan the database for duplicate emails and merge them into single records.")
+        st.write("Scan the database for duplicate emails and similar names, review the merge plan, then apply it.")
         
-        if st.button("♻️ Scan & Fix Duplicates"):
-             with st.spinner("Cleaning database..."):
-                 removed = dashboard.cleanup_duplicates()
-                 if removed > 0:
-                     st.success(f"Cleaned {removed} duplicate rows!")
-                     st.cache_resource.clear()
-                     # st.rerun()
-                 else:
-                     st.info("Database is clean! No duplicates found.")
+        if st.button("♻️ Scan for Duplicates"):
+             with st.spinner("Scanning database..."):
+                 st.session_state['dedupe_plan'] = dashboard.plan_duplicate_cleanup()
+        
+        plan = st.session_state.get('dedupe_plan')
+        if plan is not None:
+             if not plan.groups:
+                 st.info("Database is clean! No duplicates found.")
+             else:
+                 st.write(f"**{len(plan.groups)}** merge groups ({plan.removed_count} duplicate records)")
+                 st.dataframe(plan.to_frame(), use_container_width=True, hide_index=True)
+                 
+                 if plan.ambiguous:
+                     with st.expander(f"⚠️ {len(plan.ambiguous)} name matches with different emails (not merged)"):
+                         for members in plan.ambiguous:
+                             st.write(", ".join(members))
+                 
+                 if st.button("✅ Apply Merge Plan", type="primary"):
+                     with st.spinner("Merging duplicates..."):
+                         with edit_dashboard(DATA_DIR) as live:
+                             result = live.apply_duplicate_cleanup(plan)
+                         st.success(f"Merged {result['riders_merged']} riders, removed {result['csv_rows_removed']} CSV rows, deleted {result['airtable_deleted']} Airtable records.")
+                         del st.session_state['dedupe_plan']
+                         st.cache_resource.clear()
 
     st.divider()
 
@@ -1520,57 +1563,31 @@ if st.sidebar.button("🔄 Force Reload / Clear Cache"):
     st.rerun()
 
 # 1. AUTO-SYNC GOOGLE SHEETS
-# --- CACHED DATA LOADER (Module Level) ---
-@st.cache_data(ttl=300) # Cache for 5 minutes
-def load_all_sheets_data_cached():
-     import concurrent.futures
-     
-     SHEET_CONFIG = {
-         "rider_db": "Rider Database.csv",
-         "strategy_apps": "Strategy Call Application.csv",
-         "blueprint_regs": "Podium Contenders Blueprint Registered.csv",
-         "seven_mistakes": "7 Biggest Mistakes Assessment.csv",
-         "day2_assessment": "Day 2 Self Assessment.csv",
-         "flow_profile": "Flow Profile.csv",
-         "sleep_test": "Sleep Test.csv",
-         "mindset_quiz": "Mindset Quiz.csv",
-         "race_weekend": "export (15).csv",
-         "season_review": "export (16).csv",
-         "xperiencify": "Xperiencify.csv"
-     }
-     
-     sheet_secrets = st.secrets.get("sheets", {})
-     loaded_data = {}
-     missing_keys = []
-     load_errors = []
-     
-     # 1. Identify valid tasks
-     tasks = {}
-     for secret_key, internal_file in SHEET_CONFIG.items():
-         url = sheet_secrets.get(secret_key, "")
-         if url:
-             tasks[secret_key] = (url, internal_file)
-         else:
-             missing_keys.append(secret_key)
-     
-     # 2. Execute in Parallel
-     with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-         future_to_key = {
-             executor.submit(load_google_sheet, url): (key, internal_file)
-             for key, (url, internal_file) in tasks.items()
-         }
-         
-         for future in concurrent.futures.as_completed(future_to_key):
-             key, internal_file = future_to_key[future]
-             try:
-                 df = future.result()
-                 if df is not None and not df.empty:
-                     loaded_data[internal_file] = df
-             except Exception as exc:
-                 load_errors.append(f"{key}: {exc}")
-                 print(f"Error loading {key}: {exc}")
-                 
-     return loaded_data, missing_keys, load_errors
+# --- BACKGROUND SHEETS REFRESHER (Module Level) ---
+SHEET_CONFIG = {
+    "rider_db": "Rider Database.csv",
+    "strategy_apps": "Strategy Call Application.csv",
+    "blueprint_regs": "Podium Contenders Blueprint Registered.csv",
+    "seven_mistakes": "7 Biggest Mistakes Assessment.csv",
+    "day2_assessment": "Day 2 Self Assessment.csv",
+    "flow_profile": "Flow Profile.csv",
+    "sleep_test": "Sleep Test.csv",
+    "mindset_quiz": "Mindset Quiz.csv",
+    "race_weekend": "export (15).csv",
+    "season_review": "export (16).csv",
+    "xperiencify": "Xperiencify.csv"
+}
+
+@st.cache_resource
+def get_sheets_refresher():
+     # One polling thread per process; pages are served from its last good snapshot
+     from sheets_refresher import SheetsRefresher
+     return SheetsRefresher(SHEET_CONFIG, dict(st.secrets.get("sheets", {}))).start()
+
+def load_all_sheets_data():
+     return get_sheets_refresher().snapshot().as_tuple()
+
+sheets_stamp = None  # Fetch stamp of the cached sheets (None = local files only)
 
 if HAS_GSHEETS:
     try:
@@ -1579,11 +1596,11 @@ if HAS_GSHEETS:
             
             # CACHED CALL
             try:
-                 overrides, missing_config, sheet_errors = load_all_sheets_data_cached()
+                 overrides, missing_config, sheet_errors, sheets_stamp = load_all_sheets_data()
                  
                  # UI STATUS
                  if st.sidebar.checkbox("🔌 Connection Status", value=False): # Collapsed via checkbox to save rendering
-                      st.sidebar.write("### GSheets Sync (Cached 5m)")
+                      st.sidebar.write("### GSheets Sync (Background refresh 5m)")
                       
                       if missing_config:
                            st.sidebar.warning(f"Note: No GSheet synced for: {', '.join(missing_config)}")
@@ -1625,7 +1642,7 @@ try:
     if forced_files:
         st.toast(f"Using local files for: {len(forced_files)} inputs", icon="📂")
 
-    dashboard = load_dashboard_data(overrides=cleaned_overrides)
+    dashboard = load_dashboard_data(overrides=cleaned_overrides, sheets_stamp=sheets_stamp)
     riders = dashboard.riders
     daily_metrics = dashboard.get_daily_metrics()  
 except Exception as e:
@@ -1698,7 +1715,8 @@ def render_calendar_view(dashboard):
                 new_date = parser.parse(new_start_str)
                 
                 # Update Backend
-                dashboard.data_loader.save_rider_details(email, follow_up_date=new_date)
+                with edit_dashboard(DATA_DIR) as live:
+                    live.data_loader.save_rider_details(email, follow_up_date=new_date)
                 st.toast(f"Moved follow-up to {new_date.strftime('%d %b')}!")
                 
                 # Rerun to update local state (rider dict)
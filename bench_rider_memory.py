@@ -0,0 +1,87 @@
+import csv
+import io
+import random
+import sys
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+from datetime import datetime, timedelta
+
+from funnel_manager import Rider, FunnelStage
+
+# Rider memory benchmark: bytes per rider for the old dict-backed @dataclass layout
+# vs the slotted Rider, on a synthetic timing-sheet/Messenger-sized dataset.
+# Usage: python bench_rider_memory.py [n_riders]   (default 100000)
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+CHAMPIONSHIPS = ["British Superbikes", "Thundersport GB", "No Limits", "NG Road Racing", "Bemsee", "CVMA", "WERA", ""]
+COUNTRIES = ["UK", "USA", "Ireland", "Australia", ""]
+STAGES = [FunnelStage.CONTACT, FunnelStage.MESSAGED, FunnelStage.REPLIED, FunnelStage.LINK_SENT,
+          FunnelStage.REGISTERED, FunnelStage.DAY1_COMPLETE, FunnelStage.DAY2_COMPLETE]
+
+
+def legacy_rider_class():
+    """Pre-slots layout: plain @dataclass (per-instance __dict__), a list per rider for rescues"""
+    spec = []
+    for f in fields(Rider):
+        if not f.init:
+            continue  # Bookkeeping (the dashboard hub), not rider data
+        if f.name == 'rescue_messages_sent':
+            spec.append((f.name, list, field(default_factory=list)))
+        elif f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass('LegacyRider', spec)
+
+
+def synthetic_csv(n: int) -> str:
+    rng = random.Random(42)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['email', 'first_name', 'last_name', 'championship', 'country', 'stage', 'outreach_days', 'day2'])
+    for i in range(n):
+        writer.writerow([
+            f"rider{i}@example.com", f"First{i % 997}", f"Last{i}",
+            rng.choice(CHAMPIONSHIPS), rng.choice(COUNTRIES), rng.randrange(len(STAGES)),
+            rng.randrange(400) if rng.random() < 0.6 else '', '1' if rng.random() < 0.05 else '',
+        ])
+    return out.getvalue()
+
+
+def build(cls, text: str) -> list:
+    """Same shape as the loaders: construct, then set the mapped fields one by one"""
+    now = datetime(2026, 1, 1)
+    riders = []
+    for row in csv.DictReader(io.StringIO(text)):  # Fresh str objects per row, like a real CSV load
+        rider = cls(row['email'], row['first_name'], row['last_name'])
+        if row['championship']:
+            rider.championship = row['championship']
+        if row['country']:
+            rider.country = row['country']
+        rider.current_stage = STAGES[int(row['stage'])]
+        if row['outreach_days']:
+            rider.outreach_date = now - timedelta(days=int(row['outreach_days']))
+        if row['day2']:
+            rider.day2_scores = {'mindset': 7.0, 'flow': 6.0}
+        riders.append(rider)
+    return riders
+
+
+def measure(cls, text: str) -> float:
+    tracemalloc.start()
+    riders = build(cls, text)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(riders) == N
+    return current / N
+
+
+if __name__ == "__main__":
+    text = synthetic_csv(N)
+    before = measure(legacy_rider_class(), text)
+    after = measure(Rider, text)
+    print(f"Riders: {N:,}  |  fields: {len(fields(Rider))}")
+    print(f"Before (dict-backed dataclass): {before:8.1f} bytes/rider  ({before * N / 1e6:.1f} MB)")
+    print(f"After  (slotted Rider):         {after:8.1f} bytes/rider  ({after * N / 1e6:.1f} MB)")
+    print(f"Saved: {before - after:.1f} bytes/rider ({(1 - after / before) * 100:.0f}%)")
@@ -0,0 +1,157 @@
+"""
+Dashboard Service
+=================
+One process-wide FunnelDashboard shared by the main app and every page.
+
+The published dashboard is one shared, mutable object, not a snapshot:
+every session reads the same instance. Readers call `get()` once per
+script run. Writes go through `edit()`, which runs them one at a time,
+always against the currently published instance (not a stale one a
+session picked up before a reload). A reload builds a new
+FunnelDashboard off to the side, without holding up edits, and swaps the
+reference, so nobody sees a half-loaded dashboard; a build that an edit
+overlapped is redone so the swap never drops that edit. There are no per-reader
+copy-on-write snapshots: edits update the riders and their derived
+indexes in place (through the observer hub), so readers are not
+isolated from another session's edit while they render.
+
+Instead of hashing the Google Sheets DataFrames (what st.cache_resource
+did with `overrides`), a reload is keyed on a cheap data-version token:
+the sheets fetch stamp, which override files are in play, and a TTL.
+A changed sheet rebuilds every source rather than just that file: the
+loaders layer onto each other (later sources overwrite earlier ones,
+Airtable last) and cannot retract a row deleted from a sheet, so
+replaying only the changed files would not match a fresh load.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from funnel_manager import FunnelDashboard
+
+
+class DashboardService:
+    """Holds the published FunnelDashboard for one data directory"""
+
+    TTL_SECONDS = 3600  # Same lifetime as the old resource cache
+    MAX_REBUILDS = 2    # Builds thrown away because an edit landed meanwhile, before building under the edit lock
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._lock = threading.RLock()        # Guards the swap and every edit()
+        self._build_lock = threading.Lock()   # One build at a time (edits don't wait on it)
+        self._edits = 0                       # Bumped by every edit(), so a build knows if it missed one
+        self._dashboard: Optional[FunnelDashboard] = None
+        self._token: Optional[tuple] = None
+        self._overrides: Optional[Dict[str, pd.DataFrame]] = None
+        self._loaded_at = 0.0
+
+    @staticmethod
+    def data_token(overrides: Optional[Dict[str, pd.DataFrame]] = None, sheets_stamp: Optional[str] = None) -> tuple:
+        """Cheap identity of the data a dashboard was built from (no DataFrame hashing)"""
+        return sheets_stamp, tuple(sorted((overrides or {}).keys()))
+
+    @property
+    def version(self) -> Tuple[Optional[tuple], float]:
+        return self._token, self._loaded_at
+
+    def _expired(self) -> bool:
+        return time.time() - self._loaded_at > self.TTL_SECONDS
+
+    def _fresh(self, token: Optional[tuple] = None) -> Optional[FunnelDashboard]:
+        """The published dashboard if it is still current (for this token, when given)"""
+        current = self._dashboard
+        if current is not None and (token is None or token == self._token) and not self._expired():
+            return current
+        return None
+
+    def _build(self, overrides: Optional[Dict[str, pd.DataFrame]]) -> FunnelDashboard:
+        # The DataLoader gets its own dict: writes (e.g. add_new_riders_to_db) extend its
+        # overrides, and must neither touch the refresher's snapshot nor outlive a rebuild.
+        return FunnelDashboard(self.data_dir, overrides=dict(overrides) if overrides else None)
+
+    def _swap(self, fresh: FunnelDashboard, overrides: Optional[Dict[str, pd.DataFrame]], token: tuple) -> FunnelDashboard:
+        self._dashboard = fresh
+        self._token = token
+        self._overrides = overrides
+        self._loaded_at = time.time()
+        return fresh
+
+    def _publish(self, overrides: Optional[Dict[str, pd.DataFrame]], token: tuple) -> FunnelDashboard:
+        """
+        Build a new dashboard and swap it in (caller holds _build_lock).
+
+        The build runs outside the edit lock, so sessions keep reading and
+        editing the old instance meanwhile. An edit that lands during the
+        build was persisted after the new one read its sources, so that
+        build is thrown away and redone; if edits keep landing, the last
+        attempt builds under the edit lock.
+        """
+        for _ in range(self.MAX_REBUILDS):
+            with self._lock:
+                edits = self._edits  # Waits out an edit in progress, so its writes are read
+            fresh = self._build(overrides)
+            with self._lock:
+                if self._edits == edits:
+                    return self._swap(fresh, overrides, token)
+        with self._lock:
+            return self._swap(self._build(overrides), overrides, token)
+
+    def get(self, overrides: Optional[Dict[str, pd.DataFrame]] = None,
+            sheets_stamp: Optional[str] = None) -> FunnelDashboard:
+        """Published dashboard for this data token, loading it if the token moved on"""
+        token = self.data_token(overrides, sheets_stamp)
+        current = self._fresh(token)
+        if current is not None:
+            return current
+        with self._build_lock:
+            # Another session may have loaded it while we waited
+            current = self._fresh(token)
+            if current is not None:
+                return current
+            return self._publish(overrides, token)
+
+    def current(self) -> FunnelDashboard:
+        """Whatever is published now (pages without their own sheet overrides)"""
+        current = self._fresh()
+        if current is not None:
+            return current
+        with self._build_lock:
+            current = self._fresh()
+            if current is not None:
+                return current
+            return self._publish(self._overrides, self._token or self.data_token())
+
+    @contextmanager
+    def edit(self) -> Iterator[FunnelDashboard]:
+        """
+        Write access to the published dashboard: `with service.edit() as dashboard: ...`.
+        Edits from all sessions are serialised with each other and with the swap
+        of a reload (a reload that overlapped an edit is rebuilt, see _publish).
+        """
+        if self._dashboard is None:
+            self.current()  # First load, outside the edit lock
+        with self._lock:
+            self._edits += 1
+            yield self._dashboard
+
+    def reload(self) -> FunnelDashboard:
+        """Rebuild from the same sources and publish (e.g. after a local file upload)"""
+        with self._build_lock:
+            return self._publish(self._overrides, self._token or self.data_token())
+
+
+@st.cache_resource
+def get_dashboard_service(data_dir: str) -> DashboardService:
+    """Process-wide service per data directory (cleared with st.cache_resource.clear())"""
+    return DashboardService(data_dir)
+
+
+def edit_dashboard(data_dir: str):
+    """`with edit_dashboard(data_dir) as dashboard:` - serialised write access (DashboardService.edit)"""
+    return get_dashboard_service(data_dir).edit()
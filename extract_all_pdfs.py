@@ -1,22 +1,29 @@
 import os
-import glob
-from pypdf import PdfReader
+import sys
+from knowledge_base import KnowledgeBase
 
-files = [
-    "/Users/camino/Documents/Client Generator /Pipeline Messages and Follow ups .pdf"
-]
+# Builds knowledge_base_index.json from every PDF in the data dir (parallel, cached per file hash).
+# The app builds it on first start if it is missing; run this after adding or editing PDFs.
+# Usage: python extract_all_pdfs.py [data_dir] [--print]
 
-for filename in files:
-    print(f"\n================ START {filename} ================")
-    try:
-        reader = PdfReader(filename)
-        for i, page in enumerate(reader.pages):
-            try:
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    data_dir = next((a for a in argv if not a.startswith("--")), os.path.dirname(os.path.abspath(__file__)))
+
+    kb = KnowledgeBase(data_dir)
+    stats = kb.build()
+    print(f"Indexed {stats['files']} PDFs ({stats['parsed']} parsed, {stats['cached']} cached, "
+          f"{stats['errors']} errors) -> {stats['passages']} passages in {kb.index_path}")
+
+    if "--print" in argv:
+        for filename, digest in sorted(kb.files.items()):
+            print(f"\n================ START {filename} ================")
+            for i, text in enumerate(kb.pages.get(digest, [])):
                 print(f"--- Page {i+1} ---")
-                text = page.extract_text(extraction_mode="layout")
                 print(text)
-            except Exception as e:
-                print(f"Error reading page {i+1}: {e}")
-    except Exception as e:
-        print(f"Error opening file: {e}")
-    print(f"================ END {filename} ================\n")
+            print(f"================ END {filename} ================\n")
+
+
+if __name__ == "__main__":  # Required: the process pool re-imports this module under spawn (Windows/macOS)
+    main()
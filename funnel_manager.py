@@ -20,17 +20,37 @@ import csv
 import json
 import random
 import pandas as pd
+import numpy as np
 import os
 import os
+import sys
 import streamlit as st
 import gsheets_loader
 from airtable_manager import AirtableManager
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple, Any, ClassVar, Iterable, Union, Callable
 from enum import Enum
 from collections import defaultdict
 import re
+import bisect
+import heapq
+import itertools
+import functools
+import threading
+import time
+import concurrent.futures
+from timing_sheet_parser import TimingEntry
+from template_engine import TemplateEngine
+
+# Double Metaphone keys for race-result name matching (RiderNameIndex); in requirements.txt.
+# Without it (bare dev install) the index falls back to _simple_phonetic, which blocks and scores differently.
+try:
+    from metaphone import doublemetaphone
+    HAS_METAPHONE = True
+except ImportError:
+    HAS_METAPHONE = False
+    print("metaphone not installed - race name matching uses the fallback phonetic keys (pip install metaphone)")
 
 
 # =============================================================================
@@ -69,6 +89,10 @@ class FunnelConfig:
         'day2_no_call': 12,             # 12 hours after Day 2 (urgency)
     }
 
+    # Revenue forecast pools: riders who entered their stage this month, plus any
+    # who entered within this many days (older occupants have stalled, not pending)
+    FORECAST_STAGE_EXPIRY_DAYS = 21
+
 
 class OutreachChannel(Enum):
     EMAIL = "email"
@@ -106,15 +130,61 @@ class FunnelStage(Enum):
     SEASON_REVIEW_COMPLETE = "End of Season Review Completed"
     BLUEPRINT_LINK_SENT = "Blueprint Link Sent"
 
+    @classmethod
+    def from_text(cls, text: Optional[str]) -> Optional['FunnelStage']:
+        """Stage for a value, alias or any-case variant from a CSV / Airtable cell (O(1)); None if unknown"""
+        if not text:
+            return None
+        stage = STAGE_LOOKUP.get(text)
+        if stage is None:
+            stage = STAGE_LOOKUP.get(str(text).strip().casefold())
+        return stage
+
+
+# Free-text stage names used in the CRM exports (case-folded) -> stage
+STAGE_ALIASES: Dict[str, FunnelStage] = {
+    'messaged': FunnelStage.MESSAGED, 'outreach': FunnelStage.MESSAGED,
+    'client': FunnelStage.CLIENT, 'won': FunnelStage.CLIENT,
+    'lost': FunnelStage.NOT_A_FIT, 'not a fit': FunnelStage.NOT_A_FIT,
+    'registered': FunnelStage.BLUEPRINT_STARTED, 'blueprint started': FunnelStage.BLUEPRINT_STARTED,
+}
+
+# Every accepted spelling -> stage: exact values, case-folded values and member names, aliases
+STAGE_LOOKUP: Dict[str, FunnelStage] = {
+    **{name.casefold(): stage for name, stage in FunnelStage.__members__.items()},
+    **{stage.value.casefold(): stage for stage in FunnelStage},
+    **STAGE_ALIASES,
+    **{stage.value: stage for stage in FunnelStage},
+}
+
 
 
 # =============================================================================
 # DATA MODELS
 # =============================================================================
 
+def with_slots(cls):
+    """
+    Rebuild a dataclass with __slots__ (stand-in for @dataclass(slots=True),
+    which needs Python 3.10 - runtime.txt pins 3.9). Instances carry no
+    per-object __dict__, so every attribute must be a declared field.
+    """
+    names = tuple(f.name for f in fields(cls))
+    body = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ('__dict__', '__weakref__')}
+    body['__slots__'] = names
+    slotted = type(cls)(cls.__name__, cls.__bases__, body)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+@with_slots
 @dataclass
 class Rider:
     """Represents a rider in the funnel"""
+    # Change-notification hub of the owning dashboard (None while constructing / unowned).
+    # Declared first, with a factory so __init__ assigns it (slots have no class default) before any other field.
+    _hub: Optional['RiderObservers'] = field(default_factory=type(None), init=False, repr=False, compare=False)
+
     email: str
     first_name: str
     last_name: str
@@ -126,6 +196,7 @@ class Rider:
 
     # Funnel progress
     current_stage: FunnelStage = FunnelStage.CONTACT
+    stage_entered_at: Optional[datetime] = None  # Set by transition(); cleared by direct stage writes
     
     # Dates
     registered_date: Optional[datetime] = None
@@ -140,14 +211,17 @@ class Rider:
     instagram_url: Optional[str] = None
     linkedin_url: Optional[str] = None
     championship: Optional[str] = None
+    magic_link: Optional[str] = None
     
     # Review Dates & Status
     race_weekend_review_date: Optional[datetime] = None
     race_weekend_review_status: str = "pending" # pending, completed
     end_of_season_review_date: Optional[datetime] = None
     # Scores
+    day1_date: Optional[datetime] = None
     day1_score: Optional[float] = None
-    day2_scores: Optional[Dict[str, float]] = None
+    day2_scores: Optional[Dict[str, float]] = None  # Only allocated when a pillar score is found
+    biggest_mistake: Optional[str] = None
     
     # Flow Profile (Lead Magnet)
     flow_profile_date: Optional[datetime] = None
@@ -164,12 +238,11 @@ class Rider:
     mindset_score: Optional[float] = None
     mindset_result: Optional[str] = None # e.g. "Fixed Mindset", "Growth Mindset"
 
-    # Rescue tracking
-    rescue_messages_sent: List[str] = field(default_factory=list)
+    # Rescue tracking (shared empty tuple until the first rescue; replaced, never mutated)
+    rescue_messages_sent: Tuple[str, ...] = ()
     last_rescue_date: Optional[datetime] = None
 
     # Enhanced CRM Fields
-    championship: Optional[str] = None
     notes: Optional[str] = None
     follow_up_date: Optional[datetime] = None
     is_disqualified: bool = False
@@ -184,55 +257,138 @@ class Rider:
     # Metadata
     country: Optional[str] = None
     rider_type: Optional[str] = None
-    championship: Optional[str] = None
+    tags: Optional[str] = None  # Comma-separated (Airtable)
+
+    # Low-cardinality strings shared across riders (one copy per distinct value)
+    INTERNED: ClassVar[frozenset] = frozenset({
+        'championship', 'country', 'rider_type', 'race_weekend_review_status',
+        'flow_profile_result', 'mindset_result', 'tags',
+    })
+
+    # Date that best marks entry into each stage (fallback when stage_entered_at is unknown)
+    STAGE_DATE_ATTRS: ClassVar[Dict[FunnelStage, str]] = {
+        FunnelStage.MESSAGED: 'outreach_date',
+        FunnelStage.RACE_WEEKEND: 'outreach_date',
+        FunnelStage.REPLIED: 'outreach_date',
+        FunnelStage.LINK_SENT: 'outreach_date',
+        FunnelStage.BLUEPRINT_LINK_SENT: 'outreach_date',
+        FunnelStage.BLUEPRINT_STARTED: 'registered_date',
+        FunnelStage.DAY1_COMPLETE: 'day1_complete_date',
+        FunnelStage.DAY2_COMPLETE: 'day2_complete_date',
+        FunnelStage.STRATEGY_CALL_BOOKED: 'strategy_call_booked_date',
+        FunnelStage.CLIENT: 'sale_closed_date',
+        FunnelStage.FLOW_PROFILE_COMPLETED: 'flow_profile_date',
+        FunnelStage.MINDSET_QUIZ_COMPLETED: 'mindset_quiz_date',
+        FunnelStage.SLEEP_TEST_COMPLETED: 'sleep_test_date',
+        FunnelStage.RACE_REVIEW_COMPLETE: 'race_weekend_review_date',
+        FunnelStage.SEASON_REVIEW_COMPLETE: 'end_of_season_review_date',
+    }
+
+    def __setattr__(self, name, value):
+        if name == 'current_stage' and hasattr(self, 'stage_entered_at') and self.current_stage is not value:
+            # A direct stage write makes the entry stamp stale; transition() re-stamps it
+            self.stage_entered_at = None
+        elif name in Rider.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+        hub = self._hub
+        if hub is not None:
+            hub.notify(self, name)
+
+    def field_items(self):
+        """(name, value) for every data field (slots: there is no __dict__ / vars())"""
+        return ((name, getattr(self, name)) for name in self.__slots__ if name[0] != '_')
 
     @property
     def full_name(self) -> str:
         name = f"{self.first_name} {self.last_name}".strip()
         return name if name else self.email
 
+    def transition(self, new_stage: FunnelStage, at: Optional[datetime] = None, stamp: bool = True):
+        """
+        Move to a stage and stamp when it was entered (the one place stages should change).
+        Observers are notified through __setattr__. stamp=False when the entry time is
+        unknown (loaders): days_in_stage then falls back to the stage's milestone date.
+        """
+        if new_stage is not self.current_stage:
+            self.current_stage = new_stage
+        if not stamp:
+            return
+        if self.stage_entered_at is None or at is not None:
+            at = at or datetime.now()
+            self.stage_entered_at = at.replace(tzinfo=None) if at.tzinfo else at
+
+    def stage_date(self) -> Optional[datetime]:
+        """Date recorded for the current stage's milestone (naive), if any"""
+        attr = self.STAGE_DATE_ATTRS.get(self.current_stage)
+        d = getattr(self, attr, None) if attr else None
+        if d and d.tzinfo:
+            d = d.replace(tzinfo=None)
+        return d
+
+    def days_in_stage(self, now: datetime) -> int:
+        """Days since entering the current stage, against a caller-supplied 'now'"""
+        entered = self.stage_entered_at or self.stage_date()
+        if entered:
+            return (now - entered).days
+        return 0
+
     @property
     def days_in_current_stage(self) -> int:
         """Calculate days since entering current stage"""
-        stage_dates = {
-            FunnelStage.OUTREACH: self.outreach_date,
-            FunnelStage.REGISTERED: self.registered_date,
-            FunnelStage.DAY1_COMPLETE: self.day1_complete_date,
-            FunnelStage.DAY2_COMPLETE: self.day2_complete_date,
-            FunnelStage.STRATEGY_CALL_BOOKED: self.strategy_call_booked_date,
-        }
+        return self.days_in_stage(datetime.now())
 
-        stage_date = stage_dates.get(self.current_stage)
-        if stage_date:
-            return (datetime.now() - stage_date).days
-        return 0
+    # Stage -> (rescue type, FunnelConfig.RESCUE_TIMING key)
+    RESCUE_RULES: ClassVar[Dict[FunnelStage, Tuple[str, str]]] = {
+        FunnelStage.REGISTERED: ('day1_rescue', 'registration_no_day1'),        # Registered but no Day 1
+        FunnelStage.DAY1_COMPLETE: ('day2_rescue', 'day1_no_day2'),             # Day 1 complete but no Day 2
+        FunnelStage.DAY2_COMPLETE: ('strategy_call_rescue', 'day2_no_call'),    # Day 2 complete but no strategy call
+    }
+
+    def rescue_due_at(self, config: FunnelConfig = FunnelConfig()) -> Optional[Tuple[str, datetime]]:
+        """(rescue type, when it falls due) for the current stage, or None if no rescue applies"""
+        rule = self.RESCUE_RULES.get(self.current_stage)
+        if not rule or rule[0] in self.rescue_messages_sent:
+            return None
+        entered = self.stage_entered_at or self.stage_date()
+        if not entered:
+            return None
+        return rule[0], entered + timedelta(hours=config.RESCUE_TIMING[rule[1]])
 
-    def needs_rescue(self, config: FunnelConfig = FunnelConfig()) -> Tuple[bool, str]:
+    def needs_rescue(self, config: FunnelConfig = FunnelConfig(), now: Optional[datetime] = None) -> Tuple[bool, str]:
         """Check if rider needs a rescue message"""
-        now = datetime.now()
+        due = self.rescue_due_at(config)
+        if due and due[1] <= (now or datetime.now()):
+            return True, due[0]
+        return False, ''
 
-        # Registered but no Day 1
-        if self.current_stage == FunnelStage.REGISTERED and self.registered_date:
-            hours_since = (now - self.registered_date).total_seconds() / 3600
-            if hours_since >= config.RESCUE_TIMING['registration_no_day1']:
-                if 'day1_rescue' not in self.rescue_messages_sent:
-                    return True, 'day1_rescue'
-
-        # Day 1 complete but no Day 2
-        if self.current_stage == FunnelStage.DAY1_COMPLETE and self.day1_complete_date:
-            hours_since = (now - self.day1_complete_date).total_seconds() / 3600
-            if hours_since >= config.RESCUE_TIMING['day1_no_day2']:
-                if 'day2_rescue' not in self.rescue_messages_sent:
-                    return True, 'day2_rescue'
-
-        # Day 2 complete but no strategy call
-        if self.current_stage == FunnelStage.DAY2_COMPLETE and self.day2_complete_date:
-            hours_since = (now - self.day2_complete_date).total_seconds() / 3600
-            if hours_since >= config.RESCUE_TIMING['day2_no_call']:
-                if 'strategy_call_rescue' not in self.rescue_messages_sent:
-                    return True, 'strategy_call_rescue'
 
-        return False, ''
+class RiderObservers:
+    """
+    Change notifications for one dashboard's riders.
+
+    Each observer lists the Rider fields it indexes in WATCHED and gets
+    on_rider_changed(rider, name) for writes to those fields only; any other
+    write costs one dict lookup. Riders notify the hub set on them by
+    attach(), so riders still being built (hub None) notify nobody.
+    """
+
+    def __init__(self):
+        self._by_name: Dict[str, List[Any]] = {}
+
+    def add(self, observer):
+        for name in observer.WATCHED:
+            self._by_name.setdefault(name, []).append(observer)
+
+    def attach(self, riders: Iterable[Rider]):
+        for rider in riders:
+            rider._hub = self
+
+    def notify(self, rider: Rider, name: str):
+        observers = self._by_name.get(name)
+        if observers:
+            for observer in observers:
+                observer.on_rider_changed(rider, name)
 
 
 @dataclass
@@ -308,6 +464,1036 @@ class FunnelTargets:
         self.daily_outreach = max(1, self.weekly_outreach // 5)
 
 
+# =============================================================================
+# COLUMNAR RIDER TABLE
+# =============================================================================
+
+class RiderTable:
+    """
+    Columnar mirror of the riders dict, used for dashboard metrics.
+
+    Stage is stored as an int code and each date as int64 epoch seconds
+    (MISSING when unset), so the metrics become numpy masks and counts
+    instead of Python loops over Rider objects. The dashboard registers the
+    table with its RiderObservers, and it patches its row whenever a WATCHED
+    attribute of one of its riders changes.
+    """
+
+    MISSING = np.iinfo(np.int64).min
+
+    DATE_COLUMNS = (
+        'outreach_date', 'registered_date', 'day1_complete_date', 'day2_complete_date',
+        'strategy_call_booked_date', 'strategy_call_complete_date', 'sale_closed_date',
+        'flow_profile_date', 'sleep_test_date', 'mindset_quiz_date', 'follow_up_date',
+        'last_rescue_date',
+    )
+    WATCHED = ('current_stage', 'sale_value') + DATE_COLUMNS
+
+    STAGES = list(FunnelStage)  # Canonical members only (aliases resolve to these)
+    STAGE_CODES = {stage: code for code, stage in enumerate(STAGES)}
+
+    _EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self.version = 0
+        self.rebuild()
+
+    # --- conversion ------------------------------------------------------
+
+    @classmethod
+    def to_epoch(cls, value) -> int:
+        """datetime/date -> int epoch seconds (naive wall clock, as loaded)"""
+        if not value:
+            return cls.MISSING
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.combine(value, datetime.min.time())
+            except TypeError:
+                return cls.MISSING
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None)
+        return int((value - cls._EPOCH).total_seconds())
+
+    @classmethod
+    def stage_code(cls, stage) -> int:
+        return cls.STAGE_CODES.get(stage, -1)
+
+    # --- building / syncing ----------------------------------------------
+
+    def rebuild(self):
+        """Build every column from the riders dict in one pass"""
+        self._rows: List[Rider] = list(self.riders.values())
+        self._row_of: Dict[int, int] = {id(r): i for i, r in enumerate(self._rows)}
+        n = len(self._rows)
+
+        self.active = np.ones(n, dtype=bool)
+        self.stage = np.fromiter((self.stage_code(r.current_stage) for r in self._rows), dtype=np.int16, count=n)
+        self.sale_value = np.fromiter(
+            (r.sale_value if r.sale_value is not None else np.nan for r in self._rows), dtype=np.float64, count=n
+        )
+        self.dates: Dict[str, np.ndarray] = {
+            col: np.fromiter((self.to_epoch(getattr(r, col, None)) for r in self._rows), dtype=np.int64, count=n)
+            for col in self.DATE_COLUMNS
+        }
+        self._n_active = n
+        self._ledger = None
+        self.version += 1
+
+    def _grow(self):
+        """Double the column capacity so repeated add() calls stay amortised O(1)"""
+        capacity = len(self.active)
+        extra = max(capacity, 16)
+        self.active = np.concatenate([self.active, np.zeros(extra, dtype=bool)])
+        self.stage = np.concatenate([self.stage, np.full(extra, -1, dtype=np.int16)])
+        self.sale_value = np.concatenate([self.sale_value, np.full(extra, np.nan)])
+        for col in self.DATE_COLUMNS:
+            self.dates[col] = np.concatenate([self.dates[col], np.full(extra, self.MISSING, dtype=np.int64)])
+
+    def add(self, rider: Rider):
+        """Track a rider that was added to the riders dict after the build"""
+        if id(rider) in self._row_of:
+            return
+        row = len(self._rows)
+        if row >= len(self.active):
+            self._grow()
+        self._rows.append(rider)
+        self._row_of[id(rider)] = row
+        self.active[row] = True
+        self._n_active += 1
+        self._write_row(row, rider)
+
+    def remove(self, rider: Rider):
+        """Stop tracking a rider (row is tombstoned, not compacted)"""
+        row = self._row_of.pop(id(rider), None)
+        if row is None:
+            return
+        self.active[row] = False
+        self._rows[row] = None
+        self._n_active -= 1
+        self.version += 1
+
+    def _write_row(self, row: int, rider: Rider):
+        self.stage[row] = self.stage_code(rider.current_stage)
+        self.sale_value[row] = rider.sale_value if rider.sale_value is not None else np.nan
+        for col in self.DATE_COLUMNS:
+            self.dates[col][row] = self.to_epoch(getattr(rider, col, None))
+        self.version += 1
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: patch the one cell that changed"""
+        row = self._row_of.get(id(rider))
+        if row is None:
+            return
+        if name == 'current_stage':
+            self.stage[row] = self.stage_code(rider.current_stage)
+        elif name == 'sale_value':
+            self.sale_value[row] = rider.sale_value if rider.sale_value is not None else np.nan
+        elif name in self.dates:
+            self.dates[name][row] = self.to_epoch(getattr(rider, name, None))
+        else:
+            return
+        self.version += 1
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != self._n_active:
+            self.rebuild()
+
+    # --- queries ---------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return len(self._rows)
+
+    def _col(self, attr: str) -> np.ndarray:
+        self.sync()
+        return self.dates[attr][:self.size]
+
+    def stage_mask(self, stages) -> np.ndarray:
+        self.sync()
+        codes = [self.stage_code(s) for s in stages]
+        return np.isin(self.stage[:self.size], codes) & self.active[:self.size]
+
+    def has_date(self, attr: str) -> np.ndarray:
+        return (self._col(attr) != self.MISSING) & self.active[:self.size]
+
+    def stage_totals(self) -> Dict[str, int]:
+        """Current stage value -> rider count"""
+        self.sync()
+        codes = self.stage[:self.size][self.active[:self.size]]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.STAGES))
+        return {stage.value: int(counts[code]) for code, stage in enumerate(self.STAGES)}
+
+    def ledger(self) -> 'EventLedger':
+        """Time-sorted event ledger for the current version (rebuilt only after changes)"""
+        self.sync()
+        if self._ledger is None or self._ledger.version != self.version:
+            self._ledger = EventLedger(self)
+        return self._ledger
+
+
+class EventLedger:
+    """
+    Stage-transition event timestamps from a RiderTable, sorted per kind.
+
+    Each tracked date on a rider is one event ('registered_date' = entered
+    Registered, etc.). Counting events of a kind inside any [start, end)
+    range is two binary searches over that kind's sorted timestamps, so
+    day, month, timeframe and custom-range counts no longer scan riders.
+    Built lazily per table version (RiderTable.ledger()).
+    """
+
+    KINDS = (
+        'outreach_date', 'registered_date', 'day1_complete_date', 'day2_complete_date',
+        'strategy_call_booked_date', 'strategy_call_complete_date', 'sale_closed_date',
+        'flow_profile_date', 'sleep_test_date', 'mindset_quiz_date',
+    )
+
+    def __init__(self, table: RiderTable):
+        self.version = table.version
+        active = table.active[:table.size]
+
+        self._by_kind: Dict[str, np.ndarray] = {}
+        for kind in self.KINDS:
+            col = table.dates[kind][:table.size]
+            self._by_kind[kind] = np.sort(col[active & (col != RiderTable.MISSING)])
+
+    def __len__(self) -> int:
+        return sum(len(stamps) for stamps in self._by_kind.values())
+
+    def count_between(self, kind: str, start: datetime, end: datetime) -> int:
+        """Events of `kind` with start <= timestamp < end (O(log n))"""
+        stamps = self._by_kind[kind]
+        lo, hi = np.searchsorted(stamps, [RiderTable.to_epoch(start), RiderTable.to_epoch(end)], side='left')
+        return int(hi - lo)
+
+    def count_day(self, kind: str, day) -> int:
+        start = datetime.combine(day, datetime.min.time())
+        return self.count_between(kind, start, start + timedelta(days=1))
+
+    def count_month(self, kind: str, year: int, month: int) -> int:
+        start = datetime(year, month, 1)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return self.count_between(kind, start, end)
+
+
+@dataclass
+class MetricsSnapshot:
+    """
+    All rider-derived dashboard aggregates, computed together from a RiderTable.
+
+    Built once per (table version, day) by FunnelDashboard.get_metrics_snapshot()
+    and reused by every view until a rider changes. Manual outreach stats
+    (DailyStatsManager) are not rider data and are read separately.
+    """
+    version: int
+    day: datetime
+    daily: Dict[str, int] = field(default_factory=dict)
+    mtd: Dict[str, int] = field(default_factory=dict)
+    stage_counts: Dict[str, int] = field(default_factory=dict)
+    revenue: Dict[str, float] = field(default_factory=dict)
+
+    # Pipeline board timeframe filters
+    TIMEFRAMES: ClassVar[List[str]] = ["Current Month", "Last Month", "All Time", "2025 (Full Year)"]
+
+    DAILY_COLUMNS: ClassVar[List[Tuple[str, str]]] = [
+        ('outreach_sent', 'outreach_date'), ('new_registered', 'registered_date'),
+        ('day1_completed', 'day1_complete_date'), ('day2_completed', 'day2_complete_date'),
+        ('calls_booked', 'strategy_call_booked_date'), ('sales_closed', 'sale_closed_date'),
+    ]
+
+    MONTH_COLUMNS: ClassVar[List[Tuple[str, str]]] = [
+        ('registered', 'registered_date'), ('day1_complete', 'day1_complete_date'),
+        ('day2_complete', 'day2_complete_date'), ('strategy_call_booked', 'strategy_call_booked_date'),
+        ('sale_closed', 'sale_closed_date'),
+    ]
+
+    PROGRAM_COST: ClassVar[float] = 4000.0
+
+    @classmethod
+    def build(cls, table: RiderTable, revenue_target: float, now: Optional[datetime] = None) -> 'MetricsSnapshot':
+        now = now or datetime.now()
+        table.sync()
+        snap = cls(version=table.version, day=now.date())
+        snap.daily = cls.count_day(table, now.date())
+        snap.mtd = cls.count_month(table, now.year, now.month)
+        snap.stage_counts = cls.count_stages(table)
+        snap.revenue = cls.sum_revenue(table, revenue_target)
+        return snap
+
+    # --- aggregates (also used directly for non-current dates) -----------
+
+    @classmethod
+    def count_day(cls, table: RiderTable, day) -> Dict[str, int]:
+        ledger = table.ledger()
+        return {key: ledger.count_day(attr, day) for key, attr in cls.DAILY_COLUMNS}
+
+    @classmethod
+    def count_month(cls, table: RiderTable, year: int, month: int) -> Dict[str, int]:
+        ledger = table.ledger()
+        return {key: ledger.count_month(attr, year, month) for key, attr in cls.MONTH_COLUMNS}
+
+    @classmethod
+    def count_range(cls, table: RiderTable, start: datetime, end: datetime) -> Dict[str, int]:
+        """Activity counts for any [start, end) range"""
+        ledger = table.ledger()
+        return {key: ledger.count_between(attr, start, end) for key, attr in cls.MONTH_COLUMNS}
+
+    @staticmethod
+    def count_stages(table: RiderTable) -> Dict[str, int]:
+        counts = defaultdict(int, table.stage_totals())
+
+        # Also count total who reached each stage (not just current)
+        counts['total_registered'] = int(table.has_date('registered_date').sum())
+        counts['total_day1'] = int(table.has_date('day1_complete_date').sum())
+        counts['total_day2'] = int(table.has_date('day2_complete_date').sum())
+        counts['total_calls_booked'] = int(table.has_date('strategy_call_booked_date').sum())
+
+        # Map to simpler names
+        return {
+            'registered': counts['total_registered'],
+            'day1_complete': counts['total_day1'],
+            'day2_complete': counts['total_day2'],
+            'strategy_call_booked': counts['total_calls_booked'],
+            'current_registered': counts['registered'],
+            'current_day1': counts['day1_complete'],
+            'current_day2': counts['day2_complete'],
+            'current_calls': counts['strategy_call_booked'],
+        }
+
+    @classmethod
+    def sum_revenue(cls, table: RiderTable, target: float) -> Dict[str, float]:
+        sold = table.stage_mask([FunnelStage.SALE_CLOSED])
+        values = table.sale_value[:table.size][sold]
+        actual = float(np.where(np.isnan(values) | (values == 0), cls.PROGRAM_COST, values).sum())
+        pipeline_value = cls.PROGRAM_COST * 0.25 * int(table.stage_mask([FunnelStage.STRATEGY_CALL_BOOKED]).sum())
+
+        return {
+            'target': target,
+            'actual': actual,
+            'pipeline': pipeline_value,
+            'progress_pct': (actual / target) * 100 if target > 0 else 0
+        }
+
+    @staticmethod
+    def timeframe_bounds(timeframe: str, now: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """[start, end) of a board timeframe, or None for 'All Time'"""
+        if timeframe == "Current Month":
+            start = datetime(now.year, now.month, 1)
+        elif timeframe == "Last Month":
+            last_month = now.month - 1 if now.month > 1 else 12
+            start = datetime(now.year if now.month > 1 else now.year - 1, last_month, 1)
+        elif timeframe == "2025 (Full Year)":
+            return datetime(2025, 1, 1), datetime(2026, 1, 1)
+        else:
+            return None
+        end = datetime(start.year + 1, 1, 1) if start.month == 12 else datetime(start.year, start.month + 1, 1)
+        return start, end
+
+
+# =============================================================================
+# PIPELINE BOARD INDEX
+# =============================================================================
+
+# Pipeline board columns: stages shown together and the date each column sorts/filters on
+PIPELINE_STAGES = [
+    # REMOVED: "Leads/Contact" as per user request (it's in Database)
+    {"label": "Messaged", "val": [FunnelStage.MESSAGED, FunnelStage.RACE_WEEKEND], "date_attr": 'outreach_date'},
+    {"label": "Replied", "val": [FunnelStage.REPLIED], "date_attr": 'outreach_date'},
+    {"label": "Link Sent", "val": [FunnelStage.LINK_SENT, FunnelStage.BLUEPRINT_LINK_SENT], "date_attr": 'outreach_date'},
+    {"label": "Sleep Test", "val": [FunnelStage.SLEEP_TEST_COMPLETED], "date_attr": 'sleep_test_date'},
+    {"label": "Mindset Quiz", "val": [FunnelStage.MINDSET_QUIZ_COMPLETED], "date_attr": 'mindset_quiz_date'},
+    {"label": "Flow Profile", "val": [FunnelStage.FLOW_PROFILE_COMPLETED], "date_attr": 'flow_profile_date'},
+    {"label": "Registered", "val": [FunnelStage.BLUEPRINT_STARTED, FunnelStage.REGISTERED], "date_attr": 'registered_date'},
+    {"label": "Day 1", "val": [FunnelStage.DAY1_COMPLETE], "date_attr": 'day1_complete_date'},
+    {"label": "Day 2", "val": [FunnelStage.DAY2_COMPLETE], "date_attr": 'day2_complete_date'},
+    {"label": "Call Booked", "val": [FunnelStage.STRATEGY_CALL_BOOKED], "date_attr": 'strategy_call_booked_date'},
+    {"label": "Clients / Won", "val": [FunnelStage.CLIENT, FunnelStage.SALE_CLOSED], "date_attr": 'sale_closed_date'}
+]
+
+
+class StageIndex:
+    """
+    Riders bucketed by current stage, each bucket kept sorted newest-first by
+    the date its board column uses (PIPELINE_STAGES). Undated riders sort last;
+    ties keep riders-dict order, matching the board's old stable sort.
+
+    A timeframe is a contiguous date range of each bucket, so a column is two
+    bisects plus a slice. Registered as a Rider observer: a stage or stage-date
+    change moves one entry (O(log n) search; sortedcontainers is not a
+    dependency here, so plain bisect on lists).
+    """
+
+    STAGE_DATE_ATTR = {stage: col['date_attr'] for col in PIPELINE_STAGES for stage in col['val']}
+    WATCHED = {'current_stage'} | set(STAGE_DATE_ATTR.values())
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self.rebuild()
+
+    def _key(self, rider: Rider) -> int:
+        """Sort key: negated epoch so newest comes first; undated last"""
+        attr = self.STAGE_DATE_ATTR.get(rider.current_stage)
+        epoch = RiderTable.to_epoch(getattr(rider, attr, None)) if attr else RiderTable.MISSING
+        return -epoch
+
+    def rebuild(self):
+        self._buckets: Dict[FunnelStage, list] = defaultdict(list)
+        self._entry_of: Dict[int, tuple] = {}
+        self._seq = 0
+        for rider in self.riders.values():
+            self._insert(rider)
+
+    def _insert(self, rider: Rider, seq: Optional[int] = None):
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
+        entry = (self._key(rider), seq, rider)
+        bucket = self._buckets[rider.current_stage]
+        bucket.insert(bisect.bisect_left(bucket, entry[:2]), entry)
+        self._entry_of[id(rider)] = (rider.current_stage, entry)
+
+    def _discard(self, rider: Rider) -> Optional[int]:
+        found = self._entry_of.pop(id(rider), None)
+        if found is None:
+            return None
+        stage, entry = found
+        bucket = self._buckets[stage]
+        i = bisect.bisect_left(bucket, entry[:2])
+        if i < len(bucket) and bucket[i][2] is rider:
+            del bucket[i]
+        return entry[1]
+
+    def add(self, rider: Rider):
+        if id(rider) not in self._entry_of:
+            self._insert(rider)
+
+    def remove(self, rider: Rider):
+        self._discard(rider)
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: re-bucket on stage change, re-sort on stage-date change"""
+        found = self._entry_of.get(id(rider))
+        if found is None:
+            return
+        if name != 'current_stage' and name != self.STAGE_DATE_ATTR.get(found[0]):
+            return
+        seq = self._discard(rider)
+        self._insert(rider, seq)
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._entry_of):
+            self.rebuild()
+
+    def column(self, stages: List[FunnelStage], timeframe: str = "All Time",
+               limit: Optional[int] = None, now: Optional[datetime] = None) -> Tuple[int, List[Rider]]:
+        """
+        (total, riders) for a board column: riders in any of `stages` inside
+        the timeframe, newest first, cut to `limit`.
+        """
+        self.sync()
+        bounds = MetricsSnapshot.timeframe_bounds(timeframe, now or datetime.now())
+
+        total = 0
+        slices = []
+        for stage in dict.fromkeys(stages):  # Aliases resolve to the same member
+            bucket = self._buckets.get(stage, [])
+            if bounds is None:
+                lo, hi = 0, len(bucket)
+            else:
+                # epoch in [start, end)  <=>  key in (-end, -start]
+                start, end = (RiderTable.to_epoch(b) for b in bounds)
+                lo = bisect.bisect_left(bucket, (-end + 1,))
+                hi = bisect.bisect_left(bucket, (-start + 1,))
+            total += hi - lo
+            # The first `limit` of the merge can only come from the first `limit` of each slice
+            slices.append(bucket[lo:hi if limit is None else min(hi, lo + limit)])
+
+        merged = heapq.merge(*slices) if len(slices) > 1 else iter(slices[0] if slices else [])
+        return total, [entry[2] for entry in itertools.islice(merged, limit)]
+
+
+class StageClock:
+    """
+    Per-stage min-heaps of riders keyed on stage_entered_at (oldest first).
+
+    "Who has been in stage X since before T" walks only the part of the heap
+    at or below T, so stalled/rescue lists cost O(k) for k matches instead of
+    recomputing days for every rider. Updates are lazy: a stage or stamp
+    change pushes a fresh entry and the old one is skipped (and eventually
+    compacted away). Registered as a Rider observer.
+    """
+
+    WATCHED = {'current_stage', 'stage_entered_at'} | set(Rider.STAGE_DATE_ATTRS.values())
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self.rebuild()
+
+    @staticmethod
+    def _stamp(rider: Rider) -> Optional[int]:
+        entered = rider.stage_entered_at or rider.stage_date()
+        return RiderTable.to_epoch(entered) if entered else None
+
+    def rebuild(self):
+        self._heaps: Dict[FunnelStage, list] = defaultdict(list)
+        self._current: Dict[int, tuple] = {}
+        self._live: Dict[FunnelStage, int] = defaultdict(int)
+        self._seq = itertools.count()
+        for rider in self.riders.values():
+            self._track(rider, push=False)
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+    def _untrack(self, rider: Rider):
+        state = self._current.pop(id(rider), None)
+        if state and state[1] is not None:
+            self._live[state[0]] -= 1
+
+    def _track(self, rider: Rider, push: bool = True):
+        self._untrack(rider)
+        stage, stamp, seq = rider.current_stage, self._stamp(rider), next(self._seq)
+        self._current[id(rider)] = (stage, stamp, seq)
+        if stamp is None:
+            return
+        self._live[stage] += 1
+        heap = self._heaps[stage]
+        entry = (stamp, seq, rider)
+        if not push:
+            heap.append(entry)
+            return
+        heapq.heappush(heap, entry)
+        # Compact when stale entries dominate
+        if len(heap) > 64 and len(heap) > 2 * self._live[stage]:
+            heap[:] = [e for e in heap if self._is_live(e, stage)]
+            heapq.heapify(heap)
+
+    def _is_live(self, entry: tuple, stage: FunnelStage) -> bool:
+        return self._current.get(id(entry[2])) == (stage, entry[0], entry[1])
+
+    def add(self, rider: Rider):
+        if id(rider) not in self._current:
+            self._track(rider)
+
+    def remove(self, rider: Rider):
+        self._untrack(rider)
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: re-key on stage or stage-date changes"""
+        state = self._current.get(id(rider))
+        if state is None:
+            return
+        if name in ('current_stage', 'stage_entered_at') or name == Rider.STAGE_DATE_ATTRS.get(rider.current_stage):
+            if (rider.current_stage, self._stamp(rider)) != state[:2]:
+                self._track(rider)
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._current):
+            self.rebuild()
+
+    def entered_before(self, stage: FunnelStage, cutoff: datetime) -> List[Rider]:
+        """Riders currently in `stage` who entered it at or before `cutoff`, oldest first"""
+        self.sync()
+        limit = RiderTable.to_epoch(cutoff)
+        heap = self._heaps.get(stage, [])
+        found = []
+        # Depth-first walk of the heap; a child is never older than its parent
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            entry = heap[i]
+            if entry[0] > limit:
+                continue
+            if self._is_live(entry, stage):
+                found.append(entry)
+            stack.extend(c for c in (2 * i + 1, 2 * i + 2) if c < len(heap))
+        found.sort()
+        return [entry[2] for entry in found]
+
+    def count_entered_since(self, stage: FunnelStage, cutoff: datetime) -> int:
+        """Riders currently in `stage` who entered it after `cutoff` (unknown entry time excluded)"""
+        self.sync()
+        return self._live.get(stage, 0) - len(self.entered_before(stage, cutoff))
+
+
+# =============================================================================
+# RIDER SEARCH INDEX
+# =============================================================================
+
+class RiderSearchIndex:
+    """
+    Prebuilt search over the rider database views.
+
+    Each rider row keeps one normalised text string (name, email,
+    championship, phone, notes) and every word of it is indexed by its
+    prefixes. A row matches when the normalised query is a substring of
+    its text (the old search_text behaviour). Query words that follow a
+    separator must start a word of any matching row, so for queries like
+    "ann.smith@gmail" or "john smi" their prefix sets give the candidate
+    rows and only those are substring-checked; a single word (which may sit
+    inside a word, e.g. "son" in "johnson") scans the cached text column.
+    Stage filtering is a numpy mask on the row stage codes. Registered as a
+    Rider observer so edits re-index just the one row.
+    """
+
+    TEXT_ATTRS = ('first_name', 'last_name', 'email', 'championship', 'phone', 'notes')
+    WATCHED = ('current_stage',) + TEXT_ATTRS
+    MAX_PREFIX = 8  # longer query words use their first MAX_PREFIX chars (candidates are substring-checked anyway)
+    WORD = re.compile(r'\w+')  # Unicode-aware: "josé" is one word
+    STAGES = list(FunnelStage)
+    STAGE_CODE = {stage: i for i, stage in enumerate(STAGES)}
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self.rebuild()
+
+    @staticmethod
+    def normalise(text: str) -> str:
+        return ' '.join(str(text).casefold().split())
+
+    @classmethod
+    def tokens(cls, text: str) -> List[str]:
+        return cls.WORD.findall(text)
+
+    def _text(self, rider: Rider) -> str:
+        return self.normalise(' '.join(str(getattr(rider, a, '') or '') for a in self.TEXT_ATTRS))
+
+    def rebuild(self):
+        self._rows: List[Rider] = []
+        self._row_of: Dict[int, int] = {}
+        self._texts: List[str] = []
+        self._words: List[set] = []
+        self._prefix: Dict[str, set] = defaultdict(set)
+        self._stage: List[int] = []
+        self._alive: List[bool] = []
+        self._columns: Optional[Tuple[np.ndarray, np.ndarray]] = None  # (stage, alive) arrays for masking
+        self._text_col: Optional[pd.Series] = None
+        self._memo: Dict[tuple, np.ndarray] = {}
+        self.version = 0
+        for rider in self.riders.values():
+            self.add(rider)
+
+    def _index_words(self, pos: int, words: set):
+        for word in words:
+            for n in range(1, min(len(word), self.MAX_PREFIX) + 1):
+                self._prefix[word[:n]].add(pos)
+
+    def _unindex_words(self, pos: int, words: set):
+        for word in words:
+            for n in range(1, min(len(word), self.MAX_PREFIX) + 1):
+                hits = self._prefix.get(word[:n])
+                if hits is not None:
+                    hits.discard(pos)
+
+    def _changed(self):
+        self.version += 1
+        self._columns = None
+        self._text_col = None
+        self._memo.clear()
+
+    def add(self, rider: Rider):
+        if id(rider) in self._row_of:
+            return
+        pos = len(self._rows)
+        text = self._text(rider)
+        words = set(self.tokens(text))
+        self._rows.append(rider)
+        self._row_of[id(rider)] = pos
+        self._texts.append(text)
+        self._words.append(words)
+        self._index_words(pos, words)
+        self._stage.append(self.STAGE_CODE.get(rider.current_stage, -1))
+        self._alive.append(True)
+        self._changed()
+
+    def remove(self, rider: Rider):
+        pos = self._row_of.pop(id(rider), None)
+        if pos is None:
+            return
+        self._unindex_words(pos, self._words[pos])
+        self._words[pos] = set()
+        self._texts[pos] = ''
+        self._alive[pos] = False
+        self._changed()
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: re-index one row on text or stage edits"""
+        pos = self._row_of.get(id(rider))
+        if pos is None:
+            return
+        if name == 'current_stage':
+            self._stage[pos] = self.STAGE_CODE.get(rider.current_stage, -1)
+        elif name in self.TEXT_ATTRS:
+            self._unindex_words(pos, self._words[pos])
+            self._texts[pos] = self._text(rider)
+            self._words[pos] = set(self.tokens(self._texts[pos]))
+            self._index_words(pos, self._words[pos])
+        else:
+            return
+        self._changed()
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._row_of):
+            self.rebuild()
+
+    def _candidates(self, query: str) -> Optional[set]:
+        """
+        Superset of the rows containing `query`: rows where every query word that
+        follows a separator is a prefix of some indexed word. None when no word
+        qualifies (the query's only word may start mid-word - scan instead).
+        """
+        hits = None
+        words = [m.group() for m in self.WORD.finditer(query) if m.start() > 0]
+        for word in sorted(words, key=len, reverse=True):
+            rows = self._prefix.get(word[:self.MAX_PREFIX], set())
+            hits = set(rows) if hits is None else hits & rows
+            if not hits:
+                return set()
+        return hits
+
+    def match(self, query: str = '', stages: Optional[List[FunnelStage]] = None) -> np.ndarray:
+        """Matching row positions (riders-dict order); memoised per query until the next edit"""
+        self.sync()
+        query = self.normalise(query or '')
+        stage_key = tuple(sorted(self.STAGE_CODE[s] for s in stages)) if stages else None
+        key = (query, stage_key)
+        if key in self._memo:
+            return self._memo[key]
+
+        if self._columns is None:
+            self._columns = (np.array(self._stage, dtype=np.int16), np.array(self._alive, dtype=bool))
+        stage_col, alive_col = self._columns
+        mask = alive_col.copy()
+        if stage_key is not None:
+            mask &= np.isin(stage_col, stage_key)
+        if query:
+            candidates = self._candidates(query)
+            if candidates is not None:
+                text_mask = np.zeros(len(self._rows), dtype=bool)
+                text_mask[[p for p in candidates if query in self._texts[p]]] = True
+            else:
+                if self._text_col is None:
+                    self._text_col = pd.Series(self._texts, dtype=object)
+                text_mask = self._text_col.str.contains(query, regex=False).to_numpy(dtype=bool)
+            mask &= text_mask
+
+        positions = np.flatnonzero(mask)
+        if len(self._memo) > 64:
+            self._memo.clear()
+        self._memo[key] = positions
+        return positions
+
+    def search(self, query: str = '', stages: Optional[List[FunnelStage]] = None,
+               page: int = 1, per_page: int = 50) -> Tuple[int, List[Rider]]:
+        """(total matches, riders on the requested 1-based page)"""
+        positions = self.match(query, stages)
+        start = max(page - 1, 0) * per_page
+        return len(positions), self.riders_at(positions[start:start + per_page])
+
+    def riders_at(self, positions) -> List[Rider]:
+        return [self._rows[p] for p in positions]
+
+
+# =============================================================================
+# RIDER FRAME CACHE
+# =============================================================================
+
+class RiderFrameCache:
+    """
+    Versioned DataFrame projection of the riders for the database view.
+
+    The frame is rebuilt only when a projected rider field changes (Rider
+    observer hook bumps `version`), not on every rerun. CSV / Parquet
+    exports are produced lazily from the current frame and kept until the
+    next change.
+    """
+
+    ATTRS = {'first_name', 'last_name', 'email', 'current_stage', 'outreach_channel',
+             'outreach_date', 'phone', 'championship', 'notes'}
+    WATCHED = ATTRS
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self._ids = {id(r) for r in riders.values()}
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._exports: Dict[str, Optional[bytes]] = {}
+        self._search_text: Optional[pd.Series] = None  # Casefolded row text over every column
+        self._built_version = -1
+
+    def _bump(self):
+        self.version += 1
+        self._exports.clear()
+        self._search_text = None
+
+    def add(self, rider: Rider):
+        if id(rider) not in self._ids:
+            self._ids.add(id(rider))
+            self._bump()
+
+    def remove(self, rider: Rider):
+        if id(rider) in self._ids:
+            self._ids.discard(id(rider))
+            self._bump()
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: any projected field edit invalidates the frame"""
+        if name in self.ATTRS and id(rider) in self._ids:
+            self._bump()
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._ids):
+            self._ids = {id(r) for r in self.riders.values()}
+            self._bump()
+
+    @staticmethod
+    def _row(r: Rider) -> Dict[str, Any]:
+        # Robust enum handling
+        stage_val = r.current_stage.value if hasattr(r.current_stage, "value") else str(r.current_stage)
+        channel_val = r.outreach_channel.value if hasattr(r.outreach_channel, "value") else str(r.outreach_channel)
+        return {
+            "First Name": r.first_name,
+            "Last Name": r.last_name,
+            "Email": r.email,
+            "Stage": stage_val,
+            "Channel": channel_val,
+            "Date Joined": r.outreach_date.strftime('%Y-%m-%d') if r.outreach_date else None,
+            "Phone": r.phone,
+            "Championship": r.championship,
+            "Notes": r.notes
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """Current projection (shared; callers filter, never mutate)"""
+        self.sync()
+        if self._frame is None or self._built_version != self.version:
+            self._frame = pd.DataFrame([self._row(r) for r in self.riders.values()])
+            self._built_version = self.version
+        return self._frame
+
+    def search(self, term: str) -> pd.DataFrame:
+        """Rows where any column contains `term` (case-insensitive, literal)"""
+        df = self.frame()
+        if self._search_text is None:
+            cols = [df[c].fillna('').astype(str).str.casefold() for c in df.columns]
+            text = cols[0] if cols else pd.Series([], dtype=object)
+            for col in cols[1:]:
+                text = text + '\x1f' + col  # Separator no query contains: no cross-column matches
+            self._search_text = text
+        return df[self._search_text.str.contains(term.casefold(), regex=False)]
+
+    def export(self, fmt: str = 'csv') -> Optional[bytes]:
+        """Lazily rendered export of the full frame; None if the format is unavailable"""
+        self.sync()
+        if fmt not in self._exports:
+            df = self.frame()
+            if fmt == 'csv':
+                self._exports[fmt] = df.to_csv(index=False).encode('utf-8')
+            elif fmt == 'parquet':
+                try:
+                    self._exports[fmt] = df.to_parquet(index=False)
+                except ImportError:
+                    print("pyarrow/fastparquet not installed - Parquet export unavailable")
+                    self._exports[fmt] = None
+            else:
+                raise ValueError(f"Unknown export format: {fmt}")
+        return self._exports[fmt]
+
+
+# =============================================================================
+# COHORT ANALYTICS
+# =============================================================================
+
+@dataclass
+class CohortStats:
+    """Funnel progress of one cohort (riders sharing a registration period/channel/championship)"""
+    size: int = 0
+    reached: Dict[str, int] = field(default_factory=dict)       # stage date attr -> riders with that date
+    converted: Dict[str, int] = field(default_factory=dict)     # step -> riders with both dates of the step
+    durations: Dict[str, np.ndarray] = field(default_factory=dict)  # step -> days taken, per converted rider
+
+
+class CohortEngine:
+    """
+    Cohort conversion cube keyed by (period, channel, championship).
+
+    Riders are grouped by the week or month of registered_date. Each cohort
+    holds stage-to-stage conversion counts and time-to-convert samples.
+    The cube is cached per cohort: when a rider's dates, channel or
+    championship change (Rider observer hook) only the cohorts it left and
+    joined are recomputed, on next read.
+    """
+
+    # Funnel steps as (step name, from date, to date)
+    STEPS = [
+        ('registration_to_day1', 'registered_date', 'day1_complete_date'),
+        ('day1_to_day2', 'day1_complete_date', 'day2_complete_date'),
+        ('day2_to_strategy_call', 'day2_complete_date', 'strategy_call_booked_date'),
+        ('strategy_call_to_sale', 'strategy_call_booked_date', 'sale_closed_date'),
+    ]
+
+    TRACKED = {'registered_date', 'day1_complete_date', 'day2_complete_date',
+               'strategy_call_booked_date', 'sale_closed_date', 'outreach_channel', 'championship'}
+    WATCHED = TRACKED
+
+    def __init__(self, riders: Dict[str, Rider], period: str = 'month'):
+        self.riders = riders
+        self.period = period  # 'week' | 'month'
+        self.rebuild()
+
+    # --- keys ------------------------------------------------------------
+
+    def period_of(self, d: Optional[datetime]) -> Optional[str]:
+        if not d:
+            return None
+        if self.period == 'week':
+            monday = d.date() - timedelta(days=d.weekday())
+            return monday.isoformat()
+        return d.strftime('%Y-%m')
+
+    def cohort_key(self, rider: Rider) -> Optional[Tuple[str, str, str]]:
+        period = self.period_of(rider.registered_date)
+        if period is None:
+            return None
+        channel = rider.outreach_channel.value if isinstance(rider.outreach_channel, OutreachChannel) else (rider.outreach_channel or 'unknown')
+        championship = (rider.championship or '').strip() or 'Unknown'
+        return period, channel, championship
+
+    # --- membership / invalidation ---------------------------------------
+
+    def rebuild(self):
+        self._cohort_of: Dict[int, Optional[tuple]] = {}
+        self._members: Dict[tuple, Dict[int, Rider]] = defaultdict(dict)
+        self._cube: Dict[tuple, CohortStats] = {}
+        self._dirty = set()
+        for rider in self.riders.values():
+            self._place(rider)
+
+    def _place(self, rider: Rider):
+        old = self._cohort_of.get(id(rider))
+        new = self.cohort_key(rider)
+        if old is not None:
+            self._members[old].pop(id(rider), None)
+            self._dirty.add(old)
+        self._cohort_of[id(rider)] = new
+        if new is not None:
+            self._members[new][id(rider)] = rider
+            self._dirty.add(new)
+
+    def add(self, rider: Rider):
+        if id(rider) not in self._cohort_of:
+            self._place(rider)
+
+    def remove(self, rider: Rider):
+        key = self._cohort_of.pop(id(rider), None)
+        if key is not None:
+            self._members[key].pop(id(rider), None)
+            self._dirty.add(key)
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: move the rider between cohorts / mark its cohort stale"""
+        if name in self.TRACKED and id(rider) in self._cohort_of:
+            self._place(rider)
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._cohort_of):
+            self.rebuild()
+
+    # --- cube ------------------------------------------------------------
+
+    def _compute(self, members: List[Rider]) -> CohortStats:
+        stats = CohortStats(size=len(members))
+        for attr in ['registered_date'] + [step[2] for step in self.STEPS]:
+            stats.reached[attr] = sum(1 for r in members if getattr(r, attr))
+        for step, start_attr, end_attr in self.STEPS:
+            days = []
+            for r in members:
+                start, end = getattr(r, start_attr), getattr(r, end_attr)
+                if start and end:
+                    start = start.replace(tzinfo=None) if start.tzinfo else start
+                    end = end.replace(tzinfo=None) if end.tzinfo else end
+                    days.append(max((end - start).total_seconds() / 86400, 0.0))
+            stats.converted[step] = len(days)
+            stats.durations[step] = np.array(days, dtype=np.float64)
+        return stats
+
+    def cube(self) -> Dict[tuple, CohortStats]:
+        """All cohorts, recomputing only the stale ones"""
+        self.sync()
+        for key in self._dirty:
+            members = list(self._members.get(key, {}).values())
+            if members:
+                self._cube[key] = self._compute(members)
+            else:
+                self._cube.pop(key, None)
+        self._dirty.clear()
+        return self._cube
+
+    def rollup(self, since: Optional[str] = None, channel: Optional[str] = None,
+               championship: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Step conversion over the matching cohorts: (converted, entered, rate,
+        median_days) per step. `since` is an inclusive period key ('2025-06').
+        """
+        converted = defaultdict(int)
+        entered = defaultdict(int)
+        durations = defaultdict(list)
+        for (period, ch, champ), stats in self.cube().items():
+            if since and period < since:
+                continue
+            if channel and ch != channel:
+                continue
+            if championship and champ != championship:
+                continue
+            for step, start_attr, _ in self.STEPS:
+                entered[step] += stats.reached[start_attr]
+                converted[step] += stats.converted[step]
+                durations[step].append(stats.durations[step])
+
+        result = {}
+        for step, _, _ in self.STEPS:
+            samples = np.concatenate(durations[step]) if durations[step] else np.empty(0)
+            result[step] = {
+                'converted': converted[step],
+                'entered': entered[step],
+                'rate': converted[step] / entered[step] if entered[step] else 0.0,
+                'median_days': float(np.median(samples)) if len(samples) else None,
+            }
+        return result
+
+    def to_frame(self, by: Optional[str] = None) -> pd.DataFrame:
+        """
+        One row per period (optionally split by 'channel' or 'championship')
+        with cohort size, step rates and median days.
+        """
+        groups = defaultdict(list)
+        for (period, ch, champ), stats in self.cube().items():
+            extra = {'channel': ch, 'championship': champ}.get(by)
+            groups[(period, extra) if by else (period,)].append(stats)
+
+        rows = []
+        for key in sorted(groups):
+            stats_list = groups[key]
+            row = {'Cohort': key[0]}
+            if by:
+                row[by.title()] = key[1]
+            row['Registered'] = sum(s.size for s in stats_list)
+            for step, start_attr, _ in self.STEPS:
+                entered = sum(s.reached[start_attr] for s in stats_list)
+                converted = sum(s.converted[step] for s in stats_list)
+                samples = np.concatenate([s.durations[step] for s in stats_list])
+                row[f"{step} %"] = round(100 * converted / entered, 1) if entered else None
+                row[f"{step} days"] = round(float(np.median(samples)), 1) if len(samples) else None
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
 # =============================================================================
 # FUNNEL CALCULATOR
 # =============================================================================
@@ -315,14 +1501,47 @@ class FunnelTargets:
 class FunnelCalculator:
     """Calculate required activities to hit revenue targets"""
 
+    # Funnel steps in order (conversion rate keys)
+    STEPS = [
+        'outreach_to_registration',
+        'registration_to_day1',
+        'day1_to_day2',
+        'day2_to_strategy_call',
+        'strategy_call_to_sale',
+    ]
+
+    # Weight of the default rates as a Beta prior, in pseudo-observations
+    PRIOR_STRENGTH = 20
+
     def __init__(self, config: FunnelConfig = None):
         self.config = config or FunnelConfig()
         self.conversion_rates = dict(self.config.DEFAULT_CONVERSION_RATES)
+        # Observed (successes, trials) per step, for the Monte Carlo forecast
+        self.conversion_evidence: Dict[str, Tuple[int, int]] = {}
 
     def update_conversion_rates(self, rates: Dict[str, float]):
         """Update conversion rates based on actual data"""
         self.conversion_rates.update(rates)
 
+    def update_conversion_evidence(self, evidence: Dict[str, Tuple[int, int]]):
+        """Record observed (successes, trials) per funnel step"""
+        self.conversion_evidence.update(evidence)
+
+    def rate_posteriors(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Beta(alpha, beta) per step: the default rate as a prior worth
+        PRIOR_STRENGTH observations, updated with the observed counts.
+        """
+        posteriors = {}
+        for step in self.STEPS:
+            prior = self.config.DEFAULT_CONVERSION_RATES[step]
+            alpha = prior * self.PRIOR_STRENGTH
+            beta = (1 - prior) * self.PRIOR_STRENGTH
+            successes, trials = self.conversion_evidence.get(step, (0, 0))
+            successes = min(successes, trials)  # Stage totals are not strictly nested
+            posteriors[step] = (alpha + successes, beta + trials - successes)
+        return posteriors
+
     def calculate_targets(self,
                          monthly_revenue_target: float = None,
                          average_deal_value: float = None) -> FunnelTargets:
@@ -394,6 +1613,54 @@ class FunnelCalculator:
         }
 
 
+    def forecast_distribution(self,
+                              current_outreach: int,
+                              current_registrations: int,
+                              current_day1: int,
+                              current_day2: int,
+                              current_calls: int,
+                              simulations: int = 20000,
+                              seed: Optional[int] = 0) -> Dict[str, Any]:
+        """
+        Monte Carlo version of forecast_revenue.
+
+        Each simulated month draws its conversion rates from rate_posteriors()
+        and pushes riders through the funnel with binomial draws, all months
+        in one batched NumPy pass. Returns P10/P50/P90 bands for revenue and
+        sales, the outreach needed to hit the revenue target, and the chance
+        of hitting it. A fixed seed keeps the bands stable between reruns.
+        """
+        rng = np.random.default_rng(seed)
+        posteriors = self.rate_posteriors()
+        rates = np.column_stack([rng.beta(*posteriors[step], size=simulations) for step in self.STEPS])
+
+        # Flow: new outreach feeds registrations; riders already in a stage join the next step's pool
+        registrations = rng.binomial(current_outreach, rates[:, 0])
+        day1 = rng.binomial(current_registrations + registrations, rates[:, 1])
+        day2 = rng.binomial(current_day1 + day1, rates[:, 2])
+        calls = rng.binomial(current_day2 + day2, rates[:, 3])
+        sales = rng.binomial(current_calls + calls, rates[:, 4])
+        revenue = sales * self.config.AVERAGE_DEAL_VALUE
+
+        # Outreach needed for the target at each sampled set of rates
+        target = self.config.MONTHLY_REVENUE_TARGET
+        sales_needed = int(target / self.config.AVERAGE_DEAL_VALUE) + 1
+        required_outreach = np.ceil(sales_needed / np.prod(rates, axis=1))
+
+        def bands(values: np.ndarray) -> Dict[str, float]:
+            p10, p50, p90 = np.percentile(values, [10, 50, 90])
+            return {'p10': float(p10), 'p50': float(p50), 'p90': float(p90)}
+
+        return {
+            'revenue': bands(revenue),
+            'sales': bands(sales),
+            'calls': bands(current_calls + calls),
+            'required_outreach': bands(required_outreach),
+            'prob_hit_target': float((revenue >= target).mean()),
+            'simulations': simulations,
+        }
+
+
 # =============================================================================
 # RESCUE MESSAGE SYSTEM
 # =============================================================================
@@ -526,19 +1793,95 @@ I've got some spots open - shall I send the booking link?"""
                 )
             }
 
-    def get_riders_needing_rescue(self, riders: List[Rider]) -> Dict[str, List[Rider]]:
-        """Identify all riders needing rescue messages"""
-        rescue_needed = {
-            'day1_rescue': [],
-            'day2_rescue': [],
-            'strategy_call_rescue': []
-        }
 
-        for rider in riders:
-            needs_rescue, rescue_type = rider.needs_rescue()
-            if needs_rescue:
-                rescue_needed[rescue_type].append(rider)
+class RescueScheduler:
+    """
+    Priority queue of rescue due-times (Rider.rescue_due_at).
+
+    A rider is scheduled when they enter Registered, Day 1 or Day 2 and the
+    entry is invalidated when they advance or the rescue is marked sent
+    (observer hook, lazy deletion; stale entries are compacted away like
+    StageClock's). due() pops only the entries that have come due since the
+    last call, O(k log n), and keeps them until they are sent or the rider
+    moves on.
+    """
+
+    WATCHED = {'current_stage', 'stage_entered_at', 'rescue_messages_sent'} | set(Rider.STAGE_DATE_ATTRS.values())
+
+    def __init__(self, riders: Dict[str, Rider], config: FunnelConfig = FunnelConfig()):
+        self.riders = riders
+        self.config = config
+        self.rebuild()
+
+    def rebuild(self):
+        self._heap = []
+        self._pending: Dict[int, tuple] = {}   # id(rider) -> (rescue_type, due_epoch, seq)
+        self._due: Dict[int, tuple] = {}       # popped, still actionable
+        self._live = 0                         # riders with a scheduled rescue
+        self._seq = itertools.count()
+        for rider in self.riders.values():
+            self._schedule(rider, push=False)
+        heapq.heapify(self._heap)
+
+    def _unschedule(self, rider: Rider):
+        if self._pending.pop(id(rider), None):
+            self._live -= 1
+
+    def _schedule(self, rider: Rider, push: bool = True):
+        self._unschedule(rider)
+        due = rider.rescue_due_at(self.config)
+        if not due:
+            self._pending[id(rider)] = None
+            return
+        state = (due[0], RiderTable.to_epoch(due[1]), next(self._seq))
+        self._pending[id(rider)] = state
+        self._live += 1
+        entry = (state[1], state[2], rider, state[0])
+        if not push:
+            self._heap.append(entry)
+            return
+        heapq.heappush(self._heap, entry)
+        # Compact when stale entries dominate
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._live:
+            self._heap[:] = [e for e in self._heap if self._is_live(*e)]
+            heapq.heapify(self._heap)
+
+    def _is_live(self, due_epoch: int, seq: int, rider: Rider, rescue_type: str) -> bool:
+        return self._pending.get(id(rider)) == (rescue_type, due_epoch, seq)
+
+    def add(self, rider: Rider):
+        if id(rider) not in self._pending:
+            self._schedule(rider)
+
+    def remove(self, rider: Rider):
+        self._unschedule(rider)
 
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: reschedule when stage, entry time or sent rescues change"""
+        if id(rider) not in self._pending:
+            return
+        if name in ('current_stage', 'stage_entered_at', 'rescue_messages_sent') or name == Rider.STAGE_DATE_ATTRS.get(rider.current_stage):
+            self._schedule(rider)
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._pending):
+            self.rebuild()
+
+    def due(self, now: Optional[datetime] = None) -> Dict[str, List[Rider]]:
+        """Riders whose rescue is due, by rescue type, most overdue first"""
+        self.sync()
+        limit = RiderTable.to_epoch(now or datetime.now())
+        while self._heap and self._heap[0][0] <= limit:
+            due_epoch, seq, rider, rescue_type = heapq.heappop(self._heap)
+            if self._is_live(due_epoch, seq, rider, rescue_type):
+                self._due[id(rider)] = (due_epoch, seq, rider, rescue_type)
+
+        rescue_needed = {rule[0]: [] for rule in Rider.RESCUE_RULES.values()}
+        for key in [k for k, entry in self._due.items() if not self._is_live(*entry)]:
+            del self._due[key]
+        for due_epoch, seq, rider, rescue_type in sorted(self._due.values(), key=lambda e: e[:2]):
+            rescue_needed[rescue_type].append(rider)
         return rescue_needed
 
 
@@ -761,6 +2104,7 @@ class DataLoader:
         self.riders: Dict[str, Rider] = {}
         self.load_report = {'total': 0, 'loaded': 0, 'skipped': 0, 'reasons': {}}
         self.overrides = overrides or {}
+        self.observers: Optional[RiderObservers] = None  # Owning dashboard's hub (riders created later join it)
         
         # Initialize Airtable Manager
         self.airtable = None
@@ -813,6 +2157,14 @@ class DataLoader:
         # --- FINAL OVERRIDE: AIRTABLE (Source of Truth for Cloud) ---
         self._load_from_airtable()
 
+        # Sent rescues (after every source so riders exist)
+        self._load_rescue_log()
+
+        # Stamp stage entry for riders whose stage came from a source file (not a manual move)
+        for rider in self.riders.values():
+            if rider.stage_entered_at is None:
+                rider.stage_entered_at = rider.stage_date()
+
         return self.riders
 
 
@@ -911,20 +2263,10 @@ class DataLoader:
             # Stage Mapping
             stage_str = r.get('Stage')
             if stage_str:
-                s_clean = stage_str.strip().lower()
-                found_stage = None
-                for stage in FunnelStage:
-                    if stage.value.lower() == s_clean:
-                        found_stage = stage
-                        break
-                    # Aliases
-                    if s_clean in ['messaged', 'outreach']: found_stage = FunnelStage.MESSAGED
-                    if s_clean in ['client', 'won']: found_stage = FunnelStage.CLIENT
-                    if s_clean in ['lost', 'not a fit']: found_stage = FunnelStage.NOT_A_FIT
-                    if s_clean in ['registered', 'blueprint started']: found_stage = FunnelStage.BLUEPRINT_STARTED
-
+                # Values, aliases and case variants (STAGE_LOOKUP)
+                found_stage = FunnelStage.from_text(stage_str)
                 if found_stage:
-                    rider.current_stage = found_stage
+                    rider.transition(found_stage, stamp=False)
 
         # CRM Fields (The "State" we need to persist)
         if r.get('Notes'): rider.notes = r.get('Notes')
@@ -1013,7 +2355,7 @@ class DataLoader:
 
                 # MIGRATION FIX
                 if rider.current_stage == FunnelStage.MESSAGED and not rider.outreach_date:
-                     rider.current_stage = FunnelStage.CONTACT
+                     rider.transition(FunnelStage.CONTACT, stamp=False)
                 
                 # --- 4. SOCIALS (Broad matching) ---
                 # Facebook
@@ -1073,32 +2415,20 @@ class DataLoader:
                 # Allow explicit overwrite of stage from CSV
                 status_raw = row.get('status') or row.get('stage')
                 if status_raw:
-                    # Try to map string to Enum
-                    # We iterate enums to find match
-                    found_stage = None
-                    s_clean = status_raw.strip().lower()
-                    
-                    for stage in FunnelStage:
-                        if stage.value.lower() == s_clean:
-                            found_stage = stage
-                            break
-                        # Alias checks
-                        if s_clean == 'client' or s_clean == 'won': found_stage = FunnelStage.CLIENT
-                        if s_clean == 'lost' or s_clean == 'not a fit': found_stage = FunnelStage.NOT_A_FIT
-                        if s_clean == 'messaged' or s_clean == 'outreach': found_stage = FunnelStage.MESSAGED
-                    
+                    # Map string to Enum (values, aliases and case variants - STAGE_LOOKUP)
+                    found_stage = FunnelStage.from_text(status_raw)
                     if found_stage:
-                        rider.current_stage = found_stage
+                        rider.transition(found_stage, stamp=False)
                 
                 # Boolean Flags (Client / Not a fit) - Overrides status if present
                 is_client = row.get('client') or row.get('is_client')
                 if is_client and str(is_client).lower() in ['yes', 'true', '1', 'y']:
-                    rider.current_stage = FunnelStage.CLIENT
+                    rider.transition(FunnelStage.CLIENT, stamp=False)
                     if not rider.sale_closed_date: rider.sale_closed_date = datetime.now() # Approximate
                 
                 not_fit = row.get('not a fit') or row.get('not_fit') or row.get('dq')
                 if not_fit and str(not_fit).lower() in ['yes', 'true', '1', 'y']:
-                    rider.current_stage = FunnelStage.NOT_A_FIT
+                    rider.transition(FunnelStage.NOT_A_FIT, stamp=False)
                     rider.is_disqualified = True
 
                 # Follow Up Date
@@ -1157,6 +2487,34 @@ class DataLoader:
 
     def add_new_rider_to_db(self, email: str, first_name: str, last_name: str, fb_url: str, ig_url: str = "", championship: str = "", **kwargs) -> bool:
         """Manually add a new rider to Rider Database.csv"""
+        entry = dict(kwargs)
+        entry.update({
+            'email': email,
+            'first_name': first_name,
+            'last_name': last_name,
+            'fb_url': fb_url,
+            'ig_url': ig_url,
+            'championship': championship,
+        })
+        return bool(self.add_new_riders_to_db([entry]))
+
+    def add_new_riders_to_db(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk-add riders to Rider Database.csv (write-behind batch).
+
+        Each entry is a dict with 'email', 'first_name', 'last_name' and optional
+        'fb_url', 'ig_url', 'championship', 'phone', 'notes', 'follow_up_date'.
+
+        All rows are written with ONE file open, the overrides DataFrame is
+        extended with ONE concat and Airtable gets ONE batch upsert per merge
+        key. Riders Airtable accepted are migrated (add_new_rider would delete
+        their sheet row straight after), so only the rest go to Google Sheets,
+        in ONE append call. Returns the emails that were added (empty list
+        on failure).
+        """
+        if not entries:
+            return []
+
         filename = "Rider Database.csv"
         filepath = os.path.join(self.data_dir, filename)
         
@@ -1164,7 +2522,24 @@ class DataLoader:
         # We'll use standard ScoreApp/Export headers to match
         fieldnames = ['Full Name', 'Email Address', 'First Name', 'Last Name', 'Facebook URL', 'Instagram URL', 'Championship', 'Phone Number', 'Status', 'Date Joined', 'Notes']
         
-        full_name = f"{first_name} {last_name}".strip()
+        now = datetime.now()
+        rows = []
+        for e in entries:
+            first_name = e.get('first_name') or ''
+            last_name = e.get('last_name') or ''
+            rows.append({
+                'Full Name': f"{first_name} {last_name}".strip(),
+                'Email Address': e['email'],
+                'First Name': first_name,
+                'Last Name': last_name,
+                'Facebook URL': e.get('fb_url') or '',
+                'Instagram URL': e.get('ig_url') or '',
+                'Championship': e.get('championship') or '',
+                'Phone Number': e.get('phone') or '',
+                'Status': 'Contact',
+                'Date Joined': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'Notes': e.get('notes') or 'Added via App'
+            })
         
         try:
             file_exists = os.path.exists(filepath)
@@ -1175,144 +2550,109 @@ class DataLoader:
                 if not file_exists:
                     writer.writeheader()
                     
-                writer.writerow({
-                    'Full Name': full_name,
-                    'Email Address': email,
-                    'First Name': first_name,
-                    'Last Name': last_name,
-                    'Facebook URL': fb_url,
-                    'Instagram URL': ig_url,
-                    'Championship': championship,
-                    'Phone Number': kwargs.get('phone', ''),
-                    'Status': 'Contact',
-                    'Date Joined': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'Notes': kwargs.get('notes', 'Added via App')
-                })
+                writer.writerows(rows)
             
-            # --- AIRTABLE SYNC (CLOUD NATIVE) ---
+            # --- AIRTABLE SYNC (CLOUD NATIVE, ONE BATCH PER MERGE KEY) ---
+            synced = set()  # Indexes of rows Airtable accepted
             if self.airtable:
                 try:
-                    at_data = {
-                        "Email": email,
-                        "First Name": first_name,
-                        "Last Name": last_name,
-                        "Facebook URL": fb_url,
-                        "Instagram URL": ig_url,
-                        "Championship": championship,
-                        "Phone Number": kwargs.get('phone', ''),
-                        "Notes": kwargs.get('notes', ''),
-                    }
-                    if 'follow_up_date' in kwargs and kwargs['follow_up_date']:
-                        at_data['Follow Up Date'] = kwargs['follow_up_date'].strftime('%Y-%m-%d')
+                    groups = defaultdict(list)
+                    for i, (e, row) in enumerate(zip(entries, rows)):
+                        at_data = {
+                            "Email": row['Email Address'],
+                            "First Name": row['First Name'],
+                            "Last Name": row['Last Name'],
+                            "Facebook URL": row['Facebook URL'],
+                            "Instagram URL": row['Instagram URL'],
+                            "Championship": row['Championship'],
+                            "Phone Number": row['Phone Number'],
+                            "Notes": e.get('notes') or '',
+                            "Stage": row['Status'],
+                        }
+                        if e.get('follow_up_date'):
+                            at_data['Follow Up Date'] = e['follow_up_date'].strftime('%Y-%m-%d')
+                        key = self.airtable.batch_key(at_data)
+                        if key:
+                            groups[key].append((i, at_data))
                         
-                    self.airtable.upsert_rider(at_data)
-                except Exception: pass
+                    # A group counts as synced only if every row of it was sent
+                    for group in groups.values():
+                        if self.airtable.batch_upsert_riders([at_data for _, at_data in group]) == len(group):
+                            synced.update(i for i, _ in group)
+                except Exception as e:
+                    print(f"Airtable Sync Error: {e}")
                 
             # CRITICAL: Also update overrides if they exist (GSheet Mode)
             # because reload_data() prefers overrides over the file we just wrote.
             if self.overrides and filename in self.overrides:
                 df = self.overrides[filename]
                 if isinstance(df, pd.DataFrame):
-                    new_row = {
-                        'Full Name': full_name,
-                        'Email Address': email,
-                        'First Name': first_name,
-                        'Last Name': last_name,
-                        'Facebook URL': fb_url,
-                        'Instagram URL': ig_url,
-                        'Championship': championship,
-                        'Phone Number': '',
-                        'Status': 'Contact',
-                        'Date Joined': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'Notes': 'Added via App'
-                    }
                     # Append strictly matching existing columns to avoid errors
                     # Only add keys that exist in current DF to be safe
-                    safe_row = {k: v for k, v in new_row.items() if k in df.columns}
+                    safe_rows = [{k: v for k, v in row.items() if k in df.columns} for row in rows]
                     
-                    # Create 1-row DF
-                    row_df = pd.DataFrame([safe_row])
-                    # Concat
-                    self.overrides[filename] = pd.concat([df, row_df], ignore_index=True)
+                    # One concat for the whole batch
+                    self.overrides[filename] = pd.concat([df, pd.DataFrame(safe_rows)], ignore_index=True)
 
-                    # --- GSHEET WRITE-BACK ---
+                    # --- GSHEET WRITE-BACK (ONE APPEND, riders Airtable didn't take) ---
                     try:
-                        import streamlit as st
-                        import gsheets_loader
-                        
+                        unsynced = [row for i, row in enumerate(rows) if i not in synced]
                         # Only proceed if we have the URL and the loader module
-                        if "sheets" in st.secrets and "rider_db" in st.secrets["sheets"]:
+                        if unsynced and "sheets" in st.secrets and "rider_db" in st.secrets["sheets"]:
                             sheet_url = st.secrets["sheets"]["rider_db"]
                             
                             # Construct row values based on the DataFrame keys (Source of Truth for Column Order)
                             # This ensures we put the email in the 'email' column, not 'id' etc.
-                            sheet_row = []
-                            for col in df.columns:
-                                val = ""
-                                c = str(col).lower().strip()
-                                
-                                if c in ['full name', 'full_name', 'name']: val = full_name
-                                elif c in ['email', 'email address', 'email_address']: val = email
-                                elif c in ['first name', 'first_name']: val = first_name
-                                elif c in ['last name', 'last_name']: val = last_name
-                                elif c in ['facebook url', 'facebook_url', 'fb']: val = fb_url
-                                elif c in ['instagram url', 'instagram_url', 'instagram', 'ig']: val = ig_url
-                                elif c in ['championship']: val = championship
-                                elif c in ['date_joined', 'date joined']: val = datetime.now().strftime('%Y-%m-%d')
-                                elif c in ['status', 'stage']: val = 'Contact'
-                                elif c in ['notes', 'comments']: val = 'Added via App'
-                                elif c in ['id']: 
-                                    # Generate a temp ID or leave blank? 
-                                    # Let's use a random ID to minimize collision if the sheet doesn't auto-gen
-                                    val = str(random.randint(2000000, 9999999)) 
-                                
-                                sheet_row.append(val)
+                            sheet_rows = [self._sheet_row_for_columns(df.columns, row) for row in unsynced]
                                 
-                            # Append to Sheet
-                            success = gsheets_loader.append_row_to_sheet(sheet_url, sheet_row)
+                            success = gsheets_loader.append_rows_to_sheet(sheet_url, sheet_rows)
                             if success:
-                                print(f"Successfully appended {email} to Google Sheet")
+                                print(f"Successfully appended {len(sheet_rows)} riders to Google Sheet")
                             else:
                                 print("Failed to append to Google Sheet")
                                 
-                    except ImportError:
-                        pass # Not running in Streamlit or gsheets_loader missing
                     except Exception as e:
                         print(f"GSheet Sync Error: {e}")
                 
             # Update In-Memory
-            rider = self._get_or_create_rider(email, first_name, last_name)
-            if fb_url:
-                rider.facebook_url = fb_url
-            if ig_url:
-                rider.instagram_url = ig_url
-            if championship:
-                rider.championship = championship
+            for row in rows:
+                rider = self._get_or_create_rider(row['Email Address'], row['First Name'], row['Last Name'])
+                if row['Facebook URL']:
+                    rider.facebook_url = row['Facebook URL']
+                if row['Instagram URL']:
+                    rider.instagram_url = row['Instagram URL']
+                if row['Championship']:
+                    rider.championship = row['Championship']
                 
-            return True
+            return [row['Email Address'] for row in rows]
         except Exception as e:
-            print(f"Error adding rider: {e}")
-            return False
-
-            # --- AIRTABLE SYNC ---
-            if self.airtable:
-                 try:
-                     self.airtable.upsert_rider({
-                         "Email": email,
-                         "First Name": first_name,
-                         "Last Name": last_name,
-                         "FB URL": fb_url,
-                         "IG URL": ig_url,
-                         "Stage": "Contact",
-                         "Date Blueprint Started": datetime.now().strftime('%Y-%m-%d')
-                     })
-                     print(f"Synced {email} to Airtable")
-                 except Exception as e:
-                     print(f"Airtable Sync Error: {e}")
-
-            return True
+            print(f"Error adding riders: {e}")
+            return []
+
+    def _sheet_row_for_columns(self, columns, row: Dict[str, Any]) -> List[str]:
+        """Order a Rider Database row to match the Google Sheet's header"""
+        sheet_row = []
+        for col in columns:
+            val = ""
+            c = str(col).lower().strip()
+            
+            if c in ['full name', 'full_name', 'name']: val = row['Full Name']
+            elif c in ['email', 'email address', 'email_address']: val = row['Email Address']
+            elif c in ['first name', 'first_name']: val = row['First Name']
+            elif c in ['last name', 'last_name']: val = row['Last Name']
+            elif c in ['facebook url', 'facebook_url', 'fb']: val = row['Facebook URL']
+            elif c in ['instagram url', 'instagram_url', 'instagram', 'ig']: val = row['Instagram URL']
+            elif c in ['championship']: val = row['Championship']
+            elif c in ['date_joined', 'date joined']: val = row['Date Joined'][:10]
+            elif c in ['status', 'stage']: val = 'Contact'
+            elif c in ['notes', 'comments']: val = row['Notes']
+            elif c in ['id']: 
+                # Use a random ID to minimize collision if the sheet doesn't auto-gen
+                val = str(random.randint(2000000, 9999999)) 
+            
+            sheet_row.append(val)
+        return sheet_row
 
-        
     def _scan_for_social_and_reviews(self):
         """Scan all CSVs in dir for Social Media columns and Review dates"""
         if not os.path.exists(self.data_dir):
@@ -1426,6 +2766,45 @@ class DataLoader:
         if rider:
             rider.sale_value = amount
 
+    def save_rescue_sent(self, email: str, rescue_type: str):
+        """Log a sent rescue message so restarts don't re-flag the rider"""
+        filepath = os.path.join(self.data_dir, 'rescue_log.csv')
+        
+        with open(filepath, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(['email', 'rescue_type', 'timestamp'])
+            writer.writerow([email, rescue_type, datetime.now().isoformat()])
+            
+        # Update in-memory (reassign so observers see the change)
+        rider = self.riders.get(email.lower())
+        if rider and rescue_type not in rider.rescue_messages_sent:
+            rider.rescue_messages_sent = rider.rescue_messages_sent + (rescue_type,)
+            rider.last_rescue_date = datetime.now()
+
+    def _load_rescue_log(self):
+        """Load rescue_log.csv"""
+        filepath = os.path.join(self.data_dir, 'rescue_log.csv')
+        if not os.path.exists(filepath):
+            return
+            
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    email = row.get('email', '').strip().lower()
+                    rescue_type = row.get('rescue_type', '').strip()
+                    if not email or not rescue_type or email not in self.riders:
+                        continue
+                    rider = self.riders[email]
+                    if rescue_type not in rider.rescue_messages_sent:
+                        rider.rescue_messages_sent = rider.rescue_messages_sent + (rescue_type,)
+                    sent_at = self._parse_date(row.get('timestamp', ''))
+                    if sent_at and (not rider.last_rescue_date or sent_at > rider.last_rescue_date):
+                        rider.last_rescue_date = sent_at
+        except Exception:
+            pass
+
     def _load_revenue_log(self):
         """Load revenue_log.csv"""
         filepath = os.path.join(self.data_dir, 'revenue_log.csv')
@@ -1447,13 +2826,20 @@ class DataLoader:
                         rider.sale_value = amount
                         # Assume sale closed if revenue present
                         if rider.current_stage != FunnelStage.SALE_CLOSED:
-                             rider.current_stage = FunnelStage.SALE_CLOSED
+                             rider.transition(FunnelStage.SALE_CLOSED, stamp=False)
         except Exception:
             pass
 
     def save_manual_update(self, email: str, stage: FunnelStage):
         """Save a manual stage update to CSV"""
+        self.save_manual_updates([(email, stage)])
+
+    def save_manual_updates(self, updates: List[Tuple[str, str]]):
+        """Save many (email, stage value) manual updates with one file append"""
+        if not updates:
+            return
         filepath = os.path.join(self.data_dir, 'manual_updates.csv')
+        now = datetime.now()
         
         # Write mode 'a' (append)
         with open(filepath, 'a', newline='', encoding='utf-8') as f:
@@ -1462,21 +2848,16 @@ class DataLoader:
             if f.tell() == 0:
                 writer.writerow(['email', 'stage', 'timestamp'])
                 
-            writer.writerow([email, stage, datetime.now().isoformat()])
+            writer.writerows([email, stage, now.isoformat()] for email, stage in updates)
             
         # Update in-memory
-        if email in self.riders:
-            matched_stage = None
-            for s in FunnelStage:
-                if s.value == stage:
-                    matched_stage = s
-                    break
-            
-            if matched_stage:
-                self.riders[email].current_stage = matched_stage
+        for email, stage in updates:
+            matched_stage = FunnelStage.from_text(stage)
+            if email in self.riders and matched_stage:
+                self.riders[email].transition(matched_stage, at=now)
                 # Update date in memory for immediate UI feedback
                 if matched_stage == FunnelStage.MESSAGED:
-                    self.riders[email].outreach_date = datetime.now()
+                    self.riders[email].outreach_date = now
 
             
     def save_rider_details(self, email: str, **kwargs):
@@ -1689,22 +3070,17 @@ class DataLoader:
                         continue
                         
                     # Find matching enum
-                    matched_stage = None
-                    for stage in FunnelStage:
-                        if stage.value == stage_val:
-                            matched_stage = stage
-                            break
+                    matched_stage = FunnelStage.from_text(stage_val)
                     
                     if matched_stage:
                          rider = self._get_or_create_rider(email)
-                         rider.current_stage = matched_stage
+                         ts = self._parse_date(timestamp_str)
+                         rider.transition(matched_stage, at=ts)
                          
                          # DATE FIX: If manually moving to Messaged, use timestamp as outreach_date
                          # Always overwrite to ensure we have the actual interaction time, not just join date
-                         if matched_stage == FunnelStage.MESSAGED and timestamp_str:
-                             ts = self._parse_date(timestamp_str)
-                             if ts:
-                                 rider.outreach_date = ts
+                         if matched_stage == FunnelStage.MESSAGED and ts:
+                             rider.outreach_date = ts
 
         except Exception:
             pass # Ignore corrupt manual file
@@ -1723,6 +3099,8 @@ class DataLoader:
             '%m/%d/%Y',
             '%Y-%m-%dT%H:%M:%S.%fZ', # ISO
             '%Y-%m-%dT%H:%M:%SZ',
+            '%Y-%m-%dT%H:%M:%S.%f', # datetime.isoformat() (manual_updates.csv)
+            '%Y-%m-%dT%H:%M:%S',
         ]
 
         for fmt in formats:
@@ -1784,7 +3162,7 @@ class DataLoader:
                     new_stage = FunnelStage.BLUEPRINT_STARTED
             
             if new_stage:
-                rider.current_stage = new_stage
+                rider.transition(new_stage, stamp=False)
 
             # --- AIRTABLE SYNC ---
             if self.airtable:
@@ -1865,7 +3243,7 @@ class DataLoader:
                 # This ensures they show up as "Messaged"
                 # Only upgrade if they are currently lower (e.g. Contact or Outreach)
                 if rider.current_stage in [FunnelStage.CONTACT, FunnelStage.OUTREACH]:
-                     rider.current_stage = FunnelStage.MESSAGED
+                     rider.transition(FunnelStage.MESSAGED, stamp=False)
 
                 # Update Outreach Date (Earliest message)
                 try:
@@ -1899,6 +3277,8 @@ class DataLoader:
                 first_name=first_name.strip() if first_name else '',
                 last_name=last_name.strip() if last_name else ''
             )
+            if self.observers is not None:
+                self.riders[email_key]._hub = self.observers
         else:
             # Update name if we have better info
             rider = self.riders[email_key]
@@ -1925,7 +3305,7 @@ class DataLoader:
             )
 
             # Update stage to strategy call booked
-            rider.current_stage = FunnelStage.STRATEGY_CALL_BOOKED
+            rider.transition(FunnelStage.STRATEGY_CALL_BOOKED, stamp=False)
             
             # Robust Date Parsing
             date_val = (row.get('submit_date_utc', '') or 
@@ -1972,7 +3352,7 @@ class DataLoader:
 
             # Only update if not already further in funnel
             if rider.current_stage == FunnelStage.OUTREACH:
-                rider.current_stage = FunnelStage.REGISTERED
+                rider.transition(FunnelStage.REGISTERED, stamp=False)
 
             # Robust Date Parsing
             date_val = (row.get('submit_date_utc', '') or 
@@ -2014,7 +3394,7 @@ class DataLoader:
 
             # Update stage if not already further
             if rider.current_stage in [FunnelStage.OUTREACH, FunnelStage.REGISTERED]:
-                rider.current_stage = FunnelStage.DAY1_COMPLETE
+                rider.transition(FunnelStage.DAY1_COMPLETE, stamp=False)
 
             # Robust Date Parsing
             date_val = (row.get('scorecard_finished_at', '') or 
@@ -2050,7 +3430,7 @@ class DataLoader:
 
             # Update stage if not already further
             if rider.current_stage in [FunnelStage.OUTREACH, FunnelStage.REGISTERED, FunnelStage.DAY1_COMPLETE]:
-                rider.current_stage = FunnelStage.DAY2_COMPLETE
+                rider.transition(FunnelStage.DAY2_COMPLETE, stamp=False)
 
             # Robust Date Parsing
             date_val = (row.get('submit_date_utc', '') or 
@@ -2063,7 +3443,7 @@ class DataLoader:
             rider.day2_complete_date = self._parse_date(date_val)
 
             # Extract pillar scores
-            rider.day2_scores = {}
+            day2_scores = {}
             pillar_keys = [
                 ('Pillar 1', 'mindset'),
                 ('Pillar 2', 'preparation'),
@@ -2076,12 +3456,14 @@ class DataLoader:
                 for col in row.keys():
                     if csv_key.lower() in col.lower() and 'rate' in col.lower():
                         try:
-                            rider.day2_scores[score_key] = float(row[col])
+                            day2_scores[score_key] = float(row[col])
                         except (ValueError, TypeError):
                             pass
                         except (ValueError, TypeError):
                             pass
                         break
+            if day2_scores:
+                rider.day2_scores = day2_scores
 
             # --- AIRTABLE SYNC ---
             if self.airtable:
@@ -2123,7 +3505,7 @@ class DataLoader:
             
             # --- UPDATE STAGE ---
             if rider.current_stage in [FunnelStage.CONTACT, FunnelStage.OUTREACH]:
-                rider.current_stage = FunnelStage.SLEEP_TEST_COMPLETED
+                rider.transition(FunnelStage.SLEEP_TEST_COMPLETED, stamp=False)
             
             # --- AIRTABLE SYNC ---
             if self.airtable:
@@ -2170,7 +3552,7 @@ class DataLoader:
 
             # --- UPDATE STAGE ---
             if rider.current_stage in [FunnelStage.CONTACT, FunnelStage.OUTREACH]:
-                rider.current_stage = FunnelStage.MINDSET_QUIZ_COMPLETED
+                rider.transition(FunnelStage.MINDSET_QUIZ_COMPLETED, stamp=False)
 
             # --- AIRTABLE SYNC ---
             if self.airtable:
@@ -2219,7 +3601,7 @@ class DataLoader:
             # --- UPDATE STAGE ---
             # If they are just a contact, move them to Flow Profile Completed so they show on dashboard
             if rider.current_stage in [FunnelStage.CONTACT, FunnelStage.OUTREACH]:
-                rider.current_stage = FunnelStage.FLOW_PROFILE_COMPLETED
+                rider.transition(FunnelStage.FLOW_PROFILE_COMPLETED, stamp=False)
             
             # Derive result from URL if possible, or use a default if not clear
             # The prompt implies the result might be "Go Getter" or "Deep Thinker"
@@ -2281,35 +3663,366 @@ class DataLoader:
 
 
 # =============================================================================
-# FUNNEL DASHBOARD
+# DUPLICATE DETECTION
 # =============================================================================
 
-class FunnelDashboard:
-    """Main dashboard for funnel management"""
+@dataclass
+class MergeGroup:
+    """One set of records that refer to the same rider"""
+    keep: str                       # Surviving identity (email or slug)
+    merge: List[str] = field(default_factory=list)  # Identities folded into `keep`
+    reason: str = "exact_email"     # exact_email | same_name | fuzzy_name
+    score: float = 1.0
+    csv_rows: int = 0               # Rider Database.csv rows collapsing into `keep`
 
-    def __init__(self, data_dir: str, overrides: Optional[Dict[str, Any]] = None):
-        self.data_dir = data_dir
-        self.data_loader = DataLoader(data_dir, overrides=overrides)
-        self.calculator = FunnelCalculator()
-        self.rescue_manager = RescueMessageManager()
-        self.followup_manager = FollowUpMessageManager()
-        self.daily_stats = DailyStatsManager(data_dir) # Init Manual Stats
-        # Initialize Race Manager after data load
-        self.riders: Dict[str, Rider] = {}
-        
-        # Load data first
-        self.reload_data()
-        
-        # Now init race manager with populated loader
-        self.race_manager = RaceResultManager(self.data_loader)
+
+@dataclass
+class MergePlan:
+    """Reviewable output of RiderDeduplicator.build_plan()"""
+    groups: List[MergeGroup] = field(default_factory=list)
+    ambiguous: List[List[str]] = field(default_factory=list)  # Name matches spanning several real emails (left alone)
 
     @property
-    def airtable(self):
-        return self.data_loader.airtable
+    def removed_count(self) -> int:
+        """Duplicate records this plan removes (merged identities + surplus CSV rows)"""
+        return sum(len(g.merge) + max(g.csv_rows - 1 - len(g.merge), 0) for g in self.groups)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Flat table for review in the UI"""
+        return pd.DataFrame([{
+            'Keep': g.keep,
+            'Merge': ", ".join(g.merge),
+            'Reason': g.reason,
+            'Score': round(g.score, 2),
+            'CSV Rows': g.csv_rows,
+        } for g in self.groups])
+
+
+class RiderDeduplicator:
+    """
+    Finds and merges duplicate riders.
+
+    Exact duplicates: rows of Rider Database.csv sharing an identity key are
+    collapsed with a vectorised groupby().first() (first non-empty value per column).
+
+    Fuzzy duplicates: the 'no_email_...' and name-slug identities created by
+    _load_rider_database / _load_facebook_history are matched by name against
+    other riders. Riders are blocked by surname token, so names are only
+    compared within a block, never every pair.
+    """
+
+    FILENAME = "Rider Database.csv"
+
+    # Short forms that should match their full first name
+    NICKNAMES = {
+        'josh': 'joshua', 'joe': 'joseph', 'jim': 'james', 'jamie': 'james',
+        'mike': 'michael', 'matt': 'matthew', 'chris': 'christopher',
+        'nick': 'nicholas', 'tom': 'thomas', 'tommy': 'thomas', 'rob': 'robert',
+        'bob': 'robert', 'will': 'william', 'bill': 'william', 'dan': 'daniel',
+        'danny': 'daniel', 'dave': 'david', 'alex': 'alexander', 'sam': 'samuel',
+        'ben': 'benjamin', 'andy': 'andrew', 'tony': 'anthony', 'steve': 'stephen',
+        'jon': 'jonathan', 'ed': 'edward', 'charlie': 'charles', 'harry': 'henry',
+    }
 
-    def reload_data(self):
-        """Reload all data from CSV files"""
+    def __init__(self, dashboard: 'FunnelDashboard', fuzzy_threshold: float = 0.88):
+        self.dashboard = dashboard
+        self.data_loader = dashboard.data_loader
+        self.fuzzy_threshold = fuzzy_threshold
+
+    # --- helpers ---------------------------------------------------------
+
+    @staticmethod
+    def _norm_name(name: str) -> str:
+        clean = "".join(c for c in (name or "").lower() if c.isalnum() or c == ' ')
+        return " ".join(clean.split())
+
+    @staticmethod
+    def _is_real_email(identity: str) -> bool:
+        return '@' in identity
+
+    def _first_name_match(self, a: str, b: str) -> bool:
+        a = self.NICKNAMES.get(a, a)
+        b = self.NICKNAMES.get(b, b)
+        if a == b:
+            return True
+        short, long_ = sorted((a, b), key=len)
+        return len(short) >= 3 and long_.startswith(short)
+
+    def _read_db_frame(self) -> Optional[pd.DataFrame]:
+        """
+        Read Rider Database.csv as strings. Read with the csv module (like
+        _get_data_iter) because appended rows can be ragged; short rows are
+        padded and surplus fields kept in unnamed '_extra_N' columns.
+        """
+        filepath = os.path.join(self.data_loader.data_dir, self.FILENAME)
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows:
+            return None
+        header, body = rows[0], rows[1:]
+        width = max([len(header)] + [len(r) for r in body])
+        columns = header + [f"_extra_{i}" for i in range(width - len(header))]
+        return pd.DataFrame([r + [''] * (width - len(r)) for r in body], columns=columns, dtype=str)
+
+    def _write_db_frame(self, df: pd.DataFrame):
+        filepath = os.path.join(self.data_loader.data_dir, self.FILENAME)
+        header = ['' if str(c).startswith('_extra_') else c for c in df.columns]
+        df.to_csv(filepath, index=False, header=header, encoding='utf-8-sig')
+
+    @staticmethod
+    def _db_columns(df: pd.DataFrame) -> Dict[str, Optional[str]]:
+        """Locate identity/name columns the same way _load_rider_database does"""
+        lower = {str(c).lower().strip(): c for c in df.columns}
+        email_col = next((c for lc, c in lower.items() if 'email' in lc), None)
+        first_col = next((lower[k] for k in ['first name', 'first_name', 'firstname'] if k in lower), None)
+        last_col = next((lower[k] for k in ['last name', 'last_name', 'lastname', 'surname'] if k in lower), None)
+        full_col = next((lower[k] for k in ['name', 'full name', 'fullname', 'rider', 'competitor', 'driver', 'rider name'] if k in lower), None)
+        id_col = next((lower[k] for k in ['id', 'user_id'] if k in lower), None)
+        return {'email': email_col, 'first': first_col, 'last': last_col, 'full': full_col, 'id': id_col}
+
+    def _db_keys(self, df: pd.DataFrame, cols: Dict[str, Optional[str]]) -> pd.Series:
+        """Vectorised identity key per CSV row (email, no_email_ id, or name slug)"""
+        empty = pd.Series('', index=df.index)
+        email = df[cols['email']].str.strip().str.lower() if cols['email'] else empty
+
+        if cols['id']:
+            ids = df[cols['id']].str.strip().str.lower()
+            email = email.where(email != '', ids.where(ids.str.startswith('no_email_'), ''))
+
+        if cols['first']:
+            name = df[cols['first']].str.strip()
+            if cols['last']:
+                name = name + ' ' + df[cols['last']].str.strip()
+        elif cols['full']:
+            name = df[cols['full']].str.strip()
+        else:
+            name = empty
+
+        slug = (name.str.lower().str.strip().str.replace(' ', '_', regex=False)
+                    .str.replace(r'[^\w]', '', regex=True))
+        return email.where(email != '', slug)
+
+    # --- planning --------------------------------------------------------
+
+    def build_plan(self) -> MergePlan:
+        """Detect exact (CSV) and fuzzy (name) duplicates without changing anything"""
+        from difflib import SequenceMatcher
+
+        plan = MergePlan()
+        groups: Dict[str, MergeGroup] = {}
+
+        # 1. Fuzzy name matches among in-memory riders (blocked by surname)
+        riders = self.dashboard.riders
+        blocks = defaultdict(list)
+        for identity, rider in riders.items():
+            tokens = self._norm_name(rider.full_name if rider.full_name != rider.email else "").split()
+            if len(tokens) >= 2:
+                blocks[tokens[-1]].append((identity, tokens))
+
+        parent = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                parent[x] = parent.get(parent[x], parent[x])
+                x = parent[x]
+            return x
+
+        pair_info = {}
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            for i in range(len(members)):
+                id_a, tok_a = members[i]
+                for j in range(i + 1, len(members)):
+                    id_b, tok_b = members[j]
+                    # Two real emails are two people; only slug identities are candidates
+                    if self._is_real_email(id_a) and self._is_real_email(id_b):
+                        continue
+
+                    if tok_a == tok_b:
+                        reason, score = 'same_name', 1.0
+                    elif tok_a[1:] == tok_b[1:] and self._first_name_match(tok_a[0], tok_b[0]):
+                        reason, score = 'fuzzy_name', 0.92
+                    else:
+                        score = SequenceMatcher(None, " ".join(tok_a), " ".join(tok_b)).ratio()
+                        if score < self.fuzzy_threshold:
+                            continue
+                        reason = 'fuzzy_name'
+
+                    parent.setdefault(id_a, id_a)
+                    parent.setdefault(id_b, id_b)
+                    parent[find(id_a)] = find(id_b)
+                    for identity in (id_a, id_b):
+                        if score > pair_info.get(identity, ('', -1.0))[1]:
+                            pair_info[identity] = (reason, score)
+
+        clusters = defaultdict(list)
+        for identity in parent:
+            clusters[find(identity)].append(identity)
+
+        for members in clusters.values():
+            real = [m for m in members if self._is_real_email(m)]
+            if len(real) > 1:
+                plan.ambiguous.append(sorted(members))
+                continue
+
+            keep = real[0] if real else max(
+                sorted(members),
+                key=lambda m: sum(1 for _, v in riders[m].field_items() if v not in (None, '', [], {}, ()))
+            )
+            merge = sorted(m for m in members if m != keep)
+            reason, score = min((pair_info[m] for m in merge), key=lambda p: p[1])
+            groups[keep] = MergeGroup(keep=keep, merge=merge, reason=reason, score=score)
+
+        # 2. Exact duplicates in Rider Database.csv (vectorised)
+        df = self._read_db_frame()
+        if df is not None and not df.empty:
+            cols = self._db_columns(df)
+            keys = self._db_keys(df, cols)
+            mapping = {m: g.keep for g in groups.values() for m in g.merge}
+            mapped = keys.map(mapping).fillna(keys)
+            counts = mapped[mapped != ''].value_counts()
+
+            for key, n in counts[counts > 1].items():
+                if key in groups:
+                    groups[key].csv_rows = int(n)
+                else:
+                    groups[key] = MergeGroup(keep=key, reason='exact_email', csv_rows=int(n))
+            for key, g in groups.items():
+                if not g.csv_rows and key in counts.index:
+                    g.csv_rows = int(counts[key])
+
+        plan.groups = [g for g in groups.values() if g.merge or g.csv_rows > 1]
+        return plan
+
+    # --- applying --------------------------------------------------------
+
+    def apply_plan(self, plan: MergePlan) -> Dict[str, int]:
+        """Apply a plan to memory, Rider Database.csv and Airtable in one pass"""
+        result = {'riders_merged': 0, 'csv_rows_removed': 0, 'airtable_deleted': 0}
+        if not plan.groups:
+            return result
+
+        riders = self.dashboard.riders
+        mapping = {m: g.keep for g in plan.groups for m in g.merge}
+
+        # 1. Memory: fold duplicate riders into the survivor
+        for g in plan.groups:
+            keep = riders.get(g.keep)
+            for identity in g.merge:
+                dup = riders.get(identity)
+                if keep is None or dup is None:
+                    continue
+                self._merge_rider(keep, dup)
+                del riders[identity]
+                self.dashboard._unregister(dup)
+                result['riders_merged'] += 1
+
+        # 2. CSV: re-key merged rows and collapse every group with one groupby().first()
+        df = self._read_db_frame()
+        if df is not None and not df.empty:
+            cols = self._db_columns(df)
+            keys = self._db_keys(df, cols)
+            mapped = keys.map(mapping).fillna(keys)
+
+            # Rows that already carry the surviving identity win column ties
+            order = (mapped != keys).astype(int).sort_values(kind='stable').index
+            work = df.loc[order].replace('', pd.NA)
+            work['_key'] = mapped.loc[order]
+
+            # A slug row merged into an email rider must carry that email from now on
+            if cols['email']:
+                needs_email = work[cols['email']].isna() & work['_key'].str.contains('@', regex=False)
+                work.loc[needs_email, cols['email']] = work.loc[needs_email, '_key']
+
+            keyed = work[work['_key'] != '']
+            unkeyed = work[work['_key'] == '']
+            deduped = keyed.groupby('_key', sort=False).first().reset_index(drop=True)
+            deduped = pd.concat([deduped, unkeyed.drop(columns=['_key'])], ignore_index=True)
+            deduped = deduped[list(df.columns)].fillna('')
+
+            removed = len(df) - len(deduped)
+            if removed > 0:
+                self._write_db_frame(deduped)
+            result['csv_rows_removed'] = removed
+
+        # 3. Airtable: one batch upsert of survivors, one batch delete of merged records
+        if self.data_loader.airtable and mapping:
+            try:
+                survivors = [riders[g.keep] for g in plan.groups if g.merge and g.keep in riders]
+                self.data_loader.airtable.batch_upsert_riders(
+                    [self.dashboard._airtable_record(r) for r in survivors]
+                )
+                result['airtable_deleted'] = self.data_loader.airtable.delete_riders(list(mapping.keys()))
+            except Exception as e:
+                print(f"Airtable Dedupe Sync Error: {e}")
+
+        return result
+
+    @staticmethod
+    def _merge_rider(keep: Rider, dup: Rider):
+        """Fill gaps in `keep` from `dup` (keep's own values always win)"""
+        for name, dup_val in dup.field_items():
+            if name == 'email' or dup_val in (None, '', [], {}, ()):
+                continue
+            if name == 'current_stage':
+                if keep.current_stage == FunnelStage.CONTACT:
+                    keep.transition(dup_val, at=dup.stage_entered_at, stamp=dup.stage_entered_at is not None)
+                continue
+            if getattr(keep, name, None) in (None, '', [], {}, ()):
+                setattr(keep, name, dup_val)
+
+
+# =============================================================================
+# FUNNEL DASHBOARD
+# =============================================================================
+
+class FunnelDashboard:
+    """Main dashboard for funnel management"""
+
+    def __init__(self, data_dir: str, overrides: Optional[Dict[str, Any]] = None):
+        self.data_dir = data_dir
+        self.data_loader = DataLoader(data_dir, overrides=overrides)
+        self.calculator = FunnelCalculator()
+        self.rescue_manager = RescueMessageManager()
+        self.followup_manager = FollowUpMessageManager()
+        self.daily_stats = DailyStatsManager(data_dir) # Init Manual Stats
+        # Initialize Race Manager after data load
+        self.riders: Dict[str, Rider] = {}
+        
+        # Load data first
+        self.reload_data()
+        
+        # Now init race manager with populated loader
+        self.race_manager = RaceResultManager(self.data_loader, dashboard=self)
+
+    @property
+    def airtable(self):
+        return self.data_loader.airtable
+
+    def reload_data(self):
+        """Reload all data from CSV files"""
+        self.data_loader.observers = None  # Nothing is indexed while loading
         self.riders = self.data_loader.load_all_data()
+        self.rider_table = RiderTable(self.riders)
+        self.stage_index = StageIndex(self.riders)
+        self.stage_clock = StageClock(self.riders)
+        self.rescue_scheduler = RescueScheduler(self.riders, self.calculator.config)
+        self.cohorts = CohortEngine(self.riders, period='month')
+        self.search_index = RiderSearchIndex(self.riders)
+        self.rider_frame = RiderFrameCache(self.riders)
+        self._extra_cohorts: Dict[str, CohortEngine] = {}  # other periods, built on demand
+        # Every derived index with add()/remove(); riders enter and leave them only via _register/_unregister
+        self._indexes = [self.rider_table, self.stage_index, self.stage_clock, self.rescue_scheduler,
+                         self.cohorts, self.search_index, self.rider_frame]
+        self.observers = RiderObservers()
+        for index in self._indexes:
+            self.observers.add(index)
+        self.observers.attach(self.riders.values())
+        self.data_loader.observers = self.observers
+        self._metrics_snapshot: Optional[MetricsSnapshot] = None
         self._calculate_conversion_rates()
         # Reload manual stats
         self.daily_stats = DailyStatsManager(self.data_dir)
@@ -2317,61 +4030,88 @@ class FunnelDashboard:
         if hasattr(self, 'race_manager'):
             self.race_manager.riders = self.riders
             
+    def _register(self, rider: Rider):
+        """Start tracking a newly added rider in every derived index"""
+        rider._hub = self.observers
+        for index in self._indexes:
+            index.add(rider)
+
+    def _unregister(self, rider: Rider):
+        """Drop a removed (e.g. merged) rider from every derived index"""
+        rider._hub = None
+        for index in self._indexes:
+            index.remove(rider)
+
     # Proxy methods for Race Results
-    def process_race_results(self, raw_names: List[str], event_name: str) -> List[Dict]:
+    def process_race_results(self, raw_names: Iterable[Union[str, TimingEntry]], event_name: str) -> List[Dict]:
         return self.race_manager.process_race_results(raw_names, event_name)
         
-    def import_crm_csv(self, file_obj) -> Dict[str, int]:
-        """Import a generic CRM CSV and map standard columns"""
-        stats = {'added': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+    # Header variations recognised by the CRM importer
+    CRM_COLUMN_ALIASES = {
+        'email': ['email', 'email address', 'e-mail', 'contact email'],
+        'first_name': ['first name', 'first', 'given name', 'forename'],
+        'last_name': ['last name', 'last', 'surname', 'family name'],
+        'phone': ['phone', 'phone number', 'mobile', 'cell'],
+        'championship': ['championship', 'series', 'class'],
+        'fb_url': ['facebook', 'facebook url', 'fb'],
+        'ig_url': ['instagram', 'instagram url', 'ig'],
+    }
+
+    def import_crm_csv(self, file_obj, chunk_size: int = 500, dry_run: bool = False,
+                       progress_callback=None) -> Dict[str, int]:
+        """
+        Import a generic CRM CSV and map standard columns.
+
+        The file is streamed in chunks of `chunk_size` rows. Each chunk is
+        normalised with vectorised pandas string ops, deduplicated against the
+        riders already loaded (set membership, no per-row lookups) and the new
+        riders are committed as one batch per chunk via add_new_riders.
+
+        dry_run=True runs the whole pipeline without writing anything, so the
+        'added' count is what WOULD be added.
+        progress_callback(rows_processed, stats) is called after every chunk.
+        """
+        stats = {'added': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'rows': 0}
         
         try:
-            # Read CSV
-            df = pd.read_csv(file_obj)
-            
-            # Normalize Headers
-            df.columns = [c.strip().lower() for c in df.columns]
-            
-            # Map Columns (Try to find standard variations)
-            col_map = {}
-            possible_emails = ['email', 'email address', 'e-mail', 'contact email']
-            possible_first = ['first name', 'first', 'given name', 'forename']
-            possible_last = ['last name', 'last', 'surname', 'family name']
-            possible_phone = ['phone', 'phone number', 'mobile', 'cell']
-            
-            for col in df.columns:
-                if col in possible_emails and 'email' not in col_map: col_map['email'] = col
-                if col in possible_first and 'first' not in col_map: col_map['first'] = col
-                if col in possible_last and 'last' not in col_map: col_map['last'] = col
-                if col in possible_phone and 'phone' not in col_map: col_map['phone'] = col
-            
-            if 'email' not in col_map:
-                stats['errors'] = 1
-                return stats # Cannot proceed without email
+            # Read CSV as text, so blanks stay blank rather than 'nan'
+            reader = pd.read_csv(file_obj, dtype=str, keep_default_na=False, chunksize=chunk_size)
+            
+            col_map = None
+            known = set(self.riders.keys())
+            
+            for chunk in reader:
+                # Map Columns once, from the header of the first chunk
+                if col_map is None:
+                    col_map = self._map_crm_columns(chunk.columns)
+                    if 'email' not in col_map:
+                        stats['errors'] = 1
+                        return stats # Cannot proceed without email
                 
-            # Iterate and Add
-            for _, row in df.iterrows():
-                email = str(row.get(col_map['email'], '')).strip().lower()
-                if not email or '@' not in email:
-                    stats['skipped'] += 1
-                    continue
-                    
-                first = str(row.get(col_map.get('first'), '')).strip() if 'first' in col_map else ''
-                last = str(row.get(col_map.get('last'), '')).strip() if 'last' in col_map else ''
-                phone = str(row.get(col_map.get('phone'), '')).strip() if 'phone' in col_map else ''
+                stats['rows'] += len(chunk)
+                new_df = self._normalise_crm_chunk(chunk, col_map)
                 
-                # Check if exists
-                if email in self.riders:
-                    stats['skipped'] += 1 # Already exists, maybe update later?
-                    continue
+                # Invalid emails are skipped
+                valid = new_df['email'].str.contains('@', regex=False)
+                # Already in DB (or earlier in this file) are skipped
+                fresh = valid & ~new_df['email'].isin(known) & ~new_df['email'].duplicated()
+                stats['skipped'] += int((~fresh).sum())
                 
-                # Add to DB
-                # Note: We pass empty strings for socials unless we want to try mapping them too
-                success = self.add_new_rider(email, first, last, fb_url="", ig_url="")
-                if success:
-                    stats['added'] += 1
-                else:
-                    stats['errors'] += 1
+                new_df = new_df[fresh]
+                if not new_df.empty:
+                    entries = new_df.to_dict('records')
+                    known.update(new_df['email'])
+                    
+                    if dry_run:
+                        stats['added'] += len(entries)
+                    else:
+                        # Add to DB (single CSV write, Airtable batch and Sheets append)
+                        added = self.add_new_riders(entries)
+                        stats['added'] += len(added)
+                        stats['errors'] += len(entries) - len(added)
+                        
+                if progress_callback:
+                    progress_callback(stats['rows'], stats)
                     
         except Exception as e:
             print(f"Import Error: {e}")
@@ -2379,61 +4119,75 @@ class FunnelDashboard:
             
         return stats
 
-    def cleanup_duplicates(self) -> int:
-        """Scan Rider Database.csv for duplicates and merge them"""
-        filename = "Rider Database.csv"
-        filepath = os.path.join(self.data_dir, filename)
-        
-        if not os.path.exists(filepath):
-            return 0
-            
+    def _map_crm_columns(self, columns) -> Dict[str, str]:
+        """Find which CSV column holds each standard field"""
+        col_map = {}
+        for col in columns:
+            c = str(col).strip().lower()
+            for target, aliases in self.CRM_COLUMN_ALIASES.items():
+                if c in aliases and target not in col_map:
+                    col_map[target] = col
+        return col_map
+
+    def _normalise_crm_chunk(self, chunk: pd.DataFrame, col_map: Dict[str, str]) -> pd.DataFrame:
+        """Vectorised clean-up of one CSV chunk into add_new_riders entry columns"""
+        out = pd.DataFrame(index=chunk.index)
+        for target in self.CRM_COLUMN_ALIASES:
+            if target in col_map:
+                out[target] = chunk[col_map[target]].astype(str).str.strip()
+            else:
+                out[target] = ''
+        out['email'] = out['email'].str.lower()
+        return out
+
+    def plan_duplicate_cleanup(self) -> MergePlan:
+        """Detect duplicate riders (exact CSV + fuzzy name) for review before merging"""
+        return RiderDeduplicator(self).build_plan()
+
+    def apply_duplicate_cleanup(self, plan: MergePlan) -> Dict[str, int]:
+        """
+        Apply a reviewed MergePlan. Memory, Rider Database.csv and Airtable are
+        updated in place, so no reload_data() round trip is needed.
+        """
         try:
-            df = pd.read_csv(filepath)
-            original_count = len(df)
-            
-            # Normalize Email for grouping
-            if 'Email Address' not in df.columns:
-                return 0
-                
-            df['Email_Lower'] = df['Email Address'].astype(str).str.lower().str.strip()
-            
-            # Define aggregation logic: take first non-null
-            def first_valid(series):
-                return series.dropna().iloc[0] if not series.dropna().empty else ""
-                
-            # Group and Merge
-            # We want to keep all columns, merging logic for each
-            agg_dict = {col: first_valid for col in df.columns if col != 'Email_Lower'}
-            
-            deduped = df.groupby('Email_Lower', as_index=False).agg(agg_dict)
-            
-            # Remove temp column
-            # deduped = deduped.drop(columns=['Email_Lower']) # Not needed if we didn't include it in agg
-            
-            # Logic check: groupby produces 'Email_Lower' as a column now because as_index=False
-            # But we aggregated everything else. The original 'Email Address' is in the agg_dict.
-            # So 'Email_Lower' is the unique key. 
-            # We should drop 'Email_Lower' and rely on the retained 'Email Address'.
-            
-            deduped = deduped.drop(columns=['Email_Lower'])
-            
-            final_count = len(deduped)
-            removed = original_count - final_count
-            
-            if removed > 0:
-                # Save back
-                deduped.to_csv(filepath, index=False, encoding='utf-8-sig')
-                self.reload_data()
-                
-            return removed
-            
+            result = RiderDeduplicator(self).apply_plan(plan)
+            if result['riders_merged']:
+                self._calculate_conversion_rates()
+            return result
         except Exception as e:
             print(f"Cleanup Error: {e}")
+            return {'riders_merged': 0, 'csv_rows_removed': 0, 'airtable_deleted': 0}
+
+    def cleanup_duplicates(self) -> int:
+        """Scan for duplicate riders and merge them. Returns the number of duplicates removed."""
+        plan = self.plan_duplicate_cleanup()
+        result = self.apply_duplicate_cleanup(plan)
+        if not (result['riders_merged'] or result['csv_rows_removed']):
             return 0
+        return plan.removed_count
 
     def generate_outreach_message(self, result: Dict, event_name: str) -> str:
         return self.race_manager.generate_outreach_message(result, event_name)
 
+    def _airtable_record(self, rider: Rider) -> Dict[str, Any]:
+        """Airtable field payload for a rider"""
+        record = {
+             "Email": rider.email,
+             "First Name": rider.first_name,
+             "Last Name": rider.last_name,
+             "FB URL": rider.facebook_url,
+             "IG URL": rider.instagram_url,
+             "Championship": rider.championship,
+             "Stage": rider.current_stage.value,
+             "Phone": rider.phone,
+             "Notes": rider.notes
+        }
+        # Optional fields
+        if rider.sale_value: record["Revenue"] = rider.sale_value
+        if rider.follow_up_date:
+            record["Follow Up Date"] = rider.follow_up_date.strftime('%Y-%m-%d')
+        return record
+
     def migrate_rider_to_airtable(self, email: str) -> bool:
         """
         Sync rider to Airtable and DELETE from GSheets to migrate.
@@ -2446,21 +4200,7 @@ class FunnelDashboard:
         synced = False
         if self.airtable:
             try:
-                record = {
-                     "Email": rider.email,
-                     "First Name": rider.first_name,
-                     "Last Name": rider.last_name,
-                     "FB URL": rider.facebook_url,
-                     "IG URL": rider.instagram_url,
-                     "Championship": rider.championship,
-                     "Stage": rider.current_stage.value,
-                     "Phone": rider.phone,
-                     "Notes": rider.notes
-                }
-                # Optional fields
-                if rider.sale_value: record["Revenue"] = rider.sale_value
-                if rider.follow_up_date:
-                    record["Follow Up Date"] = rider.follow_up_date.strftime('%Y-%m-%d')
+                record = self._airtable_record(rider)
                 
                 # Upsert
                 self.airtable.upsert_rider(record)
@@ -2503,6 +4243,7 @@ class FunnelDashboard:
             # Update In-Memory
             self.riders[email.lower()] = self.data_loader._get_or_create_rider(email)
             rider = self.riders[email.lower()]
+            self._register(rider)
             
             # Update fields if provided (and not handled by lower level)
             # (DataLoader handles most, but ensuring manual fields are set)
@@ -2515,13 +4256,38 @@ class FunnelDashboard:
                     
         return success
 
+    def add_new_riders(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk version of add_new_rider.
+
+        Commits every entry to CSV, Airtable and Google Sheets in single batched
+        operations (see DataLoader.add_new_riders_to_db). That write already
+        leaves riders where add_new_rider's migration would: in Airtable if it
+        accepted them, otherwise in the sheet. Returns the emails added.
+        """
+        added = self.data_loader.add_new_riders_to_db(entries)
+        
+        if added:
+            for entry in entries:
+                email = entry['email'].lower().strip()
+                rider = self.data_loader._get_or_create_rider(email)
+                self.riders[email] = rider
+                self._register(rider)
+                
+                if entry.get('notes'): rider.notes = entry['notes']
+                if entry.get('championship'): rider.championship = entry['championship']
+                if entry.get('follow_up_date'): rider.follow_up_date = entry['follow_up_date']
+                if entry.get('phone'): rider.phone = entry['phone']
+                
+        return added
+
     def update_rider_stage(self, email: str, new_stage: FunnelStage, sale_value: Optional[float] = None):
         """Manually update a rider's stage"""
         # Save to CSV and update in-memory
         if self.data_loader.save_manual_update(email, new_stage.value):
             rider = self.riders.get(email.lower())
             if rider:
-                rider.current_stage = new_stage
+                rider.transition(new_stage)
                 
                 # Logic: If moving to OUTREACH/MESSAGED, set outreach_date = now
                 # We update it even if it exists, because a MANUAL move implies a new action/re-engagement.
@@ -2567,6 +4333,14 @@ class FunnelDashboard:
     # DAILY DASHBOARD METRICS
     # ==========================================
     
+    def get_rescue_queue(self) -> Dict[str, List[Rider]]:
+        """Riders whose rescue message is due now, by rescue type, most overdue first"""
+        return self.rescue_scheduler.due()
+
+    def mark_rescue_sent(self, email: str, rescue_type: str):
+        """Record that a rescue message went out (drops the rider from the rescue queue)"""
+        self.data_loader.save_rescue_sent(email.lower().strip(), rescue_type)
+
     def get_daily_metrics(self, target_date: Optional[datetime.date] = None) -> Dict:
         """Get counts of activities for a specific date (default Today)"""
         if not target_date:
@@ -2590,20 +4364,14 @@ class FunnelDashboard:
             'sales_closed': 0
         }
         
-        for r in self.riders.values():
-            # Check each date field
-            if r.outreach_date and r.outreach_date.date() == target_date:
-                metrics['outreach_sent'] += 1
-            if r.registered_date and r.registered_date.date() == target_date:
-                metrics['new_registered'] += 1
-            if r.day1_complete_date and r.day1_complete_date.date() == target_date:
-                metrics['day1_completed'] += 1
-            if r.day2_complete_date and r.day2_complete_date.date() == target_date:
-                metrics['day2_completed'] += 1
-            if r.strategy_call_booked_date and r.strategy_call_booked_date.date() == target_date:
-                metrics['calls_booked'] += 1
-            if r.sale_closed_date and r.sale_closed_date.date() == target_date:
-                metrics['sales_closed'] += 1
+        if isinstance(target_date, datetime):
+            target_date = target_date.date()
+        
+        snapshot = self.get_metrics_snapshot()
+        if target_date == snapshot.day:
+            metrics.update(snapshot.daily)
+        else:
+            metrics.update(MetricsSnapshot.count_day(self.rider_table, target_date))
                 
         return metrics
 
@@ -2616,125 +4384,119 @@ class FunnelDashboard:
             'outreach_no_reply': []    # Outreach -> stuck (maybe too noisy?)
         }
         
-        for r in self.riders.values():
-            days_in = r.days_in_current_stage
-            if days_in is None or days_in < days_threshold:
-                continue
-                
-            info = {
-                'name': r.full_name or r.email,
-                'email': r.email,
-                'days': days_in,
-                'stage': r.current_stage.value,
-                'fb': r.facebook_url
-            }
-
-            if r.current_stage == FunnelStage.REGISTERED:
-                stalled['registered_no_start'].append(info)
-            elif r.current_stage == FunnelStage.DAY1_COMPLETE:
-                stalled['day1_no_day2'].append(info)
-            elif r.current_stage == FunnelStage.DAY2_COMPLETE:
-                stalled['day2_no_call'].append(info)
-            elif r.current_stage == FunnelStage.OUTREACH:
-                stalled['outreach_no_reply'].append(info)
+        # Oldest-first from the stage-entry heaps; 'now' is taken once for the whole list
+        now = datetime.now()
+        cutoff = now - timedelta(days=days_threshold)
+        buckets = [
+            ('registered_no_start', FunnelStage.REGISTERED),
+            ('day1_no_day2', FunnelStage.DAY1_COMPLETE),
+            ('day2_no_call', FunnelStage.DAY2_COMPLETE),
+            ('outreach_no_reply', FunnelStage.OUTREACH),
+        ]
+        for key, stage in buckets:
+            for r in self.stage_clock.entered_before(stage, cutoff):
+                stalled[key].append({
+                    'name': r.full_name or r.email,
+                    'email': r.email,
+                    'days': r.days_in_stage(now),
+                    'stage': r.current_stage.value,
+                    'fb': r.facebook_url
+                })
                 
         return stalled
 
     def get_revenue_metrics(self) -> Dict:
         """Calculate revenue progress"""
-        target = float(self.calculator.config.MONTHLY_REVENUE_TARGET)
-        actual = 0.0
-        pipeline_value = 0.0
-        
-        program_cost = 4000.0
-        
-        for r in self.riders.values():
-            if r.current_stage == FunnelStage.SALE_CLOSED:
-                actual += r.sale_value if r.sale_value else program_cost
-            elif r.current_stage == FunnelStage.STRATEGY_CALL_BOOKED:
-                pipeline_value += program_cost * 0.25 
-                
-        return {
-            'target': target,
-            'actual': actual,
-            'pipeline': pipeline_value,
-            'progress_pct': (actual / target) * 100 if target > 0 else 0
-        }
+        return dict(self.get_metrics_snapshot().revenue)
+
+    # Cohorts registered within this window drive the "current" conversion rates
+    RATE_WINDOW_DAYS = 180
 
     def _calculate_conversion_rates(self):
-        """Calculate actual conversion rates from data"""
-        stage_counts = self.get_stage_counts()
+        """Calculate current conversion rates from recent registration cohorts"""
+        since = self.cohorts.period_of(datetime.now() - timedelta(days=self.RATE_WINDOW_DAYS))
+        steps = self.cohorts.rollup(since=since)
+        # Too few recent riders: fall back to every cohort on record
+        if steps['registration_to_day1']['entered'] <= 10:
+            steps = self.cohorts.rollup()
+
+        # Raw evidence for the forecast posteriors (kept even when data is thin)
+        self.calculator.update_conversion_evidence({
+            step: (steps[step]['converted'], steps[step]['entered'])
+            for step in ('registration_to_day1', 'day1_to_day2', 'day2_to_strategy_call')
+        })
 
         # Only update if we have meaningful data
-        if stage_counts['registered'] > 10:
+        if steps['registration_to_day1']['entered'] > 10:
             rates = {}
-
-            if stage_counts['registered'] > 0:
-                rates['registration_to_day1'] = (
-                    stage_counts['day1_complete'] / stage_counts['registered']
-                )
-
-            if stage_counts['day1_complete'] > 0:
-                rates['day1_to_day2'] = (
-                    stage_counts['day2_complete'] / stage_counts['day1_complete']
-                )
-
-            if stage_counts['day2_complete'] > 0:
-                rates['day2_to_strategy_call'] = (
-                    stage_counts['strategy_call_booked'] / stage_counts['day2_complete']
-                )
+            for step in ('registration_to_day1', 'day1_to_day2', 'day2_to_strategy_call'):
+                if steps[step]['entered'] > 0:
+                    rates[step] = steps[step]['rate']
 
             self.calculator.update_conversion_rates(rates)
 
+    def search_riders(self, query: str = '', stages: Optional[List[FunnelStage]] = None,
+                      page: int = 1, per_page: int = 50) -> Tuple[int, List[Rider]]:
+        """Indexed rider search for the database views: (total matches, riders on page)"""
+        return self.search_index.search(query, stages, page=page, per_page=per_page)
+
+    def get_cohort_table(self, period: str = 'month', by: Optional[str] = None) -> pd.DataFrame:
+        """Cohort conversion table by registration 'week'/'month', optionally split by 'channel' or 'championship'"""
+        if period == self.cohorts.period:
+            return self.cohorts.to_frame(by)
+        if period not in self._extra_cohorts:
+            self._extra_cohorts[period] = CohortEngine(self.riders, period=period)
+            self._indexes.append(self._extra_cohorts[period])
+            self.observers.add(self._extra_cohorts[period])
+        return self._extra_cohorts[period].to_frame(by)
+
+    def get_revenue_forecast(self, simulations: int = 20000) -> Dict[str, Any]:
+        """
+        P10/P50/P90 revenue and outreach bands for this month from the current pipeline.
+        Stage pools only hold live entries: riders who entered the stage this month or
+        within FORECAST_STAGE_EXPIRY_DAYS (riders parked for months are not pending sales).
+        """
+        now = datetime.now()
+        cutoff = min(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+                     now - timedelta(days=self.calculator.config.FORECAST_STAGE_EXPIRY_DAYS))
+        pool = lambda stage: self.stage_clock.count_entered_since(stage, cutoff)
+        outreach_mtd = (self.daily_stats.get_mtd_total('fb_messages_sent')
+                        + self.daily_stats.get_mtd_total('ig_messages_sent'))
+        return self.calculator.forecast_distribution(
+            current_outreach=outreach_mtd,
+            current_registrations=pool(FunnelStage.REGISTERED),
+            current_day1=pool(FunnelStage.DAY1_COMPLETE),
+            current_day2=pool(FunnelStage.DAY2_COMPLETE),
+            current_calls=pool(FunnelStage.STRATEGY_CALL_BOOKED),
+            simulations=simulations,
+        )
+
     def get_stage_counts(self) -> Dict[str, int]:
         """Get count of riders at each stage"""
-        counts = defaultdict(int)
-
-        for rider in self.riders.values():
-            stage_name = rider.current_stage.value
-            counts[stage_name] += 1
-
-            # Also count total who reached each stage (not just current)
-            if rider.registered_date:
-                counts['total_registered'] += 1
-            if rider.day1_complete_date:
-                counts['total_day1'] += 1
-            if rider.day2_complete_date:
-                counts['total_day2'] += 1
-            if rider.strategy_call_booked_date:
-                counts['total_calls_booked'] += 1
-
-        # Map to simpler names
-        return {
-            'registered': counts['total_registered'],
-            'day1_complete': counts['total_day1'],
-            'day2_complete': counts['total_day2'],
-            'strategy_call_booked': counts['total_calls_booked'],
-            'current_registered': counts['registered'],
-            'current_day1': counts['day1_complete'],
-            'current_day2': counts['day2_complete'],
-            'current_calls': counts['strategy_call_booked'],
-        }
+        return dict(self.get_metrics_snapshot().stage_counts)
 
     def get_stage_counts_by_month(self, year: int, month: int) -> Dict[str, int]:
         """Get counts for a specific month (MTD Actuals)"""
-        counts = defaultdict(int)
-        
-        for rider in self.riders.values():
-            # Helper to check date match
-            def is_in_month(dt):
-                return dt and dt.year == year and dt.month == month
-
-            if is_in_month(rider.registered_date):
-                counts['registered'] += 1
-            if is_in_month(rider.day1_complete_date):
-                counts['day1_complete'] += 1
-            if is_in_month(rider.day2_complete_date):
-                counts['day2_complete'] += 1
-            if is_in_month(rider.strategy_call_booked_date):
-                counts['strategy_call_booked'] += 1
-                
-        return counts
+        snapshot = self.get_metrics_snapshot()
+        if (year, month) == (snapshot.day.year, snapshot.day.month):
+            return defaultdict(int, snapshot.mtd)
+        return defaultdict(int, MetricsSnapshot.count_month(self.rider_table, year, month))
+
+    def get_activity_counts(self, start: datetime, end: datetime) -> Dict[str, int]:
+        """Registrations, Day 1/2, calls and sales dated in [start, end) (any custom range)"""
+        return MetricsSnapshot.count_range(self.rider_table, start, end)
+
+    def get_metrics_snapshot(self) -> MetricsSnapshot:
+        """
+        Rider aggregates for the current data version, memoised until a rider
+        changes (RiderTable.version) or the day rolls over.
+        """
+        self.rider_table.sync()
+        snapshot = self._metrics_snapshot
+        if snapshot is None or snapshot.version != self.rider_table.version or snapshot.day != datetime.now().date():
+            snapshot = MetricsSnapshot.build(self.rider_table, float(self.calculator.config.MONTHLY_REVENUE_TARGET))
+            self._metrics_snapshot = snapshot
+        return snapshot
 
     def get_funnel_summary(self) -> str:
         """Generate a text summary of the funnel"""
@@ -2773,7 +4535,7 @@ class FunnelDashboard:
             lines.append(f"{rate_name}: {rate_value*100:.1f}%")
 
         # Add rescue needed section
-        rescue_needed = self.rescue_manager.get_riders_needing_rescue(list(self.riders.values()))
+        rescue_needed = self.rescue_scheduler.due()
 
         lines.extend([
             "",
@@ -2801,7 +4563,8 @@ class FunnelDashboard:
 
     def get_rescue_actions(self) -> str:
         """Get list of rescue actions needed today"""
-        rescue_needed = self.rescue_manager.get_riders_needing_rescue(list(self.riders.values()))
+        now = datetime.now()
+        rescue_needed = self.rescue_scheduler.due(now)
 
         lines = [
             "=" * 60,
@@ -2817,7 +4580,7 @@ class FunnelDashboard:
             lines.append("-" * 40)
 
             for rider in riders[:10]:  # Show top 10
-                days = rider.days_in_current_stage
+                days = rider.days_in_stage(now)
                 lines.append(f"  • {rider.full_name} ({rider.email})")
                 lines.append(f"    Stuck for: {days} days")
 
@@ -3081,54 +4844,622 @@ def main():
 if __name__ == "__main__":
     main()
 
+# =============================================================================
+# RIDER NAME MATCHING
+# =============================================================================
+class RiderNameIndex:
+    """
+    Precomputed fuzzy/phonetic name index for matching race results to riders.
+
+    Every rider's name is split into first name (nickname-canonical, e.g.
+    Josh -> joshua) and surname, and indexed under the surname's phonetic
+    keys (Double Metaphone when the `metaphone` package is installed, a
+    simplified phonetic key otherwise) and its character trigrams. A lookup
+    only scores riders from those blocks, never the whole database, and
+    returns candidates with a 0-1 confidence.
+    """
+
+    NICKNAMES = RiderDeduplicator.NICKNAMES
+    MAX_NAME_LEN = 60  # Ignore corrupt riders with massive (concatenated) names
+
+    # Confidence needed to accept a match, and the lead it needs over the runner-up
+    MATCH_THRESHOLD = 0.85
+    AMBIGUOUS_MARGIN = 0.05
+
+    WATCHED = ('first_name', 'last_name')
+
+    def __init__(self, riders: Dict[str, Rider]):
+        self.riders = riders
+        self.rebuild()
+
+    # --- keys ------------------------------------------------------------
+
+    @staticmethod
+    def normalise(name: str) -> str:
+        return RiderDeduplicator._norm_name(name)
+
+    @staticmethod
+    def trigrams(word: str) -> set:
+        padded = f"  {word} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def _simple_phonetic(word: str, vowels: bool = False) -> str:
+        """Fallback phonetic key (metaphone-like rules, no dependency). vowels=True keeps later vowels."""
+        w = re.sub(r'[^a-z]', '', word.lower())
+        if not w:
+            return ''
+        for pattern, repl in (
+            (r'^kn|^gn|^pn|^wr', lambda m: m.group(0)[1]), (r'^x', 's'), (r'ph', 'f'),
+            (r'sch', 'sk'), (r'ck', 'k'), (r'c(?=[eiy])', 's'), (r'c', 'k'), (r'q', 'k'),
+            (r'x', 'ks'), (r'dg(?=[eiy])', 'j'), (r'gh', ''), (r'z', 's'), (r'v', 'f'),
+        ):
+            w = re.sub(pattern, repl, w)
+        head, tail = w[0], re.sub(r'[hwy]' if vowels else r'[aeiouhwy]', '', w[1:])
+        if head in 'aeiou':
+            head = 'a'
+        key = head + tail
+        return re.sub(r'(.)\1+', r'\1', key)[:6]
+
+    @classmethod
+    def phonetic_keys(cls, word: str) -> Tuple[str, ...]:
+        if HAS_METAPHONE:
+            return tuple(k for k in doublemetaphone(word) if k)
+        key = cls._simple_phonetic(word)
+        return (key,) if key else ()
+
+    def canonical_first(self, first: str) -> str:
+        return self.NICKNAMES.get(first, first)
+
+    def split_name(self, name: str) -> Optional[Tuple[str, str]]:
+        """(first, last) tokens of a normalised name, or None for single-word names"""
+        tokens = self.normalise(name).split()
+        if len(tokens) < 2:
+            return None
+        return tokens[0], tokens[-1]
+
+    # --- index maintenance -----------------------------------------------
+
+    def rebuild(self):
+        self._entry_of: Dict[int, tuple] = {}
+        self._rider_of: Dict[int, Rider] = {}
+        self._exact: Dict[str, Dict[int, Rider]] = defaultdict(dict)     # full normalised name
+        self._phonetic: Dict[str, Dict[int, Rider]] = defaultdict(dict)  # surname phonetic key
+        self._trigram: Dict[str, Dict[int, Rider]] = defaultdict(dict)   # surname trigram
+        for rider in self.riders.values():
+            self.add(rider)
+
+    def _keys(self, rider: Rider) -> tuple:
+        full = rider.full_name if rider.full_name != rider.email else ''
+        norm = self.normalise(full)
+        parts = self.split_name(norm)
+        if not parts or len(full) > self.MAX_NAME_LEN:
+            return (norm, (), ())  # Exact lookups only
+        last = parts[1]
+        return (norm, self.phonetic_keys(last), tuple(self.trigrams(last)))
+
+    def add(self, rider: Rider):
+        if id(rider) in self._entry_of:
+            return
+        norm, phonetic, trigrams = keys = self._keys(rider)
+        self._entry_of[id(rider)] = keys
+        self._rider_of[id(rider)] = rider
+        if norm:
+            self._exact[norm][id(rider)] = rider
+        for k in phonetic:
+            self._phonetic[k][id(rider)] = rider
+        for t in trigrams:
+            self._trigram[t][id(rider)] = rider
+
+    def remove(self, rider: Rider):
+        keys = self._entry_of.pop(id(rider), None)
+        if keys is None:
+            return
+        self._rider_of.pop(id(rider), None)
+        norm, phonetic, trigrams = keys
+        self._exact.get(norm, {}).pop(id(rider), None)
+        for k in phonetic:
+            self._phonetic.get(k, {}).pop(id(rider), None)
+        for t in trigrams:
+            self._trigram.get(t, {}).pop(id(rider), None)
+
+    def on_rider_changed(self, rider: Rider, name: str):
+        """Rider observer hook: re-index on name edits"""
+        if name in ('first_name', 'last_name') and id(rider) in self._entry_of:
+            self.remove(rider)
+            self.add(rider)
+
+    def sync(self):
+        """Catch riders added/removed directly on the dict (cheap length check)"""
+        if len(self.riders) != len(self._entry_of):
+            self.rebuild()
+
+    # --- scoring ---------------------------------------------------------
+
+    @classmethod
+    def _similarity(cls, a: str, b: str) -> float:
+        """Trigram Dice coefficient"""
+        ta, tb = cls.trigrams(a), cls.trigrams(b)
+        return 2 * len(ta & tb) / (len(ta) + len(tb)) if ta and tb else 0.0
+
+    # Sound-alike first names (Jon/John) only suggest a rider: even with an exact surname,
+    # 0.55 + 0.45 * FIRST_PHONETIC stays below MATCH_THRESHOLD
+    FIRST_PHONETIC = 0.6
+
+    def _token_score(self, a: str, b: str, first: bool) -> float:
+        if first:
+            a, b = self.canonical_first(a), self.canonical_first(b)
+        if a == b:
+            return 1.0
+        if first:
+            short, long_ = sorted((a, b), key=len)
+            if len(short) >= 3 and long_.startswith(short):
+                return 0.9
+            # Vowels kept: consonant-only keys would pair Don/Dean and Kit/Kate
+            if self._simple_phonetic(a, vowels=True) == self._simple_phonetic(b, vowels=True):
+                return max(self.FIRST_PHONETIC, self._similarity(a, b))
+            return self._similarity(a, b)
+        if set(self.phonetic_keys(a)) & set(self.phonetic_keys(b)):
+            return 0.85
+        return self._similarity(a, b)
+
+    # Fuzzy scores stay below an exact full-name match (e.g. "Glenn X Racing" vs "Glenn Y Racing")
+    FUZZY_CAP = 0.97
+
+    def score(self, first: str, last: str, rider: Rider) -> float:
+        parts = self.split_name(rider.full_name)
+        if not parts:
+            return 0.0
+        s = 0.55 * self._token_score(last, parts[1], first=False) + 0.45 * self._token_score(first, parts[0], first=True)
+        return min(s, self.FUZZY_CAP)
+
+    def _query_orders(self, raw_name: str) -> List[Tuple[str, str]]:
+        """(first, last) readings of a result name: as written, 'Last, First', and reversed"""
+        orders = []
+        if ',' in raw_name:
+            last, _, first = raw_name.partition(',')
+            swapped = self.split_name(f"{first} {last}")
+            if swapped:
+                orders.append(swapped)
+        parts = self.split_name(raw_name)
+        if parts:
+            orders.append(parts)
+            orders.append((parts[1], parts[0]))
+        return orders
+
+    def candidates(self, raw_name: str, limit: int = 5) -> List[Tuple[Rider, float]]:
+        """Best-scoring riders for a result name, highest confidence first"""
+        self.sync()
+        norm = self.normalise(raw_name)
+        if not norm:
+            return []
+
+        scores: Dict[int, Tuple[Rider, float]] = {}
+        # Exact full name (either order) is certain
+        for variant in {norm, ' '.join(reversed(norm.split()))} | {' '.join(o) for o in self._query_orders(raw_name)}:
+            for rid, rider in self._exact.get(variant, {}).items():
+                scores[rid] = (rider, 1.0)
+
+        for first, last in self._query_orders(raw_name):
+            block: Dict[int, Rider] = {}
+            for k in self.phonetic_keys(last):
+                block.update(self._phonetic.get(k, {}))
+            # Typo tolerance: surnames sharing at least half the query's trigrams
+            grams = self.trigrams(last)
+            hits = defaultdict(int)
+            for t in grams:
+                for rid in self._trigram.get(t, {}):
+                    hits[rid] += 1
+            need = max(2, len(grams) // 2)
+            for rid, n in hits.items():
+                if n >= need:
+                    block[rid] = self._rider_of[rid]
+
+            for rid, rider in block.items():
+                if rid in scores and scores[rid][1] >= 1.0:
+                    continue
+                s = self.score(first, last, rider)
+                if rid not in scores or s > scores[rid][1]:
+                    scores[rid] = (rider, s)
+
+        ranked = sorted(scores.values(), key=lambda rs: rs[1], reverse=True)
+        return ranked[:limit]
+
+    def best_match(self, raw_name: str) -> Tuple[Optional[Rider], float, str, List[Tuple[Rider, float]]]:
+        """
+        (rider, confidence, status, candidates). status is 'match_found',
+        'ambiguous' (two riders too close to call) or 'new_prospect'.
+        """
+        ranked = self.candidates(raw_name)
+        if not ranked or ranked[0][1] < self.MATCH_THRESHOLD:
+            return None, ranked[0][1] if ranked else 0.0, 'new_prospect', ranked
+        top_rider, top_score = ranked[0]
+        if len(ranked) > 1 and ranked[1][1] >= self.MATCH_THRESHOLD:
+            runner_up = ranked[1][1]
+            # An exact name beats any fuzzy one; otherwise the lead must be clear
+            exact_wins = top_score >= 1.0 > runner_up
+            if not exact_wins and top_score - runner_up < self.AMBIGUOUS_MARGIN:
+                return None, top_score, 'ambiguous', ranked
+        return top_rider, top_score, 'match_found', ranked
+
+
 # =============================================================================
 # RACE RESULT MANAGER (Restored)
 # =============================================================================
+class RaceAnalysisStore:
+    """
+    Keyed store for race-result analyses (replaces last_race_analysis.pkl).
+
+    Only (event, row, original_name, matched_email, status, position,
+    race_class, match_confidence) is kept per analysed row, as an
+    append-only CSV log like rescue_log.csv: saving an
+    event appends a reset marker plus its rows, and a single-row change
+    appends one line. Reading replays the log (last write wins), so several
+    named events are kept. Riders are re-attached from the live riders dict
+    by RaceResultManager.load_analysis, never pickled.
+    """
+
+    FILENAME = "race_analysis_log.csv"
+    FIELDS = ['event', 'row', 'original_name', 'matched_email', 'status', 'position', 'race_class',
+              'match_confidence', 'timestamp']
+    ROW_FIELDS = ('original_name', 'matched_email', 'status', 'position', 'race_class', 'match_confidence')
+    RESET = '__reset__'  # Marker status: drop the event's earlier rows
+
+    def __init__(self, data_dir: str):
+        self.filepath = os.path.join(data_dir, self.FILENAME)
+        self._events: Dict[str, Dict[int, Dict[str, str]]] = {}
+        self._updated: Dict[str, str] = {}
+        self._log_lines = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.DictReader(f)
+                for line in reader:
+                    self._apply(line)
+                    self._log_lines += 1
+                header = reader.fieldnames
+        except Exception as e:
+            print(f"Error loading race analyses: {e}")
+            return
+
+        # Compact once the log is mostly superseded rows (or rewrite an older column layout)
+        live = sum(len(rows) + 1 for rows in self._events.values())
+        if self._log_lines > 2 * live + 100 or header != self.FIELDS:
+            self._compact()
+
+    def _apply(self, line: Dict[str, str]):
+        event = line.get('event', '')
+        if line.get('status') == self.RESET:
+            self._events[event] = {}
+        else:
+            try:
+                row = int(line.get('row', ''))
+            except ValueError:
+                return
+            self._events.setdefault(event, {})[row] = {k: line.get(k) or '' for k in self.ROW_FIELDS}
+        self._updated[event] = line.get('timestamp', '')
+
+    def _append(self, lines: List[Dict[str, Any]]):
+        with open(self.filepath, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            if f.tell() == 0:
+                writer.writeheader()
+            writer.writerows(lines)
+        for line in lines:
+            self._apply({k: str(v) for k, v in line.items()})
+        self._log_lines += len(lines)
+
+    def _compact(self):
+        lines = []
+        for event, rows in self._events.items():
+            ts = self._updated.get(event, '')
+            lines.append({'event': event, 'row': -1, 'original_name': '', 'matched_email': '', 'status': self.RESET, 'timestamp': ts})
+            for row, rec in sorted(rows.items()):
+                lines.append(dict(rec, event=event, row=row, timestamp=ts))
+        with open(self.filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(lines)
+        self._log_lines = len(lines)
+
+    @staticmethod
+    def _line(event: str, row: int, result: Dict[str, Any], ts: str) -> Dict[str, Any]:
+        return {
+            'event': event,
+            'row': row,
+            'original_name': result.get('original_name', ''),
+            'matched_email': result.get('matched_email') or '',
+            'status': result.get('match_status', ''),
+            'position': '' if result.get('position') is None else result['position'],
+            'race_class': result.get('race_class') or '',
+            'match_confidence': '' if result.get('match_confidence') is None else result['match_confidence'],
+            'timestamp': ts,
+        }
+
+    def save_event(self, event: str, results: List[Dict[str, Any]]):
+        """Store a whole analysis under `event`, replacing any earlier one"""
+        ts = datetime.now().isoformat()
+        lines = [{'event': event, 'row': -1, 'original_name': '', 'matched_email': '', 'status': self.RESET, 'timestamp': ts}]
+        lines += [self._line(event, r.get('row', i), r, ts) for i, r in enumerate(results)]
+        self._append(lines)
+
+    def update_rows(self, event: str, results: List[Dict[str, Any]]):
+        """Record changed rows (each result dict carries its 'row')"""
+        if not results:
+            return
+        ts = datetime.now().isoformat()
+        self._append([self._line(event, r['row'], r, ts) for r in results])
+
+    def events(self) -> List[str]:
+        """Stored event names, most recently updated first"""
+        return sorted((e for e, rows in self._events.items() if rows), key=lambda e: self._updated.get(e, ''), reverse=True)
+
+    def rows(self, event: str) -> List[Tuple[int, Dict[str, str]]]:
+        return sorted(self._events.get(event, {}).items())
+
+
+class RaceResultIndex:
+    """
+    Positions of race results bucketed by (match_status, stage) for the
+    paged outreach list, so a rerun selects a page instead of re-filtering
+    every result.
+
+    Built once per results list. Rows whose match the UI changes are
+    re-bucketed with update(); matched riders' stages are re-read only
+    when the RiderTable version moves (a stage or date changed).
+    """
+
+    STATUSES = ['match_found', 'ambiguous', 'new_prospect']
+    PENDING_STAGE = FunnelStage.CONTACT  # Matched riders still waiting for outreach
+
+    def __init__(self, results: List[Dict[str, Any]], table: Optional[RiderTable] = None):
+        self.results = results
+        self.table = table
+        self.rebuild()
+
+    @staticmethod
+    def key_for(result: Dict[str, Any]) -> Tuple[str, Optional[FunnelStage]]:
+        match = result.get('match')
+        if result.get('match_status') == 'match_found' and match:
+            return 'match_found', match.current_stage
+        return result.get('match_status', 'new_prospect'), None
+
+    def rebuild(self):
+        self._key_of: List[Tuple[str, Optional[FunnelStage]]] = []
+        self._buckets: Dict[Tuple[str, Optional[FunnelStage]], set] = defaultdict(set)
+        self._pos_of_row = {r.get('row', pos): pos for pos, r in enumerate(self.results)}
+        for pos, r in enumerate(self.results):
+            key = self.key_for(r)
+            self._key_of.append(key)
+            self._buckets[key].add(pos)
+        self._version = self.table.version if self.table is not None else None
+        self._selected: Dict[tuple, List[int]] = {}
+
+    def _move(self, pos: int):
+        key = self.key_for(self.results[pos])
+        old = self._key_of[pos]
+        if key == old:
+            return
+        self._buckets[old].discard(pos)
+        self._buckets[key].add(pos)
+        self._key_of[pos] = key
+        self._selected.clear()
+
+    def update(self, results: List[Dict[str, Any]]):
+        """Re-bucket rows changed in place (each result dict carries its 'row')"""
+        for r in results:
+            pos = self._pos_of_row.get(r.get('row'))
+            if pos is not None:
+                self._move(pos)
+
+    def sync(self):
+        """Pick up stage changes on matched riders (cheap version check)"""
+        if self.table is None or self.table.version == self._version:
+            return
+        self._version = self.table.version
+        for key, positions in list(self._buckets.items()):
+            if key[0] == 'match_found':
+                for pos in list(positions):
+                    self._move(pos)
+
+    def select(self, statuses: Optional[Iterable[str]] = None, include_processed: bool = False) -> List[int]:
+        """Result positions (in sheet order) for the given statuses"""
+        self.sync()
+        statuses = tuple(statuses) if statuses else tuple(self.STATUSES)
+        memo = (statuses, include_processed)
+        if memo not in self._selected:
+            positions = []
+            for (status, stage), bucket in self._buckets.items():
+                if status not in statuses:
+                    continue
+                # Messaged+ riders are done: hidden unless asked for
+                if status == 'match_found' and stage is not None and stage != self.PENDING_STAGE and not include_processed:
+                    continue
+                positions.extend(bucket)
+            self._selected[memo] = sorted(positions)
+        return self._selected[memo]
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per match status"""
+        self.sync()
+        totals = {status: 0 for status in self.STATUSES}
+        for (status, _), bucket in self._buckets.items():
+            totals[status] = totals.get(status, 0) + len(bucket)
+        return totals
+
+
+class SocialProfileCache:
+    """
+    Persistent social-profile resolutions, keyed by normalised name + event.
+
+    Append-only CSV log (social_profile_cache.csv), last write wins, same
+    as RaceAnalysisStore. Each entry keeps the Facebook / Instagram /
+    LinkedIn URLs found and when; an entry with no URLs is a negative
+    result (status 'no_socials', e.g. the rider was marked NO_SOCIALS) and
+    is never searched again either. A name resolved for one event is
+    reused for the others, since profiles belong to the person.
+    """
+
+    FILENAME = "social_profile_cache.csv"
+    PLATFORMS = ['facebook_url', 'instagram_url', 'linkedin_url']
+    FIELDS = ['name_key', 'event_key', 'name', 'event'] + PLATFORMS + ['status', 'timestamp']
+    FOUND = 'found'
+    NO_SOCIALS = 'no_socials'
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.filepath = os.path.join(data_dir, self.FILENAME) if data_dir else None
+        self._entries: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._by_name: Dict[str, Dict[str, str]] = {}  # Latest entry per name (any event)
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(name: str, event: str = "") -> Tuple[str, str]:
+        return RiderDeduplicator._norm_name(name), RiderDeduplicator._norm_name(event)
+
+    def _load(self):
+        if not self.filepath or not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, 'r', encoding='utf-8', newline='') as f:
+                for line in csv.DictReader(f):
+                    self._apply(line)
+        except Exception as e:
+            print(f"Error loading social profile cache: {e}")
+
+    def _apply(self, line: Dict[str, str]):
+        key = (line.get('name_key', ''), line.get('event_key', ''))
+        self._entries[key] = line
+        self._by_name[key[0]] = line
+
+    def get(self, name: str, event: str = "") -> Optional[Dict[str, str]]:
+        """Cached entry for this name at this event, else for this name at any event"""
+        name_key, event_key = self.key(name, event)
+        return self._entries.get((name_key, event_key)) or self._by_name.get(name_key)
+
+    def profiles(self, name: str, event: str = "") -> Optional[Dict[str, str]]:
+        """{platform: url} if resolved ({} for a negative result), None if never looked up"""
+        entry = self.get(name, event)
+        if entry is None:
+            return None
+        return {p: entry[p] for p in self.PLATFORMS if entry.get(p)}
+
+    def record(self, name: str, event: str, found: Dict[str, str]):
+        """Store a resolution; an empty `found` is a negative (no socials) result"""
+        name_key, event_key = self.key(name, event)
+        line = {
+            'name_key': name_key, 'event_key': event_key, 'name': name, 'event': event,
+            **{p: found.get(p, '') or '' for p in self.PLATFORMS},
+            'status': self.FOUND if any(found.get(p) for p in self.PLATFORMS) else self.NO_SOCIALS,
+            'timestamp': datetime.now().isoformat(),
+        }
+        with self._lock:
+            if self.filepath:
+                try:
+                    with open(self.filepath, 'a', newline='', encoding='utf-8') as f:
+                        writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                        if f.tell() == 0:
+                            writer.writeheader()
+                        writer.writerow(line)
+                except Exception as e:
+                    print(f"Error saving social profile cache: {e}")
+            self._apply(line)
+
+
+def google_search_backend(query: str, num_results: int = 15) -> List[str]:
+    """Default SocialFinder backend: live googlesearch query, returns result URLs"""
+    from googlesearch import search  # ImportError surfaces to the caller (not cached)
+    return [result.url for result in search(query, num_results=num_results, advanced=True)]
+
+
 class SocialFinder:
     """Find social media profiles and generate Deep DM Links"""
-    
-    def find_socials(self, name: str, context: str = "") -> Dict[str, str]:
+
+    MAX_WORKERS = 4        # Concurrent live searches in resolve_many
+    MAX_RETRIES = 3
+    BACKOFF_SECONDS = 2.0  # Doubles on each retry
+
+    def __init__(self, search_backend: Optional[Callable[[str, int], Iterable[str]]] = None,
+                 cache: Optional[SocialProfileCache] = None):
         """
-        Search for social media profiles using multi-level strategy.
-        Returns dict of {platform: url}
+        search_backend: (query, num_results) -> result URLs. Defaults to googlesearch;
+        pass a stub to run offline.
+        cache: persistent resolutions (in-memory only when omitted)
         """
+        self.search_backend = search_backend or google_search_backend
+        self.cache = cache if cache is not None else SocialProfileCache()
+        self._sleep = time.sleep
+
+    @staticmethod
+    def social_queries(name: str, context: str = "") -> List[str]:
         # Level 1: Core Racing Search
         # Level 2: Social Specific
-        queries = [
+        return [
             f'"{name}" site:instagram.com ("racing" OR "racer" OR "motorsport")',
             f'"{name}" site:facebook.com ("motorcycle" OR "racing")',
             f'"{name}" {context} racing social media',
             f'"{name}" AND ("competitor" OR "race results")'
         ]
-        
+
+    @staticmethod
+    def classify_urls(urls: Iterable[str]) -> Dict[str, str]:
+        """First Facebook / Instagram / LinkedIn profile URL in the results"""
         found = {}
+        for url in urls:
+            lower_url = url.lower()
+            
+            if "facebook.com" in lower_url and "public" not in lower_url and "posts" not in lower_url:
+                if "facebook_url" not in found:
+                    found['facebook_url'] = url
+                    
+            elif "instagram.com" in lower_url:
+                if "instagram_url" not in found:
+                    # Clean out some junk params if needed
+                    found['instagram_url'] = url
+                    
+            elif "linkedin.com/in" in lower_url:
+                if "linkedin_url" not in found:
+                    found['linkedin_url'] = url
+        return found
+
+    def _lookup(self, name: str, context: str = "") -> Dict[str, str]:
+        """One live search (raises on backend errors)"""
+        # Use the most specific one first
+        base_query = self.social_queries(name, context)[0]
+        # Search top 15 results
+        return self.classify_urls(self.search_backend(base_query, 15))
+
+    def _lookup_with_backoff(self, name: str, context: str = "") -> Dict[str, str]:
+        delay = self.BACKOFF_SECONDS
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                return self._lookup(name, context)
+            except ImportError:
+                raise
+            except Exception as e:
+                if attempt == self.MAX_RETRIES - 1:
+                    raise
+                print(f"Search error for {name} (retrying in {delay:.0f}s): {e}")
+                self._sleep(delay)
+                delay *= 2
+    
+    def find_socials(self, name: str, context: str = "") -> Dict[str, str]:
+        """
+        Search for social media profiles using multi-level strategy.
+        Returns dict of {platform: url}. Cached: a name is only ever searched once.
+        """
+        cached = self.cache.profiles(name, context)
+        if cached is not None:
+            return cached
         
+        found = {}
         try:
-            from googlesearch import search
-            
-            # Use the most specific one first
-            base_query = queries[0] 
-            
-            # Search top 15 results
-            results = list(search(base_query, num_results=15, advanced=True))
-            
-            for result in results:
-                url = result.url
-                lower_url = url.lower()
-                
-                if "facebook.com" in lower_url and "public" not in lower_url and "posts" not in lower_url:
-                    if "facebook_url" not in found:
-                        found['facebook_url'] = url
-                        
-                elif "instagram.com" in lower_url:
-                    if "instagram_url" not in found:
-                        # Clean out some junk params if needed
-                        found['instagram_url'] = url
-                        
-                elif "linkedin.com/in" in lower_url:
-                    if "linkedin_url" not in found:
-                        found['linkedin_url'] = url
-                        
+            found = self._lookup_with_backoff(name, context)
+            self.cache.record(name, context, found)
         except ImportError:
             print("googlesearch-python not installed")
         except Exception as e:
@@ -3136,6 +5467,50 @@ class SocialFinder:
             
         return found
 
+    def resolve_many(self, names: Iterable[str], context: str = "",
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Resolve a whole timing sheet: names are deduplicated (normalised),
+        cached ones are answered from the cache, and the rest go through a
+        bounded worker pool with retry backoff. Returns {name: {platform: url}}
+        for every input name ({} = no socials or lookup failed).
+        """
+        names = list(names)
+        by_key: Dict[str, str] = {}  # Normalised name -> first spelling seen
+        for name in names:
+            by_key.setdefault(self.cache.key(name)[0], name)
+        
+        resolved: Dict[str, Dict[str, str]] = {}
+        pending = []
+        for name_key, name in by_key.items():
+            cached = self.cache.profiles(name, context)
+            if cached is not None:
+                resolved[name_key] = cached
+            elif name_key:
+                pending.append((name_key, name))
+        
+        done = 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            future_to_key = {executor.submit(self._lookup_with_backoff, name, context): (name_key, name)
+                             for name_key, name in pending}
+            for future in concurrent.futures.as_completed(future_to_key):
+                name_key, name = future_to_key[future]
+                try:
+                    found = future.result()
+                    self.cache.record(name, context, found)
+                except ImportError:
+                    found = {}
+                    print("googlesearch-python not installed")
+                except Exception as e:
+                    found = {}  # Not cached: retried next time
+                    print(f"Search error for {name}: {e}")
+                resolved[name_key] = found
+                done += 1
+                if progress_callback:
+                    progress_callback(done, len(pending))
+        
+        return {name: resolved.get(self.cache.key(name)[0], {}) for name in names}
+
     def clean_social_url(self, url: str) -> Optional[str]:
         """Extract username/handle from a raw URL"""
         if not url: return None
@@ -3183,6 +5558,12 @@ class SocialFinder:
         Generate Google Dork URLs for manual Deep Search.
         Based on User's Level 1-4 Operators.
         """
+        # Built once per (name, event); copy so callers can't alter the cached links
+        return dict(self._deep_search_links(name, event_name))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _deep_search_links(name: str, event_name: str) -> Dict[str, str]:
         import urllib.parse
         
         def make_link(query):
@@ -3221,12 +5602,22 @@ class SocialFinder:
 class RaceResultManager:
     """Manages race result analysis and outreach generation"""
 
-    def __init__(self, data_loader: DataLoader):
+    OUTREACH_GREETINGS = ["Hey", "Hi", "Hello"]
+    OUTREACH_CLOSINGS = ["How did it go?", "How was it for you?", "How was your race weekend?"]
+    # Compiled once per process; rendered drafts are memoised per rider/event
+    outreach_templates = TemplateEngine({
+        'review_done': "Hey {first_name}, great to see you out at {event}! Saw you already did your review - how are you feeling about the progress since then?",
+        'opener': "{greeting} {first_name}, I see you were out at {event} at the weekend. {closing}",
+    })
+
+    def __init__(self, data_loader: DataLoader, dashboard: Optional['FunnelDashboard'] = None):
         self.data_loader = data_loader
+        self.dashboard = dashboard  # For bulk imports (keeps dashboard indexes in step)
         self.riders = data_loader.riders
-        self.social_finder = SocialFinder()
+        self.social_finder = SocialFinder(cache=SocialProfileCache(data_loader.data_dir))
         self.circuit_file = os.path.join(data_loader.data_dir, "race_circuits.json")
         self.circuits = self._load_circuits()
+        self.analysis_store = RaceAnalysisStore(data_loader.data_dir)
 
     def _load_circuits(self) -> List[str]:
         if os.path.exists(self.circuit_file):
@@ -3249,75 +5640,33 @@ class RaceResultManager:
     def get_all_circuits(self) -> List[str]:
         return self.circuits
 
+    @property
+    def name_index(self) -> RiderNameIndex:
+        """Built on first use (the race tool isn't opened every session)"""
+        observers = self.data_loader.observers
+        if (getattr(self, '_name_index', None) is None or self._name_index.riders is not self.riders
+                or self._name_index_observers is not observers):
+            self._name_index = RiderNameIndex(self.riders)
+            self._name_index_observers = observers
+            if observers is not None:
+                observers.add(self._name_index)
+        return self._name_index
+
     def match_rider(self, raw_name: str) -> Optional[Rider]:
-        """Attempt to match a raw name from results to a database rider"""
+        """Attempt to match a raw name from results to a database rider (confident, unambiguous matches only)"""
         if not raw_name:
             return None
-            
-        clean_raw = raw_name.lower().strip()
-        
-        # Helper: remove common race result noise (e.g. "(G)", numbers)
-        # For now just simple whitespace
-        
-        # 1. Exact Match (Direct)
-        for email, rider in self.riders.items():
-            if rider.full_name.lower() == clean_raw:
-                return rider
-                
-        # 2. Try "Last, First" swap -> "First Last"
-        if ',' in clean_raw:
-            parts = clean_raw.split(',')
-            if len(parts) >= 2:
-                swapped = f"{parts[1].strip()} {parts[0].strip()}"
-                for email, rider in self.riders.items():
-                   if rider.full_name.lower() == swapped:
-                       return rider
-                       
-        # 3. Token-Based Match (Stricter)
-        # Require multiple parts to match to avoid "Joshua" matching "Joshua Ferrer"
-        # Logic: Both First and Last name tokens should be present
-        
-        raw_tokens = set(clean_raw.split())
-        
-        for email, rider in self.riders.items():
-            # SANITY CHECK: Ignore corrupt riders with massive names (e.g. concatenated strings)
-            if len(rider.full_name) > 60:
-                continue
-
-            db_name = rider.full_name.lower().strip()
-            db_tokens = set(db_name.split())
-            
-            # If names are identical (handled by 1), but let's re-verify intersection
-            if not db_tokens: continue
-            
-            common = raw_tokens.intersection(db_tokens)
-            
-            # CRITERIA:
-            # 1. If DB Name is longer than 1 word (e.g. "Joshua Ferrer"), we need at least 2 matches (First + Last)
-            # 2. If DB Name is 1 word, we need exact match (handled above) or complete inclusion? 
-            #    Actually user said "First and Last Name must match", implying single names shouldn't match multi-names loosely.
-            
-            if len(db_tokens) >= 2:
-                # Require at least 2 tokens to match (First & Last)
-                # This prevents "Joshua" (input) matching "Joshua Ferrer" (DB) -> No, "Joshua" input has 1 token.
-                # This prevents "Joshua Ferrer" (input) matching "Joshua Other" (DB) -> Common is 1 ("Joshua").
-                if len(common) >= 2:
-                    return rider
-            
-            # Special case: If input has only 1 name, we generally shouldn't match it to a 2-name person 
-            # unless it's a nickname field or exact match (handled above).
-            
-            # Fallback: What if input is "Josh Ferrer" vs "Joshua Ferrer"?
-            # That requires phonetic/substring or nickname matching. 
-            # For now, sticking to the user's request: "First and Last name must match".
-            # The token intersection handles "Joshua Ferrer" vs "Ferrer Joshua".
-            
-        return None
+        return self.name_index.best_match(raw_name)[0]
 
-    def process_race_results(self, raw_names: List[str], event_name: str) -> List[Dict]:
-        """Process a list of names and return match status"""
+    def process_race_results(self, raw_names: Iterable[Union[str, TimingEntry]], event_name: str) -> List[Dict]:
+        """
+        Process names (or TimingEntry items streamed from TimingSheetParser)
+        and return match status. Entries also carry position and class.
+        """
         results = []
-        for name in raw_names:
+        for item in raw_names:
+            entry = item if isinstance(item, TimingEntry) else None
+            name = entry.name if entry else item
             if not name.strip():
                 continue
             
@@ -3326,23 +5675,122 @@ class RaceResultManager:
             # We assume the input is relatively clean list of names
             
             clean_name = name.strip()
-            match = self.match_rider(clean_name)
-            
-            status = "match_found" if match else "new_prospect"
+            match, confidence, status, ranked = self.name_index.best_match(clean_name)
             
             # Determine appropriate stage/context
             current_stage = match.current_stage.value if match else "New"
             
             results.append({
+                "row": len(results),  # Key for RaceAnalysisStore updates
                 "original_name": clean_name,
                 "match_status": status,
                 "match": match, # Internal object
                 "matched_email": match.email if match else None,
                 "facebook_url": match.facebook_url if match else None,
-                "current_stage": current_stage
+                "current_stage": current_stage,
+                "match_confidence": round(confidence, 3),
+                # Scored alternatives, so ambiguous names can be resolved by hand
+                "candidates": [{"email": r.email, "name": r.full_name, "confidence": round(c, 3)} for r, c in ranked],
+                "position": entry.position if entry else None,
+                "race_class": entry.race_class if entry else ""
             })
         return results
 
+    def save_analysis(self, event_name: str, results: List[Dict]):
+        self.analysis_store.save_event(event_name, results)
+
+    def load_analysis(self, event_name: str) -> List[Dict]:
+        """Stored analysis rows with riders re-attached from the live riders dict"""
+        results = []
+        for row, rec in self.analysis_store.rows(event_name):
+            match = self.riders.get(rec['matched_email'].lower()) if rec['matched_email'] else None
+            status = rec['status']
+            candidates = []
+            if status == 'match_found' and match is None:
+                status = 'new_prospect'  # Rider was removed since
+            elif status == 'ambiguous':
+                _, _, _, ranked = self.name_index.best_match(rec['original_name'])
+                candidates = [{"email": r.email, "name": r.full_name, "confidence": round(c, 3)} for r, c in ranked]
+            results.append({
+                "row": row,
+                "original_name": rec['original_name'],
+                "match_status": status,
+                "match": match,
+                "matched_email": match.email if match else None,
+                "facebook_url": match.facebook_url if match else None,
+                "current_stage": match.current_stage.value if match else "New",
+                "match_confidence": float(rec['match_confidence']) if rec['match_confidence'] else None,
+                "candidates": candidates,
+                "position": int(rec['position']) if rec['position'].isdigit() else None,
+                "race_class": rec['race_class'],
+            })
+        return results
+
+    @staticmethod
+    def prospect_entry(raw_name: str) -> Optional[Dict[str, str]]:
+        """Minimal rider record for an unmatched result name (placeholder email from the name)"""
+        clean_name = "".join([c for c in raw_name if c.isalnum() or c == ' ']).strip()
+        if not clean_name:
+            return None
+        slug = clean_name.lower().replace(" ", "_")
+        parts = clean_name.split(' ')
+        return {
+            'email': f"no_email_{slug}",
+            'first_name': parts[0].title(),
+            'last_name': " ".join(parts[1:]).title() if len(parts) > 1 else "",
+        }
+
+    def bulk_import(self, results: List[Dict], event_name: str) -> List[Dict]:
+        """
+        Add every 'new_prospect' result as a Contact-stage lead in one batch.
+
+        Rider rows go to CSV, Airtable and Google Sheets in single batched
+        calls (add_new_riders), stage updates in one manual_updates append,
+        and conversion rates are recalculated once. Returns the results with
+        imported prospects switched to 'match_found'.
+        """
+        entries = []
+        email_for: Dict[int, str] = {}  # result index -> placeholder email
+        seen = set()
+        for i, r in enumerate(results):
+            if r['match_status'] != 'new_prospect':
+                continue
+            entry = self.prospect_entry(r['original_name'])
+            if not entry:
+                continue
+            email = entry['email']
+            email_for[i] = email
+            if email in seen or email in self.riders:
+                continue  # Same name twice in the results, or already imported
+            seen.add(email)
+            entry['notes'] = f"Race result import: {event_name}"
+            entries.append(entry)
+
+        if entries:
+            if self.dashboard is not None:
+                added = self.dashboard.add_new_riders(entries)
+            else:
+                added = self.data_loader.add_new_riders_to_db(entries)
+            self.data_loader.save_manual_updates([(email, FunnelStage.CONTACT.value) for email in added])
+
+            # Ensure outreach_date is set so they appear in filtered views
+            now = datetime.now()
+            for email in added:
+                if email in self.riders:
+                    self.riders[email].outreach_date = now
+
+            if self.dashboard is not None:
+                self.dashboard._calculate_conversion_rates()
+
+        updated = []
+        for i, r in enumerate(results):
+            rider = self.riders.get(email_for.get(i, ''))
+            if rider is not None:
+                r = dict(r, match_status='match_found', match=rider, matched_email=rider.email,
+                         facebook_url=rider.facebook_url, current_stage=rider.current_stage.value)
+            updated.append(r)
+        return updated
+
     def generate_outreach_message(self, result: Dict, event_name: str) -> str:
         """Generate a context-aware message based on User Templates"""
         name = result['original_name']
@@ -3356,29 +5804,42 @@ class RaceResultManager:
         # TEMPLATE: SEQUENCE 1 (Qualifying Struggle -> Free Training)
         # Context: saw them race, maybe qualified well but finished lower, or just general outreach
         # We will adapt the "Opening" message from the PDF
+        # Greeting/closing are seeded on rider + event so reruns show the same draft
+        seed = f"{(match.email if match else '') or name.lower()}|{event_name}"
+        values = {
+            'first_name': first_name,
+            'event': event_name,
+            'greeting': TemplateEngine.pick(self.OUTREACH_GREETINGS, seed + "|greeting"),
+            'closing': TemplateEngine.pick(self.OUTREACH_CLOSINGS, seed + "|closing"),
+        }
         
-        if result['match_status'] == 'match_found' and match:
-            # Context: Existing Contact
-            if match.race_weekend_review_status == 'completed':
-                return f"Hey {first_name}, great to see you out at {event_name}! Saw you already did your review - how are you feeling about the progress since then?"
-            else:
-                # Dynamic Message for Existing (similar to new but acknowledging connection?)
-                # For now using the same friendly pattern but maybe slightly warmer?
-                # Sticking to the requested template:
-                greeting = random.choice(["Hey", "Hi", "Hello"])
-                closing = random.choice(["How did it go?", "How was it for you?", "How was your race weekend?"])
-                
-                return f"{greeting} {first_name}, I see you were out at {event_name} at the weekend. {closing}"
-        else:
-             # Context: Cold / New
-             greeting = random.choice(["Hey", "Hi", "Hello"])
-             closing = random.choice(["How did it go?", "How was it for you?", "How was your race weekend?"])
-             
-             return f"{greeting} {first_name}, I see you were out at {event_name} at the weekend. {closing}"
+        if result['match_status'] == 'match_found' and match and match.race_weekend_review_status == 'completed':
+            # Context: Existing Contact who already did their review
+            return self.outreach_templates.render('review_done', **values)
+        # Context: Existing (review not done) or Cold / New - same friendly opener
+        return self.outreach_templates.render('opener', **values)
 
     def find_socials_for_prospect(self, name: str, context: str) -> Dict[str, str]:
         """Find socials for a prospect"""
         return self.social_finder.find_socials(name, context)
+
+    def resolve_socials(self, results: List[Dict], event_name: str,
+                        progress_callback=None) -> Dict[str, Dict[str, str]]:
+        """
+        Bulk social lookup for the unmatched names of a race analysis.
+        Riders already in the database are never searched: NO_SOCIALS riders
+        are recorded as negative results instead. Returns {original_name: {platform: url}}.
+        """
+        cache = self.social_finder.cache
+        names = []
+        for r in results:
+            match = r.get('match')
+            if r.get('match_status') == 'match_found' and match:
+                if match.current_stage == FunnelStage.NO_SOCIALS and cache.get(r['original_name'], event_name) is None:
+                    cache.record(r['original_name'], event_name, {})
+                continue
+            names.append(r['original_name'])
+        return self.social_finder.resolve_many(names, event_name, progress_callback=progress_callback)
     
     def get_manual_search_link(self, name: str) -> str:
         return self.social_finder.generate_search_link(name)
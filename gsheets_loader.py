@@ -38,7 +38,8 @@ def get_service_account_creds():
             "client_x509_cert_url": creds_info.get("client_x509_cert_url", "")
         }
         
-        SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+        SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
+                  'https://www.googleapis.com/auth/drive.metadata.readonly']  # modifiedTime checks
         
         creds = service_account.Credentials.from_service_account_info(
             service_account_info, scopes=SCOPES)
@@ -133,8 +134,47 @@ def load_google_sheet(sheet_url):
     except Exception as e:
         raise e
 
+def get_sheet_modified_time(sheet_url: str):
+    """
+    Returns the spreadsheet's Drive modifiedTime (RFC 3339 string), or None if
+    it can't be read (bad URL, no Drive access). Cheap metadata call used to
+    skip downloading values that haven't changed.
+    """
+    try:
+        creds = get_service_account_creds()
+        if not creds:
+            return None
+
+        if not creds.valid or creds.expired:
+            creds.refresh(Request())
+
+        if "/d/" in sheet_url:
+            spreadsheet_id = sheet_url.split("/d/")[1].split("/")[0]
+        else:
+            return None
+
+        headers = {"Authorization": f"Bearer {creds.token}"}
+        api_url = f"https://www.googleapis.com/drive/v3/files/{spreadsheet_id}"
+        resp = requests.get(api_url, headers=headers, params={"fields": "modifiedTime", "supportsAllDrives": "true"})
+
+        if resp.status_code != 200:
+            print(f"GSheet Modified Time Error {resp.status_code}: {resp.text}")
+            return None
+        return resp.json().get("modifiedTime")
+
+    except Exception as e:
+        print(f"GSheet Modified Time Exception: {e}")
+        return None
+
 def append_row_to_sheet(sheet_url: str, row_data: list):
     """Appends a row of data to the specified Google Sheet"""
+    return append_rows_to_sheet(sheet_url, [row_data])
+
+def append_rows_to_sheet(sheet_url: str, rows: list):
+    """Appends many rows to the specified Google Sheet in a single API call"""
+    if not rows:
+        return True
+
     try:
         creds = get_service_account_creds()
         if not creds:
@@ -192,9 +232,9 @@ def append_row_to_sheet(sheet_url: str, row_data: list):
             "insertDataOption": "INSERT_ROWS"
         }
         
-        # Payload
+        # Payload (all rows in one request)
         body = {
-            "values": [row_data]
+            "values": rows
         }
         
         resp = requests.post(api_url, headers=headers, params=params, json=body)
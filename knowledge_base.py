@@ -0,0 +1,256 @@
+"""
+Knowledge Base
+==============
+Pre-extracted text of the bundled message-script PDFs (DM writer
+knowledge base, pipeline messages and follow ups, conversation
+sequences, tone guides...), split into passages and indexed for search.
+
+`build()` parses every PDF in the data dir in a process pool and caches
+the page text per file hash in knowledge_base_index.json, so unchanged
+(or duplicate) PDFs are never parsed twice. The app calls
+`load_or_build()`: it reads that JSON, and only builds it (once) when a
+fresh checkout has none yet.
+
+Rebuild after adding or editing PDFs:
+    python extract_all_pdfs.py [data_dir]
+"""
+
+import concurrent.futures
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+try:
+    from pypdf import PdfReader
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+
+@dataclass
+class Passage:
+    """One searchable chunk of a PDF page"""
+    source: str  # PDF filename
+    page: int    # 1-based
+    text: str
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def extract_pdf_pages(path: str) -> List[str]:
+    """Text of each page (runs in a worker process)"""
+    reader = PdfReader(path)
+    pages = []
+    for page in reader.pages:
+        try:
+            pages.append(page.extract_text() or '')
+        except Exception as e:
+            print(f"Error reading page of {path}: {e}")
+            pages.append('')
+    return pages
+
+
+class KnowledgeBase:
+    """Passage index over the PDF scripts, backed by a per-file-hash text cache"""
+
+    INDEX_FILE = "knowledge_base_index.json"
+    MAX_WORKERS = None      # Process pool size (None = one per CPU)
+    MIN_PASSAGE = 40        # Shorter blocks are merged into the next one
+    MAX_PASSAGE = 800       # Longer blocks are split on line breaks
+    STOP_WORDS = {
+        'the', 'and', 'you', 'your', 'for', 'are', 'was', 'but', 'not', 'have', 'has', 'had',
+        'this', 'that', 'with', 'from', 'they', 'them', 'what', 'when', 'how', 'can', 'just',
+        'its', "it's", 'our', 'out', 'all', 'any', 'get', 'got', 'would', 'could', 'there',
+        'their', 'been', 'were', 'will', 'about', 'into', 'then', 'than', 'also', 'yeah',
+    }
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.index_path = os.path.join(data_dir, self.INDEX_FILE)
+        self.files: Dict[str, str] = {}               # PDF filename -> content hash
+        self.pages: Dict[str, List[str]] = {}         # Content hash -> page texts
+        self.passages: List[Passage] = []
+        self._postings: Dict[str, Dict[int, int]] = {}  # Token -> {passage id: term count}
+        self._lengths: List[int] = []
+        self._avg_length = 1.0
+
+    # --- extraction ------------------------------------------------------
+
+    def build(self, extractor: Callable[[str], List[str]] = extract_pdf_pages) -> Dict[str, int]:
+        """
+        Parse new or changed PDFs in parallel and rewrite the index.
+        Returns {'files', 'parsed', 'cached', 'errors', 'passages'}.
+        """
+        self.load()
+        cached_pages = self.pages
+        stats = {'files': 0, 'parsed': 0, 'cached': 0, 'errors': 0, 'passages': 0}
+
+        files: Dict[str, str] = {}
+        to_parse: Dict[str, str] = {}  # Hash -> path (duplicate PDFs parsed once)
+        for path in sorted(glob.glob(os.path.join(self.data_dir, "*.pdf"))):
+            try:
+                digest = file_hash(path)
+            except OSError as e:
+                print(f"Error hashing {path}: {e}")
+                stats['errors'] += 1
+                continue
+            files[os.path.basename(path)] = digest
+            if digest in cached_pages:
+                stats['cached'] += 1
+            elif digest not in to_parse:
+                to_parse[digest] = path
+
+        pages = {digest: cached_pages[digest] for digest in set(files.values()) if digest in cached_pages}
+        if to_parse and extractor is extract_pdf_pages and not HAS_PYPDF:
+            print("pypdf not installed - new PDFs are not indexed")
+            to_parse = {}
+
+        if to_parse:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                future_to_hash = {executor.submit(extractor, path): digest for digest, path in to_parse.items()}
+                for future in concurrent.futures.as_completed(future_to_hash):
+                    digest = future_to_hash[future]
+                    try:
+                        pages[digest] = future.result()
+                        stats['parsed'] += 1
+                    except Exception as e:
+                        print(f"Error reading {to_parse[digest]}: {e}")
+                        stats['errors'] += 1
+
+        # Files that failed to parse stay out of the index (retried next build)
+        self.files = {name: digest for name, digest in files.items() if digest in pages}
+        self.pages = pages
+        self._save()
+        self._index()
+        stats['files'] = len(self.files)
+        stats['passages'] = len(self.passages)
+        return stats
+
+    def _save(self):
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files, 'pages': self.pages}, f)
+
+    def load(self) -> bool:
+        """Read the pre-extracted index (no PDF parsing). False if there is none yet."""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data.get('files', {})
+            self.pages = data.get('pages', {})
+        except Exception as e:
+            print(f"Error loading knowledge base: {e}")
+            return False
+        self._index()
+        return True
+
+    def load_or_build(self) -> bool:
+        """load(), building the index first if there is none yet (fresh checkout)"""
+        if self.load():
+            return True
+        if not glob.glob(os.path.join(self.data_dir, "*.pdf")):
+            return False
+        if not HAS_PYPDF:
+            print("No knowledge base index and pypdf not installed - run: pip install pypdf && python extract_all_pdfs.py")
+            return False
+        try:
+            stats = self.build()
+        except Exception as e:
+            print(f"Error building knowledge base: {e}")
+            return False
+        print(f"Built knowledge base: {stats['files']} PDFs -> {stats['passages']} passages")
+        return bool(self.passages)
+
+    # --- passages & search -----------------------------------------------
+
+    @classmethod
+    def split_passages(cls, text: str) -> List[str]:
+        """Blank-line separated blocks, merged up to MIN_PASSAGE and split down to MAX_PASSAGE"""
+        blocks = [' '.join(b.split()) for b in re.split(r'\n\s*\n', text or '')]
+        passages: List[str] = []
+        carry = ''
+        for block in blocks:
+            if not block:
+                continue
+            block = f"{carry} {block}".strip() if carry else block
+            if len(block) < cls.MIN_PASSAGE:
+                carry = block
+                continue
+            carry = ''
+            while len(block) > cls.MAX_PASSAGE:
+                cut = block.rfind('. ', 0, cls.MAX_PASSAGE)
+                cut = cut + 1 if cut > cls.MIN_PASSAGE else cls.MAX_PASSAGE
+                passages.append(block[:cut].strip())
+                block = block[cut:].strip()
+            if block:
+                passages.append(block)
+        if carry:
+            passages.append(carry)
+        return passages
+
+    @classmethod
+    def tokens(cls, text: str) -> List[str]:
+        return [t for t in re.findall(r"[a-z0-9']+", (text or '').lower()) if len(t) > 2 and t not in cls.STOP_WORDS]
+
+    def _index(self):
+        self.passages = []
+        seen_hashes = set()
+        for name, digest in sorted(self.files.items()):
+            if digest in seen_hashes:
+                continue  # Same PDF saved twice, e.g. "KNOWLEDGE BASE (1).pdf"
+            seen_hashes.add(digest)
+            for page_no, page_text in enumerate(self.pages.get(digest, []), start=1):
+                for text in self.split_passages(page_text):
+                    self.passages.append(Passage(source=name, page=page_no, text=text))
+
+        postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths = []
+        for pid, passage in enumerate(self.passages):
+            counts = Counter(self.tokens(passage.text))
+            self._lengths.append(sum(counts.values()))
+            for token, n in counts.items():
+                postings[token][pid] = n
+        self._postings = dict(postings)
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 1.0
+
+    def search(self, query: str, k: int = 3, sources: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Best passages for a query (BM25 over the passage tokens).
+        Returns [{'text', 'source', 'page', 'score'}], best first.
+        """
+        if not self.passages:
+            return []
+        n = len(self.passages)
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(self.tokens(query)):
+            posting = self._postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for pid, tf in posting.items():
+                norm = tf + 1.2 * (0.25 + 0.75 * self._lengths[pid] / self._avg_length)
+                scores[pid] += idf * tf * 2.2 / norm
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        results = []
+        for pid, score in ranked:
+            passage = self.passages[pid]
+            if sources and passage.source not in sources:
+                continue
+            results.append({'text': passage.text, 'source': passage.source, 'page': passage.page, 'score': score})
+            if len(results) >= k:
+                break
+        return results
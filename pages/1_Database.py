@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from funnel_manager import FunnelDashboard, FunnelStage
+from funnel_manager import FunnelStage
 import os
 import sys
 
@@ -9,6 +9,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ui_components import render_unified_card_content
+from dashboard_service import get_dashboard_service, edit_dashboard
 
 # Directory setup (replicated from app.py to ensure consistency)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -43,13 +44,8 @@ div.stButton > button {
 def view_unified_dialog_db(r, dashboard):
     render_unified_card_content(r, dashboard, key_suffix="_db_page")
 
-# Initialize System
-@st.cache_resource
-def get_dashboard():
-    return FunnelDashboard(DATA_DIR)
-
-dashboard = get_dashboard()
-# dashboard.reload_data() # Removed for performance: get_dashboard returns cached loaded instance
+# Initialize System (same shared instance as the main app, no second load)
+dashboard = get_dashboard_service(DATA_DIR).current()
 
 # --- SIDEBAR: ADD NEW RIDER ---
 with st.sidebar:
@@ -64,18 +60,19 @@ with st.sidebar:
         if submitted:
             if new_email:
                 # Use centralized method which triggers Airtable Sync
-                dashboard.add_new_rider(
-                    email=new_email,
-                    first_name=new_first,
-                    last_name=new_last,
-                    fb_url="", # Not in form
-                    championship=new_champ
-                )
-                # Ensure stage is set to CONTACT
-                dashboard.update_rider_stage(new_email, FunnelStage.CONTACT)
+                with edit_dashboard(DATA_DIR) as live:
+                    live.add_new_rider(
+                        email=new_email,
+                        first_name=new_first,
+                        last_name=new_last,
+                        fb_url="", # Not in form
+                        championship=new_champ
+                    )
+                    # Ensure stage is set to CONTACT
+                    live.update_rider_stage(new_email, FunnelStage.CONTACT)
                 
                 st.success(f"Added {new_first} {new_last}")
-                dashboard.reload_data()
+                get_dashboard_service(DATA_DIR).reload()
                 st.rerun()
             else:
                 st.error("Email is required.")
@@ -83,7 +80,7 @@ with st.sidebar:
 # --- MAIN PAGE: DATABASE ---
 st.title("🗃️ Rider Database")
 
-riders = list(dashboard.riders.values())
+riders = dashboard.riders
 st.markdown(f"**Total Riders:** {len(riders)}")
 
 # 1. Search & Filter
@@ -91,33 +88,21 @@ c1, c2 = st.columns([2, 1])
 search_query = c1.text_input("🔍 Search by Name, Email, or Championship", placeholder="Type to search...").lower()
 filter_stage = c2.selectbox("Filter by Status", ["All"] + [s.value for s in FunnelStage])
 
-# 2. Logic
-filtered_riders = []
-for r in riders:
-    # Text Search
-    search_text = f"{r.full_name} {r.email} {r.championship or ''}".lower()
-    if search_query and search_query not in search_text:
-        continue
-        
-    # Stage Filter
-    if filter_stage != "All" and r.current_stage.value != filter_stage:
-        continue
-        
-    filtered_riders.append(r)
+# 2. Logic (indexed search, only the requested page is materialised)
+stage_filter = None if filter_stage == "All" else [FunnelStage(filter_stage)]
+total_matches = len(dashboard.search_index.match(search_query, stage_filter))
 
 st.divider()
 
 # 3. Grid View
 # Pagination (Simple)
 items_per_page = 50
-total_pages = max(1, (len(filtered_riders) + items_per_page - 1) // items_per_page)
+total_pages = max(1, (total_matches + items_per_page - 1) // items_per_page)
 current_page = st.number_input("Page", min_value=1, max_value=total_pages, value=1)
-start_idx = (current_page - 1) * items_per_page
-end_idx = start_idx + items_per_page
 
-view_riders = filtered_riders[start_idx:end_idx]
+_, view_riders = dashboard.search_riders(search_query, stage_filter, page=current_page, per_page=items_per_page)
 
-st.caption(f"Showing {len(view_riders)} of {len(filtered_riders)} (Total: {len(riders)})")
+st.caption(f"Showing {len(view_riders)} of {total_matches} (Total: {len(riders)})")
 
 if not view_riders:
     st.info("No riders found matching your criteria.")
@@ -0,0 +1,160 @@
+"""
+Google Sheets Background Refresher
+==================================
+Keeps the Google Sheets overrides fresh on a daemon thread so page loads
+never wait on the Sheets API.
+
+Every poll checks each spreadsheet's Drive modifiedTime first and only
+downloads the values of sheets that changed. A new overrides dict is then
+published with a single reference swap; readers always get the last good
+snapshot. A sheet that fails to load keeps its previous DataFrame; a
+sheet that loads empty after a change replaces its override with the
+empty frame (the sheet was cleared).
+"""
+
+import concurrent.futures
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from gsheets_loader import load_google_sheet, get_sheet_modified_time
+
+
+@dataclass(frozen=True)
+class SheetsSnapshot:
+    """Published state: never mutated, replaced wholesale on change"""
+    overrides: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    missing_keys: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    stamp: Optional[str] = None  # When the overrides content last changed
+
+    def as_tuple(self) -> Tuple[Dict[str, pd.DataFrame], List[str], List[str], Optional[str]]:
+        return self.overrides, self.missing_keys, self.errors, self.stamp
+
+
+class SheetsRefresher:
+    """Polls the configured sheets and swaps in changed overrides"""
+
+    INTERVAL_SECONDS = 300  # Same cadence as the old 5 minute cache
+    MAX_WORKERS = 5
+
+    _active: Optional['SheetsRefresher'] = None  # Only one polling thread per process
+
+    def __init__(self, sheet_config: Dict[str, str], sheet_urls: Dict[str, str],
+                 interval: int = INTERVAL_SECONDS,
+                 loader: Callable[[str], Optional[pd.DataFrame]] = load_google_sheet,
+                 modified_time: Callable[[str], Optional[str]] = get_sheet_modified_time):
+        """
+        sheet_config: secret key -> internal filename (e.g. "rider_db" -> "Rider Database.csv")
+        sheet_urls: secret key -> Google Sheet URL (st.secrets["sheets"])
+        """
+        self.interval = interval
+        self.loader = loader
+        self.modified_time = modified_time
+        self.tasks: Dict[str, Tuple[str, str]] = {}
+        missing = []
+        for secret_key, internal_file in sheet_config.items():
+            url = sheet_urls.get(secret_key, "")
+            if url:
+                self.tasks[secret_key] = (url, internal_file)
+            else:
+                missing.append(secret_key)
+
+        self._modified: Dict[str, str] = {}  # secret key -> modifiedTime of the loaded values
+        self._snapshot = SheetsSnapshot(missing_keys=missing)
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> SheetsSnapshot:
+        return self._snapshot
+
+    def _changed_keys(self) -> List[str]:
+        """Sheets whose spreadsheet was modified since we loaded it (or never loaded)"""
+        loaded = self._snapshot.overrides
+        modified_by_id: Dict[str, Optional[str]] = {}  # One Drive call per spreadsheet (tabs share it)
+        changed = []
+        for key, (url, internal_file) in self.tasks.items():
+            sheet_id = url.split("/d/")[1].split("/")[0] if "/d/" in url else url
+            if sheet_id not in modified_by_id:
+                modified_by_id[sheet_id] = self.modified_time(url)
+            stamp = modified_by_id[sheet_id]
+            if stamp is None or stamp != self._modified.get(key) or internal_file not in loaded:
+                changed.append((key, stamp))
+        return changed
+
+    def refresh_once(self) -> bool:
+        """One poll. Returns True if new overrides were published."""
+        with self._refresh_lock:
+            current = self._snapshot
+            changed = self._changed_keys()
+            fresh: Dict[str, pd.DataFrame] = {}
+            errors = []
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+                future_to_key = {
+                    executor.submit(self.loader, self.tasks[key][0]): (key, stamp)
+                    for key, stamp in changed
+                }
+                for future in concurrent.futures.as_completed(future_to_key):
+                    key, stamp = future_to_key[future]
+                    internal_file = self.tasks[key][1]
+                    try:
+                        df = future.result()
+                    except Exception as exc:
+                        errors.append(f"{key}: {exc}")
+                        print(f"Error loading {key}: {exc}")
+                        continue
+                    if df is None:
+                        continue  # Not loadable (no credentials / bad URL): keep the old override, retry next poll
+                    # Empty on first load: no override (local CSV applies). Empty after a change: publish it.
+                    if not df.empty or internal_file in current.overrides:
+                        fresh[internal_file] = df
+                    if stamp is not None:
+                        self._modified[key] = stamp
+
+            # Sheets without a modifiedTime are always re-downloaded; only publish real changes
+            content_changed = {
+                name: df for name, df in fresh.items()
+                if name not in current.overrides or not df.equals(current.overrides[name])
+            }
+            if not content_changed and errors == current.errors:
+                return False
+
+            overrides = dict(current.overrides)
+            overrides.update(content_changed)
+            self._snapshot = SheetsSnapshot(
+                overrides=overrides,
+                missing_keys=current.missing_keys,
+                errors=errors,
+                stamp=datetime.now().isoformat() if content_changed else current.stamp,
+            )
+            return bool(content_changed)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print(f"Sheets refresher error: {e}")
+
+    def start(self):
+        """Initial (blocking) load, then poll in the background"""
+        previous = SheetsRefresher._active
+        if previous is not None and previous is not self:
+            previous.stop()
+        SheetsRefresher._active = self
+
+        if self._snapshot.stamp is None:
+            self.refresh_once()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sheets-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
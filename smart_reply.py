@@ -1,6 +1,7 @@
 import pandas as pd
 import os
 from difflib import SequenceMatcher
+from knowledge_base import KnowledgeBase
 
 class SmartReplyManager:
     def __init__(self, data_dir, rider_db=None):
@@ -15,6 +16,11 @@ class SmartReplyManager:
              self._identify_winners(rider_db)
              
         self.load_history()
+        
+        # Scripted replies from the PDF knowledge base (pre-extracted index; built once if missing)
+        self.knowledge_base = KnowledgeBase(data_dir)
+        if self.knowledge_base.load_or_build():
+            print(f"Loaded {len(self.knowledge_base.passages)} script passages for Smart Reply.")
 
     def _identify_winners(self, rider_db):
         """Builds a set of names/emails responsible for Sales/Client status."""
@@ -138,3 +144,9 @@ class SmartReplyManager:
             }
         
         return None
+
+    def find_scripted_replies(self, input_text, k=3):
+        """Relevant passages from the PDF scripts / tone guides for the given input text."""
+        if not input_text:
+            return []
+        return self.knowledge_base.search(input_text, k=k)
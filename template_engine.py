@@ -0,0 +1,81 @@
+"""
+Template Engine
+===============
+Precompiled message templates for outreach drafts.
+
+Each template is parsed once into literal and {slot} segments; rendering
+is a single join. Rendered text is memoised per (template, slot values),
+so a rider/event pair is only ever rendered once per process.
+
+Random-looking choices (greetings, closings) are picked deterministically
+from a seed such as the rider's email plus the event, so Streamlit
+reruns don't reshuffle a draft the user is looking at.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class CompiledTemplate:
+    """Template split into literal text and slot names"""
+
+    SLOT = re.compile(r'\{(\w+)\}')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.segments: List[Tuple[bool, str]] = []  # (is_slot, literal text or slot name)
+        pos = 0
+        for m in self.SLOT.finditer(text):
+            if m.start() > pos:
+                self.segments.append((False, text[pos:m.start()]))
+            self.segments.append((True, m.group(1)))
+            pos = m.end()
+        if pos < len(text):
+            self.segments.append((False, text[pos:]))
+        self.slots = {seg for is_slot, seg in self.segments if is_slot}
+
+    def render(self, values: Dict[str, str]) -> str:
+        # Unknown slots are left as written (same as the old str.replace("{name}", ...))
+        return ''.join(values.get(seg, '{' + seg + '}') if is_slot else seg for is_slot, seg in self.segments)
+
+
+class TemplateEngine:
+    """Named templates, compiled once, with memoised rendering"""
+
+    MAX_CACHE = 5000  # Rendered strings kept before the memo is cleared
+
+    def __init__(self, templates: Optional[Dict[str, str]] = None):
+        self.templates: Dict[str, CompiledTemplate] = {}
+        self._cache: Dict[tuple, str] = {}
+        for key, text in (templates or {}).items():
+            self.add(key, text)
+
+    def add(self, key: str, text: str):
+        self.templates[key] = CompiledTemplate(text)
+        self._cache = {k: v for k, v in self._cache.items() if k[0] != key}
+
+    def keys(self) -> List[str]:
+        return list(self.templates)
+
+    def render(self, key: str, /, **values: str) -> str:
+        template = self.templates[key]
+        # Only the slots this template uses take part in the memo key
+        memo = (key,) + tuple((slot, values.get(slot)) for slot in sorted(template.slots))
+        text = self._cache.get(memo)
+        if text is None:
+            if len(self._cache) >= self.MAX_CACHE:
+                self._cache.clear()
+            text = template.render(values)
+            self._cache[memo] = text
+        return text
+
+    def render_all(self, keys: Optional[Iterable[str]] = None, /, **values: str) -> Dict[str, str]:
+        """Every (or the listed) template rendered with the same values, in template order"""
+        return {key: self.render(key, **values) for key in (keys or self.templates)}
+
+    @staticmethod
+    def pick(options: Sequence[str], seed: str) -> str:
+        """Stable choice from options for a seed (same seed -> same option on every rerun)"""
+        digest = hashlib.md5(seed.encode('utf-8')).digest()
+        return options[int.from_bytes(digest[:4], 'big') % len(options)]
@@ -0,0 +1,208 @@
+"""
+Timing Sheet Parser
+===================
+Streams race timing exports (CSV, TSV or pasted text) and yields one
+normalised TimingEntry per competitor.
+
+The header is inspected once to find the name, position, class, number
+and best-lap columns; rows are then read lazily, so a whole weekend of
+sessions can be fed straight into RaceResultManager.process_race_results.
+A header line that reappears mid-stream (several sessions pasted or
+concatenated together) re-maps the columns and starts a new session.
+Input without a recognisable header is read one competitor per line,
+taking the first cell that isn't a position, number or lap time; a
+caller can instead name the column to use (manual column picker).
+"""
+
+import csv
+import io
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+
+@dataclass
+class TimingEntry:
+    """One competitor line from a timing sheet"""
+    name: str
+    position: Optional[int] = None  # None when classified DNF/DNS/DSQ
+    status: str = ""                # Raw position text when not a number (e.g. "DNF")
+    race_class: str = ""
+    number: str = ""
+    best_lap: Optional[float] = None  # Seconds
+    session: int = 0                # Increments at each header found in the stream
+
+
+class TimingSheetParser:
+    """Header-driven, streaming parser for timing sheet exports"""
+
+    # Normalised header -> field. Checked exactly, then by substring for 'name'.
+    COLUMN_ALIASES = {
+        'name': ['competitor', 'name', 'rider', 'driver', 'racer', 'full name', 'rider name', 'driver name'],
+        'first_name': ['first name', 'firstname', 'forename'],
+        'last_name': ['last name', 'lastname', 'surname'],
+        'position': ['pos', 'pos.', 'position', 'place', 'p', 'rank'],
+        'race_class': ['class', 'category', 'cls', 'cat'],
+        'number': ['start number', 'no', 'no.', '#', 'number', 'nr', 'race number'],
+        'best_lap': ['best lap', 'best', 'best time', 'fastest lap', 'best lap time'],
+    }
+    ALIAS_TO_FIELD = {alias: fld for fld, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+    DELIMITERS = ['\t', ',', ';']
+    LAP_TIME = re.compile(r'^(?:(\d+):)?(\d+(?:\.\d+)?)$')
+    # Plain-text lines like "1. John Smith 1:46.509" -> "John Smith"
+    TEXT_NOISE = re.compile(r'^\s*(?:\d+|DNF|DNS|DSQ)[.)]?\s+|\s+\d+:\d+(?:\.\d+)?.*$', re.IGNORECASE)
+    # Headerless cells that are positions, race numbers, lap times or statuses rather than names
+    NON_NAME = re.compile(r'^(?:#?\d[\d.:,)]*|DNF|DNS|DSQ|NC)$', re.IGNORECASE)
+
+    def __init__(self, name_column: Optional[int] = None, first_row_header: bool = True):
+        # Manual column choice for sheets whose header isn't recognised
+        self.name_column = name_column
+        self.first_row_header = first_row_header
+        self.first_row: List[str] = []  # Cells of the first row seen by the last parse (picker labels)
+        self.headers_found = 0          # Header rows mapped by the last parse
+
+    @staticmethod
+    def _norm(header: str) -> str:
+        return ' '.join(str(header).lower().replace('_', ' ').split())
+
+    def detect_delimiter(self, line: str) -> Optional[str]:
+        counts = {d: line.count(d) for d in self.DELIMITERS}
+        best = max(counts, key=counts.get)
+        return best if counts[best] else None
+
+    def map_header(self, cells: List[str]) -> Optional[Dict[str, int]]:
+        """Field -> column index if this row looks like a header, else None"""
+        mapping: Dict[str, int] = {}
+        for i, cell in enumerate(cells):
+            fld = self.ALIAS_TO_FIELD.get(self._norm(cell))
+            if fld and fld not in mapping:
+                mapping[fld] = i
+        if 'name' not in mapping and not ('first_name' in mapping or 'last_name' in mapping):
+            # Looser match, e.g. "Competitor Name" / "Rider (Team)"
+            for i, cell in enumerate(cells):
+                norm = self._norm(cell)
+                if 'name' in norm or 'rider' in norm or 'driver' in norm:
+                    mapping['name'] = i
+                    break
+        has_name = 'name' in mapping or 'first_name' in mapping or 'last_name' in mapping
+        # A real header names at least two known columns (a lone "Name" line counts too)
+        if has_name and (len(mapping) >= 2 or len(cells) == 1):
+            return mapping
+        return None
+
+    @classmethod
+    def parse_lap_time(cls, text: str) -> Optional[float]:
+        """'1:46.509' -> 106.509, '46.5' -> 46.5; None if not a time"""
+        m = cls.LAP_TIME.match((text or '').strip())
+        if not m:
+            return None
+        minutes = int(m.group(1)) if m.group(1) else 0
+        seconds = minutes * 60 + float(m.group(2))
+        return seconds or None  # 0.000 = no lap set (DNS)
+
+    @staticmethod
+    def clean_name(name: str) -> str:
+        return ' '.join(str(name).split()).strip(' ,')
+
+    def _entry(self, cells: List[str], mapping: Dict[str, int], session: int) -> Optional[TimingEntry]:
+        def cell(fld: str) -> str:
+            i = mapping.get(fld)
+            return cells[i].strip() if i is not None and i < len(cells) else ''
+
+        name = cell('name') or f"{cell('first_name')} {cell('last_name')}"
+        name = self.clean_name(name)
+        if not name:
+            return None
+        pos_text = cell('position')
+        position = int(pos_text) if pos_text.isdigit() else None
+        return TimingEntry(
+            name=name,
+            position=position,
+            status='' if position is not None else pos_text,
+            race_class=cell('race_class'),
+            number=cell('number'),
+            best_lap=self.parse_lap_time(cell('best_lap')),
+            session=session,
+        )
+
+    def headerless_name(self, line: str, cells: List[str], delimiter: Optional[str]) -> str:
+        """
+        Name from a row with no mapped header: the first cell that isn't a
+        position/number/time ("1,John Smith,Yamaha" -> "John Smith"). A
+        comma row with no such cell is one pasted name ("Smith, John").
+        """
+        if delimiter == ',' and not any(self.NON_NAME.match(c.strip()) for c in cells):
+            return self.clean_name(self.TEXT_NOISE.sub('', line))
+        for c in cells:
+            name = self.clean_name(self.TEXT_NOISE.sub('', c))
+            if name and not self.NON_NAME.match(name):
+                return name
+        return ''
+
+    def parse(self, lines: Iterable[str]) -> Iterator[TimingEntry]:
+        """Yield entries from an iterable of text lines (file object, splitlines(), ...)"""
+        delimiter: Optional[str] = None
+        mapping: Optional[Dict[str, int]] = None
+        session = 0
+        self.first_row = []
+        self.headers_found = 0
+
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            # Sessions exported separately may mix CSV and TSV; re-detect when the delimiter is absent
+            line_delimiter = delimiter if delimiter and delimiter in line else self.detect_delimiter(line)
+            cells = next(csv.reader([line], delimiter=line_delimiter)) if line_delimiter else [line]
+            first = not self.first_row
+            if first:
+                self.first_row = cells
+
+            if self.name_column is not None:
+                # Manual column: no header detection, the chosen column is the name
+                if first:
+                    delimiter = line_delimiter
+                    session = 1
+                    if self.first_row_header:
+                        continue
+                entry = self._entry(cells, {'name': self.name_column}, session)
+                if entry is not None:
+                    yield entry
+                continue
+
+            header = self.map_header(cells)
+            if header is not None:
+                mapping = header
+                delimiter = line_delimiter
+                session += 1
+                self.headers_found += 1
+                continue
+
+            if mapping is None:
+                # No header (yet): one competitor per line
+                name = self.headerless_name(line, cells, line_delimiter)
+                if name:
+                    yield TimingEntry(name=name, session=session)
+                continue
+
+            entry = self._entry(cells, mapping, session)
+            if entry is not None:
+                yield entry
+
+    def parse_file(self, source: Union[str, io.IOBase], encoding: str = 'utf-8-sig') -> Iterator[TimingEntry]:
+        """Stream a path or an open (binary or text) file, e.g. a Streamlit upload"""
+        if isinstance(source, str):
+            with open(source, 'r', encoding=encoding, errors='replace', newline='') as f:
+                yield from self.parse(f)
+            return
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        if isinstance(source, io.TextIOBase):
+            yield from self.parse(source)
+        else:
+            text = io.TextIOWrapper(source, encoding=encoding, errors='replace', newline='')
+            try:
+                yield from self.parse(text)
+            finally:
+                text.detach()  # Leave the caller's buffer open
@@ -2,6 +2,8 @@ import streamlit as st
 import urllib.parse
 from datetime import datetime, timedelta
 from funnel_manager import FunnelStage
+from template_engine import TemplateEngine
+from dashboard_service import edit_dashboard
 
 # --- CONSTANTS ---
 REPLY_TEMPLATES = {
@@ -82,6 +84,17 @@ Craig""",
 I have a few slots open this week if you want to dial in your plan for the season?"""
 }
 
+# Race outreach openers (shown above the reply deck for new prospects)
+RACE_OUTREACH_TEMPLATES = {
+    "1. Cold Outreach (Weekend)": "Hey {name}, I see you were out at {event}. How was the weekend for you?",
+    "1. Cold Outreach (Series)": "Hi {name}, I see you were out at {event}. How's the series going for you so far?",
+    "1. Cold Outreach (Season)": "Hey {name}, I see you were out at {event}. How's the season treating you?",
+    "Blank Hook": "Hey {name}, "
+}
+
+# Compiled once per process; rendered drafts are memoised per name/event
+OUTREACH_TEMPLATES = TemplateEngine({**RACE_OUTREACH_TEMPLATES, **REPLY_TEMPLATES})
+
 def render_unified_card_content(rider, dashboard, key_suffix="", default_event_name=None):
     """
     Renders the rich contact card (2 columns).
@@ -157,9 +170,8 @@ def render_unified_card_content(rider, dashboard, key_suffix="", default_event_n
              draft_msg = dashboard.generate_outreach_message(mock_raw, default_event_name)
              
         elif tmpl_key in REPLY_TEMPLATES:
-            raw_msg = REPLY_TEMPLATES[tmpl_key]
             first_name = rider.first_name or (rider.full_name.split(' ')[0] if rider.full_name else "Mate")
-            draft_msg = raw_msg.replace("{name}", first_name)
+            draft_msg = OUTREACH_TEMPLATES.render(tmpl_key, name=first_name)
             
         # Session State for Message Body
         msg_key = f"uni_msg_{rider.email}_{key_suffix}"
@@ -268,20 +280,23 @@ def render_unified_card_content(rider, dashboard, key_suffix="", default_event_n
         
         # 1. Messaged
         if c_step1.button("🚀 Messaged", key=f"q_msg_{rider.email}_{key_suffix}", use_container_width=True):
-            dashboard.update_rider_stage(rider.email, FunnelStage.MESSAGED)
+            with edit_dashboard(dashboard.data_dir) as live:
+                live.update_rider_stage(rider.email, FunnelStage.MESSAGED)
             st.toast(f"Marked {rider.first_name} as Messaged!")
             st.rerun()
             
         # 2. Replied
         if c_step2.button("↩️ Replied", key=f"q_rep_{rider.email}_{key_suffix}", use_container_width=True):
-                dashboard.update_rider_stage(rider.email, FunnelStage.REPLIED)
+                with edit_dashboard(dashboard.data_dir) as live:
+                    live.update_rider_stage(rider.email, FunnelStage.REPLIED)
                 st.toast(f"Marked {rider.first_name} as Replied!")
                 st.rerun()
 
         # 3. Link Sent
         if c_step3.button("🔗 Link Sent", key=f"q_lnk_btn_{rider.email}_{key_suffix}", use_container_width=True):
             try:
-                dashboard.update_rider_stage(rider.email, FunnelStage.LINK_SENT)
+                with edit_dashboard(dashboard.data_dir) as live:
+                    live.update_rider_stage(rider.email, FunnelStage.LINK_SENT)
                 st.toast(f"✅ Status updated: Link Sent!", icon="🔗")
                 st.rerun()
             except Exception as e:
@@ -297,19 +312,22 @@ def render_unified_card_content(rider, dashboard, key_suffix="", default_event_n
         
         if b1.button("+3 Days", key=f"fu_3d_{rider.email}_{key_suffix}", use_container_width=True):
             new_date = now + timedelta(days=3)
-            dashboard.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
+            with edit_dashboard(dashboard.data_dir) as live:
+                live.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
             st.toast(f"Follow-up set for {new_date.strftime('%a %d %b')}")
             st.rerun()
             
         if b2.button("+1 Wk", key=f"fu_1w_{rider.email}_{key_suffix}", use_container_width=True):
             new_date = now + timedelta(weeks=1)
-            dashboard.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
+            with edit_dashboard(dashboard.data_dir) as live:
+                live.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
             st.toast(f"Follow-up set for {new_date.strftime('%a %d %b')}")
             st.rerun()
 
         if b3.button("+1 Mo", key=f"fu_1m_{rider.email}_{key_suffix}", use_container_width=True):
             new_date = now + timedelta(days=30)
-            dashboard.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
+            with edit_dashboard(dashboard.data_dir) as live:
+                live.data_loader.save_rider_details(rider.email, follow_up_date=new_date)
             st.toast(f"Follow-up set for {new_date.strftime('%a %d %b')}")
             st.rerun()
             
@@ -378,21 +396,24 @@ def render_unified_card_content(rider, dashboard, key_suffix="", default_event_n
                     curr_stage_val = rider.current_stage.value if hasattr(rider.current_stage, 'value') else str(rider.current_stage)
                     
                     if u_stage != curr_stage_val:
-                        new_enum = next((s for s in FunnelStage if s.value == u_stage), None)
+                        new_enum = FunnelStage.from_text(u_stage)
                         if new_enum:
-                            dashboard.update_rider_stage(rider.email, new_enum)
+                            with edit_dashboard(dashboard.data_dir) as live:
+                                live.update_rider_stage(rider.email, new_enum)
                             st.toast(f"Moved to {u_stage}!")
 
                     # 2. Update Details
-                    dashboard.add_new_rider(
-                        final_email, u_first, u_last, u_fb, ig_url=u_ig, championship=u_champ, notes=u_notes, follow_up_date=ts_follow
-                    )
+                    with edit_dashboard(dashboard.data_dir) as live:
+                        live.add_new_rider(
+                            final_email, u_first, u_last, u_fb, ig_url=u_ig, championship=u_champ, notes=u_notes, follow_up_date=ts_follow
+                        )
                     st.toast(f"Updated & Synced {u_first}!")
                     st.rerun()
 
         # Explicit Move Button (Outside form, for quick action)
         if st.button("✈️ Move to Airtable (Force)", key=f"uni_mv_{rider.email}_{key_suffix}", help="Force sync this rider to Airtable and delete from Google Sheets"):
-             count = dashboard.migrate_rider_to_airtable(rider.email)
+             with edit_dashboard(dashboard.data_dir) as live:
+                 count = live.migrate_rider_to_airtable(rider.email)
              if count:
                  st.success("Moved to Airtable!")
                  st.rerun()